@@ -1,35 +1,270 @@
+import uuid
 from app.utils.api_service import ApiService
 from app.models.exam_attendance import ExamAttendance
 from config.config import Config
 from app.controllers.cccd_api import CCCDApiController
+from app.utils.attendance_outbox import AttendanceOutbox
+from app.utils.attendance_batch import PENDING, DELIVERED, FAILED
+from app.utils.attendance_sync import AttendanceSync
+from app.utils.data_repository import DataRepository
 from app.utils.datetime_utils import format_datetime_for_api
+from app.utils.event_bus import ATTENDANCE_DELIVERY
+from app.utils.pagination import Page, page_params, parse_page, paginate_locally, is_local_cursor
+
+def _iso_date(value):
+    """date/datetime or ISO string -> 'YYYY-MM-DD' (None stays None)"""
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return str(value)[:10]
 
 class AttendanceController:
     def __init__(self):
         self.api_service = ApiService.get_instance()
         self.cccd_api = CCCDApiController()
+        self.outbox = AttendanceOutbox.get_instance()
+        self.sync = AttendanceSync.get_instance()
+        self.repository = DataRepository.get_instance()
+        # None: chưa biết máy chủ có hỗ trợ phân trang không; False: lọc và chia trang tại máy
+        self.server_pagination = None
+        # Bản ghi đang chờ trong DataRepository được thay bằng bản ghi của máy chủ khi gửi xong
+        self.outbox.event_bus.subscribe(ATTENDANCE_DELIVERY, self._on_attendance_delivery)
+    
+    def _submit_attendance(self, attendance_data, user_id, exam_id):
+        """
+        Queue an attendance submission in the local outbox and return at once
+        
+        The background flusher delivers it to the backend; the returned record has
+        no server ID yet, its delivery_key/delivery_state track the delivery. It is
+        kept in the repository as pending until the delivered record replaces it.
+        """
+        key = self.outbox.enqueue(Config.ATTENDANCE_URL, attendance_data, user_id, exam_id)
+        attendance = ExamAttendance.from_json(attendance_data)
+        attendance.user_id = attendance.user_id or user_id
+        attendance.exam_id = attendance.exam_id or exam_id
+        attendance.delivery_key = key
+        attendance.delivery_state = self.outbox.get_state(key)
+        self.repository.put_attendance([attendance])
+        return attendance
+    
+    def _on_attendance_delivery(self, key, state, user_id, exam_id):
+        """Update the pending copy of a queued submission in the repository (event bus thread)"""
+        pending = self.repository.find_pending_attendance(key)
+        if pending is None:
+            return
+        if state != DELIVERED:
+            pending.delivery_state = state
+            return
+        
+        entry = self.outbox.get_entry(key)
+        response = entry['response'] if entry else None
+        if isinstance(response, dict) and (response.get('id') or response.get('attendanceId')):
+            attendance = ExamAttendance.from_json(response)
+            attendance.delivery_key = key
+            attendance.delivery_state = DELIVERED
+            self.repository.put_attendance([attendance])
+        else:
+            # Máy chủ không trả về bản ghi: lần đồng bộ sau sẽ lấy về
+            self.repository.remove_pending_attendance(key)
+    
+    def submit_attendance_batch(self, attendances):
+        """
+        Submit many attendance records at once and wait for their outcomes
+
+        Library API for bulk submissions (imports, scripts, benchmark_controllers.py);
+        the mark_* methods go through the outbox, whose flusher sends the
+        submissions queued together through the same batch sender.
+        Records are sent in batch requests of Config.ATTENDANCE_BATCH_SIZE, or as
+        parallel single POSTs when the backend has no batch endpoint. Records the
+        backend could not take now (unreachable, server errors) are queued in the
+        outbox with the same idempotency key and delivered in the background.
+
+        Returns:
+            list: ExamAttendance per submitted record, in the same order, with
+                  delivery_key, delivery_state (delivered/failed/pending) and,
+                  for rejected records, delivery_error
+        """
+        items = [(str(uuid.uuid4()), attendance.to_json()) for attendance in attendances]
+        outcomes = self.outbox.sender.send(Config.ATTENDANCE_URL, items)
+
+        results = []
+        for attendance, (key, payload), outcome in zip(attendances, items, outcomes):
+            state = outcome.state
+            if state == DELIVERED and isinstance(outcome.body, dict):
+                result = ExamAttendance.from_json(outcome.body)
+                self.repository.put_attendance([result])
+            else:
+                result = ExamAttendance.from_json(payload)
+            result.user_id = result.user_id or attendance.user_id
+            result.exam_id = result.exam_id or attendance.exam_id
+            if state == FAILED:
+                result.delivery_error = f"HTTP {outcome.status}: {outcome.body}"
+            elif state == PENDING:
+                # Bản ghi đang chờ cho cùng thí sinh/kỳ thi được dùng lại: giữ key của outbox
+                key = self.outbox.enqueue(Config.ATTENDANCE_URL, payload, attendance.user_id, attendance.exam_id,
+                                          idempotency_key=key)
+            result.delivery_key = key
+            result.delivery_state = state
+            if state == PENDING:
+                self.repository.put_attendance([result])
+            results.append(result)
+
+        counts = {state: sum(r.delivery_state == state for r in results) for state in (DELIVERED, FAILED, PENDING)}
+        print(f"Attendance batch: {counts[DELIVERED]} delivered, {counts[FAILED]} rejected, {counts[PENDING]} queued")
+        return results
+    
+    def get_pending_attendance(self):
+        """Attendance submissions not delivered yet (waiting or rejected), as ExamAttendance records"""
+        records = []
+        for entry in self.outbox.get_entries():
+            attendance = ExamAttendance.from_json(entry['payload'])
+            attendance.user_id = attendance.user_id or entry['user_id']
+            attendance.exam_id = attendance.exam_id or entry['exam_id']
+            attendance.delivery_key = entry['idempotency_key']
+            attendance.delivery_state = entry['state']
+            records.append(attendance)
+        return records
     
     def get_all_attendance(self):
         """Get all attendance records from the system"""
         result = self.api_service.get(Config.ATTENDANCE_URL)
         if result:
-            return [ExamAttendance.from_json(attendance_data) for attendance_data in result]
+            records = [ExamAttendance.from_json(attendance_data) for attendance_data in result]
+            self.repository.put_attendance(records)
+            return records
         return []
     
+    def query_attendance(self, exam_id=None, date_from=None, date_to=None, citizen_card_verified=None,
+                         face_verified=None, page_size=None, cursor=None, from_snapshot=False):
+        """
+        Get one page of attendance records matching the filters
+        
+        The filters and page are sent to the server (examId, fromDate, toDate,
+        citizenCardVerified, faceVerified, size, page/cursor). If the server
+        answers with the whole list instead of a page, filtering and paging are
+        done locally from then on.
+        
+        Args:
+            date_from, date_to: date, datetime or ISO string; inclusive, compared by day
+            cursor: next_cursor of the previous page, None for the first page
+            from_snapshot: answer from the responses saved on disk, without requests
+        Returns:
+            Page of ExamAttendance, or None if the request failed
+        """
+        page_size = page_size or Config.ATTENDANCE_PAGE_SIZE
+        filters = {
+            'examId': exam_id,
+            'fromDate': _iso_date(date_from),
+            'toDate': _iso_date(date_to),
+            'citizenCardVerified': citizen_card_verified,
+            'faceVerified': face_verified
+        }
+        filters = {name: value for name, value in filters.items() if value is not None}
+        
+        if self.server_pagination is False or is_local_cursor(cursor):
+            return self._query_attendance_locally(filters, page_size, cursor, from_snapshot)
+        
+        params = {name: (str(value).lower() if isinstance(value, bool) else value) for name, value in filters.items()}
+        params.update(page_params(page_size, cursor))
+        result = self.api_service.get(Config.ATTENDANCE_URL, params=params, from_snapshot=from_snapshot)
+        if result is None:
+            return None
+        
+        parsed = parse_page(result, page_size, cursor)
+        if parsed is None:
+            if not isinstance(result, list):
+                print(f"Unexpected attendance page format: {type(result).__name__}")
+                return None
+            print("Attendance endpoint does not support paging, filtering locally")
+            self.server_pagination = False
+            return self._page_locally(result, filters, page_size, cursor)
+        
+        self.server_pagination = True
+        items, next_cursor, total = parsed
+        records = [ExamAttendance.from_json(data) for data in items]
+        self.repository.put_attendance(records)
+        return Page(records, cursor, next_cursor, total, page_size)
+    
+    def count_attendance(self, **filters):
+        """Number of attendance records matching the filters of query_attendance (None if unknown)"""
+        page = self.query_attendance(page_size=1, **filters)
+        return page.total if page is not None else None
+    
+    def _query_attendance_locally(self, filters, page_size, cursor, from_snapshot=False):
+        # Danh sách theo kỳ thi nhỏ hơn nhiều so với toàn bộ danh sách
+        if 'examId' in filters:
+            url = f"{Config.ATTENDANCE_URL}/exam/{filters['examId']}"
+        else:
+            url = Config.ATTENDANCE_URL
+        result = self.api_service.get(url, from_snapshot=from_snapshot)
+        if result is None:
+            return None
+        return self._page_locally(result, filters, page_size, cursor)
+    
+    def _page_locally(self, result, filters, page_size, cursor):
+        records = [ExamAttendance.from_json(data) for data in result]
+        self.repository.put_attendance(records)
+        records = [attendance for attendance in records if AttendanceController.matches_filters(attendance, filters)]
+        return paginate_locally(records, page_size, cursor)
+    
+    @staticmethod
+    def matches_filters(attendance, filters):
+        """Apply query_attendance filters (server parameter names) to a record"""
+        if 'examId' in filters and str(attendance.exam_id) != str(filters['examId']):
+            return False
+        day = str(attendance.attendance_time or '')[:10]
+        if 'fromDate' in filters and (not day or day < filters['fromDate']):
+            return False
+        if 'toDate' in filters and (not day or day > filters['toDate']):
+            return False
+        if 'citizenCardVerified' in filters and bool(attendance.citizen_card_verified) != filters['citizenCardVerified']:
+            return False
+        if 'faceVerified' in filters and bool(attendance.face_verified) != filters['faceVerified']:
+            return False
+        return True
+    
+    def sync_attendance(self, exam_id=None, prefetch=False):
+        """
+        Update the local copy of an exam's attendance records with the changes
+        since the last sync (see AttendanceSync); returns a SyncResult or None
+        """
+        result = self.sync.sync(exam_id, prefetch=prefetch)
+        if result is not None:
+            if result.full and exam_id is not None:
+                self.repository.set_exam_attendance(exam_id, result.changed)
+            else:
+                self.repository.put_attendance(result.changed)
+            self.repository.remove_attendance(result.removed)
+        return result
+    
+    def get_synced_attendance(self, exam_id=None):
+        """Attendance records of the local copy kept by sync_attendance"""
+        return self.sync.get_records(exam_id)
+    
     def get_attendance_by_id(self, attendance_id):
         """Get an attendance record by ID"""
         result = self.api_service.get(f"{Config.ATTENDANCE_URL}/{attendance_id}")
         if result:
-            return ExamAttendance.from_json(result)
+            attendance = ExamAttendance.from_json(result)
+            self.repository.put_attendance([attendance])
+            return attendance
         return None
     
     def get_attendance_by_exam(self, exam_id):
         """Get attendance records for a specific exam"""
         result = self.api_service.get(f"{Config.ATTENDANCE_URL}/exam/{exam_id}")
         if result:
-            return [ExamAttendance.from_json(attendance_data) for attendance_data in result]
+            records = [ExamAttendance.from_json(attendance_data) for attendance_data in result]
+            self.repository.set_exam_attendance(exam_id, records)
+            return records
         return []
     
+    def get_delivery_error(self, delivery_key):
+        """Why a queued submission was rejected (or last failed to send), None if unknown"""
+        entry = self.outbox.get_entry(delivery_key)
+        return entry['last_error'] if entry else None
+    
     def get_attendance_by_user(self, user_id):
         """Get attendance records for a specific user"""
         # API endpoint cho điểm danh của candidate: /api/attendance/candidate/{userId}
@@ -38,15 +273,14 @@ class AttendanceController:
         result = self.api_service.get(attendance_candidate_url)
         print(f"Response: {result}")
         if result:
-            return [ExamAttendance.from_json(attendance_data) for attendance_data in result]
+            records = [ExamAttendance.from_json(attendance_data) for attendance_data in result]
+            self.repository.put_attendance(records)
+            return records
         return []
     
     def mark_attendance(self, attendance):
-        """Mark attendance for a user in an exam"""
-        result = self.api_service.post(Config.ATTENDANCE_URL, attendance.to_json())
-        if result:
-            return ExamAttendance.from_json(result)
-        return None
+        """Mark attendance for a user in an exam (queued, delivered in the background)"""
+        return self._submit_attendance(attendance.to_json(), attendance.user_id, attendance.exam_id)
     
     def update_attendance(self, attendance):
         """Update an existing attendance record"""
@@ -55,7 +289,9 @@ class AttendanceController:
             attendance.to_json()
         )
         if result:
-            return ExamAttendance.from_json(result)
+            updated = ExamAttendance.from_json(result)
+            self.repository.put_attendance([updated if updated.attendance_id else attendance])
+            return updated
         return None
     
     def mark_attendance_with_face_verification(self, user_id, exam_id, verification_data=None):
@@ -84,11 +320,8 @@ class AttendanceController:
         if verification_data:
             attendance.verification_data = verification_data
             
-        # Gửi lên API
-        result = self.api_service.post(Config.ATTENDANCE_URL, attendance.to_json())
-        if result:
-            return ExamAttendance.from_json(result)
-        return None
+        # Đưa vào hàng đợi gửi lên API
+        return self._submit_attendance(attendance.to_json(), user_id, exam_id)
     
     def mark_cccd_attendance(self, user_id, exam_id, cccd_data=None, face_image_path=None):
         """Mark attendance using CCCD data and face recognition
@@ -131,11 +364,9 @@ class AttendanceController:
             "attendanceTime": format_datetime_for_api()
         }
         
-        # Gửi yêu cầu tới API
-        result = self.api_service.post(Config.ATTENDANCE_URL, attendance_data)
-        if result:
-            return ExamAttendance.from_json(result)
-        return None
+        # Đưa vào hàng đợi gửi tới API
+        return self._submit_attendance(attendance_data, user_id, exam_id)
+    
     def mark_attendance_with_cccd(self, user_id, exam_id, status="PRESENT"):
         """Mark attendance with CCCD and face verification"""
         attendance_data = {
@@ -150,8 +381,5 @@ class AttendanceController:
             "attendanceTime": format_datetime_for_api()
         }
         
-        # Gửi yêu cầu tới API
-        result = self.api_service.post(Config.ATTENDANCE_URL, attendance_data)
-        if result:
-            return ExamAttendance.from_json(result)
-        return None
\ No newline at end of file
+        # Đưa vào hàng đợi gửi tới API, không chặn luồng điểm danh khi máy chủ chậm
+        return self._submit_attendance(attendance_data, user_id, exam_id)
\ No newline at end of file
@@ -63,18 +63,12 @@ class AuthController:
     
     def is_logged_in(self):
         """Check if user is logged in"""
-        # Nếu đã có thông tin người dùng, xem như đã đăng nhập
-        if self.current_user:
-            return True
-            
+        # Hạn token được kiểm tra cục bộ (JWT "exp"), không cần gọi API validate-token
+        is_valid = self.api_service.has_valid_token()
+        
         # Nếu có token nhưng chưa có thông tin người dùng, thử khởi tạo từ cache
-        if not self.current_user and self.api_service.token:
+        if is_valid and not self.current_user:
             self._init_user_from_cache()
-            if self.current_user:
-                return True
-        
-        # Cuối cùng, kiểm tra token có hợp lệ không
-        is_valid = self.api_service.validate_token()
         
         # Nếu token không hợp lệ, reset thông tin người dùng
         if not is_valid:
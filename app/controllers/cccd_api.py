@@ -1,6 +1,6 @@
 from app.utils.api_service import ApiService
-from app.controllers.cccd_socket_server import CCCDSocketServer
-from app.utils.face_recognition import compare_faces, face_encoding_from_image
+from app.controllers.cccd_pipeline import CCCDIngestPipeline
+from app.utils.face_recognition import compare_faces, compare_faces_with_encodings
 from config.config import Config
 import os
 
@@ -9,7 +9,7 @@ class CCCDApiController:
     
     def __init__(self):
         self.api_service = ApiService.get_instance()
-        self.socket_server = CCCDSocketServer.get_instance()
+        self.pipeline = CCCDIngestPipeline.get_instance()
     
     def verify_cccd(self, user_citizen_id, exam_id=None):
         """
@@ -26,7 +26,7 @@ class CCCDApiController:
                 - message: Human-readable message about the verification
         """
         # Check if we have received CCCD data for this citizen ID
-        cccd_data = self.socket_server.get_cccd_data(user_citizen_id)
+        cccd_data = self.pipeline.get_cccd_data(user_citizen_id)
         
         if not cccd_data:
             return {
@@ -68,7 +68,7 @@ class CCCDApiController:
                 - message: Human-readable message about the comparison
         """
         # Get CCCD data
-        cccd_data = self.socket_server.get_cccd_data(user_citizen_id)
+        cccd_data = self.pipeline.get_cccd_data(user_citizen_id)
         
         if not cccd_data:
             return {
@@ -93,7 +93,16 @@ class CCCDApiController:
                 'message': 'Ảnh khuôn mặt người dùng không tồn tại hoặc bị lỗi.'
             }
         
-        # Compare the faces
-        comparison_result = compare_faces(cccd_image_path, captured_face_image_path)
+        # Use the CCCD encoding computed at ingest time so only the live capture is encoded here
+        cccd_face_encodings = self.pipeline.get_cccd_face_encodings(user_citizen_id)
+        
+        if cccd_face_encodings is None:
+            # Background encoding unavailable, fall back to encoding both images
+            comparison_result = compare_faces(cccd_image_path, captured_face_image_path)
+        else:
+            comparison_result = compare_faces_with_encodings(cccd_face_encodings, captured_face_image_path)
+        
+        # Persist the outcome so it survives an application restart
+        self.pipeline.record_verification(user_citizen_id, comparison_result)
         
         return comparison_result
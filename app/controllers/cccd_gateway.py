@@ -0,0 +1,676 @@
+"""
+CCCD ingest gateway.
+Serves the mobile app's socket protocol and the HTTP API (/api/cccd, /api/cccd/batch,
+/api/status)
+from one asyncio event loop, and hands every message to the shared
+CCCDIngestPipeline. Started the same way by the desktop app and by the
+headless scripts: CCCDGateway.get_instance().start()
+"""
+
+import asyncio
+import codecs
+import json
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from app.controllers.cccd_pipeline import CCCDIngestPipeline
+from app.utils.rate_limiter import TokenBucket
+from config.config import Config
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    429: 'Too Many Requests',
+    500: 'Internal Server Error',
+    501: 'Not Implemented'
+}
+
+def get_local_ip():
+    """Get the local IP address the mobile app should connect to"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Connect to an external server to determine the local IP
+        s.connect(("8.8.8.8", 80))
+        local_ip = s.getsockname()[0]
+        s.close()
+        return local_ip
+    except OSError:
+        return "127.0.0.1"
+
+class _FairScheduler:
+    """
+    Round-robin scheduling of ingest work across clients
+
+    Each client has its own queue and the worker slots are handed to the clients
+    in turn, so a phone sending a large backlog doesn't delay the others.
+    Runs entirely on the gateway's event loop thread.
+    """
+
+    def __init__(self, loop, executor, workers, func):
+        self.loop = loop
+        self.executor = executor
+        self.workers = workers
+        self.func = func
+        self.queues = OrderedDict()  # client key -> deque of (data, future)
+        self.active = 0
+
+    def submit(self, client, data):
+        """Queue data for a client, returns a future with the result of func(data)"""
+        future = self.loop.create_future()
+        self.queues.setdefault(client, deque()).append((data, future))
+        self._pump()
+        return future
+
+    def queued(self, client):
+        queue = self.queues.get(client)
+        return len(queue) if queue else 0
+
+    def _pump(self):
+        while self.active < self.workers and self.queues:
+            # Take one item from the client at the front, then move it to the back
+            client, queue = self.queues.popitem(last=False)
+            data, future = queue.popleft()
+            if queue:
+                self.queues[client] = queue
+            if future.cancelled():
+                continue
+
+            self.active += 1
+            work = self.loop.run_in_executor(self.executor, self.func, data)
+            work.add_done_callback(lambda work, future=future: self._on_done(work, future))
+
+    def _on_done(self, work, future):
+        self.active -= 1
+        if not future.done():
+            if work.cancelled():
+                future.cancel()
+            elif work.exception() is not None:
+                future.set_exception(work.exception())
+            else:
+                future.set_result(work.result())
+        self._pump()
+
+class _SocketSession:
+    """
+    One connection from a scanner phone using the socket protocol
+
+    Messages are JSON objects sent back-to-back on the same connection
+    (optionally newline separated):
+        - {"type": "ping", "messageId": ...} -> {"type": "pong", ...}
+        - CCCD data {"citizenId", "faceImage", ...} with a "messageId": answered at
+          once with {"type": "ack", "stage": "received", "messageId": ...} and later
+          with {"type": "ack", "stage": "processed", "messageId": ..., "status": ...}.
+          The phone may send the next scans without waiting for these acks.
+        - CCCD data without "messageId" (older app versions): processed first, then
+          answered with a single {"status": ..., "message": ...} acknowledgment
+        - {"type": "batch", "messageId": ..., "records": [...]}: a backlog of CCCD records
+          replayed at once. Answered with one "received" ack, then one "processed" ack
+          per record (with its "index" and "recordId") as soon as it is done, then
+          {"type": "ack", "stage": "completed", "succeeded": ..., "failed": ...}.
+          Fields set on the batch itself (e.g. examId) apply to every record.
+    Acks for messages with a messageId are newline terminated. Each phone (its
+    "deviceId" if messages carry one, otherwise its IP address) is rate limited;
+    records over the limit are answered with status "error" and "retryAfter".
+    """
+
+    def __init__(self, gateway, reader, writer):
+        self.gateway = gateway
+        self.reader = reader
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.decoder = json.JSONDecoder()
+        self.send_lock = asyncio.Lock()
+        # Limit pipelined messages in flight, reading pauses when the limit is reached
+        self.inflight = asyncio.Semaphore(Config.CCCD_SESSION_MAX_INFLIGHT)
+        self.tasks = set()
+        self.messages_received = 0
+
+    async def run(self):
+        """Read and dispatch messages until the client disconnects or stays idle too long"""
+        # A read may end inside a multi-byte character: the incremental decoder keeps those bytes for the next one
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ""
+        while self.gateway.is_running:
+            try:
+                data = await asyncio.wait_for(self.reader.read(65536), timeout=Config.CCCD_SESSION_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"Closing idle connection after {Config.CCCD_SESSION_IDLE_TIMEOUT}s")
+                break
+            if not data:
+                break
+
+            pending = text_decoder.getstate()[0]
+            try:
+                buffer += text_decoder.decode(data)
+            except UnicodeDecodeError as e:
+                # Not valid UTF-8: dispatch the messages before the invalid bytes, then drop the connection
+                # (the phone sends again the messages it got no ack for)
+                buffer += (pending + data)[:e.start].decode('utf-8')
+                await self._consume(buffer)
+                print(f"Invalid UTF-8 data from {self.peer}, closing connection")
+                # Kết thúc bằng newline: các ack "processed" còn đang chờ được gửi sau nó
+                await self.send({"status": "error", "message": "Invalid UTF-8 data"})
+                break
+
+            # Dữ liệu ảnh base64 là ASCII: số ký tự xấp xỉ số byte
+            if len(buffer) > Config.CCCD_MAX_MESSAGE_BYTES:
+                await self.send({"status": "error", "message": "Message too large"}, newline=False)
+                break
+
+            # Only a closing brace can complete a message (base64 image data never contains one),
+            # so don't re-parse a large partial message for every chunk
+            if b"}" not in data:
+                continue
+            buffer = await self._consume(buffer)
+
+        # Let pipelined messages finish so their "processed" acks are still sent
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def _consume(self, text):
+        """Dispatch every complete message at the start of the decoded text, return the unparsed rest"""
+        pos = 0
+        while True:
+            # Skip whitespace and newlines between messages
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if pos >= len(text):
+                return ""
+
+            try:
+                message, pos = self.decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                # Message is incomplete, continue receiving
+                return text[pos:]
+
+            self.messages_received += 1
+            await self._dispatch(message)
+
+    async def _dispatch(self, message):
+        if not isinstance(message, dict):
+            await self.send({"status": "error", "message": "Invalid message"}, newline=False)
+            return
+
+        message_id = message.get('messageId')
+
+        if message.get('type') == 'ping':
+            await self.send({"type": "pong", "messageId": message_id, "timestamp": time.time()})
+            return
+
+        if message.get('type') == 'batch':
+            if message_id is None:
+                await self.send({"type": "ack", "stage": "processed", "status": "error",
+                                 "message": "Batch messages require a messageId"})
+                return
+            await self.inflight.acquire()
+            await self.send({"type": "ack", "stage": "received", "messageId": message_id, "status": "success"})
+            self._start_task(self._process_batch(message, message_id))
+            return
+
+        if message_id is None:
+            # Older app versions: one message per round trip, acknowledge after processing
+            result = await self.gateway._process(message, self.peer)
+            if result['status'] == 'success':
+                response = {"status": "success", "message": "CCCD data received"}
+            else:
+                response = {"status": "error", "message": result['message']}
+            await self.send(response, newline=False)
+            return
+
+        await self.inflight.acquire()
+        await self.send({"type": "ack", "stage": "received", "messageId": message_id, "status": "success"})
+        self._start_task(self._process_pipelined(message, message_id))
+
+    def _start_task(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _process_pipelined(self, message, message_id):
+        try:
+            result = await self.gateway._process(message, self.peer)
+            ack = {
+                "type": "ack",
+                "stage": "processed",
+                "messageId": message_id,
+                "status": result['status'],
+                "message": result['message'],
+                "duplicate": result.get('duplicate', False)
+            }
+            if result.get('rate_limited'):
+                ack['retryAfter'] = result['retryAfter']
+            await self.send(ack)
+        except ConnectionError:
+            pass  # Client went away, the data has still been processed
+        finally:
+            self.inflight.release()
+
+    async def _process_batch(self, message, message_id):
+        async def send_record_ack(result):
+            try:
+                await self.send(dict({"type": "ack", "stage": "processed", "messageId": message_id}, **result))
+            except ConnectionError:
+                pass
+
+        try:
+            try:
+                results = await self.gateway._process_batch(message, self.peer, on_result=send_record_ack)
+            except ValueError as e:
+                await self.send({"type": "ack", "stage": "processed", "messageId": message_id,
+                                 "status": "error", "message": str(e)})
+                return
+
+            succeeded = sum(1 for result in results if result['status'] == 'success')
+            await self.send({
+                "type": "ack",
+                "stage": "completed",
+                "messageId": message_id,
+                "status": "success" if succeeded == len(results) else "error",
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded
+            })
+        except ConnectionError:
+            pass
+        finally:
+            self.inflight.release()
+
+    async def send(self, payload, newline=True):
+        data = json.dumps(payload).encode('utf-8')
+        if newline:
+            data += b"\n"
+        async with self.send_lock:
+            self.writer.write(data)
+            await self.writer.drain()
+
+class CCCDGateway:
+    """Async server receiving CCCD data over TCP (socket protocol) and HTTP"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = CCCDGateway()
+        return cls._instance
+
+    def __init__(self, host=None, socket_port=None, http_port=None):
+        self.host = host or Config.CCCD_GATEWAY_HOST
+        self.socket_port = socket_port or Config.CCCD_SOCKET_PORT
+        self.http_port = http_port or Config.CCCD_HTTP_PORT
+        self.pipeline = CCCDIngestPipeline.get_instance()
+        self.is_running = False
+        self.clients = {}  # peer address -> protocol name
+        self.client_stats = {}  # client key (deviceId or IP) -> counters, see get_client_stats
+        self._stats_lock = threading.Lock()  # client_stats is read from the GUI thread
+        self._buckets = {}  # client key -> TokenBucket
+        self._scheduler = None
+
+        self._loop = None
+        self._thread = None
+        self._servers = []
+        # Processing writes files and SQLite rows, keep it off the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=Config.CCCD_INGEST_WORKERS,
+            thread_name_prefix="cccd-ingest"
+        )
+
+    def start(self):
+        """Start the gateway on a background event loop thread"""
+        if self.is_running:
+            print("CCCD gateway is already running")
+            return True
+
+        started = threading.Event()
+        errors = []
+
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            args=(started, errors),
+            name="cccd-gateway",
+            daemon=True
+        )
+        self._thread.start()
+        started.wait()
+
+        if errors:
+            print(f"Error starting CCCD gateway: {errors[0]}")
+            return False
+
+        local_ip = get_local_ip()
+        print(f"CCCD gateway started on {self.host}: socket port {self.socket_port}, HTTP port {self.http_port}")
+        print(f"Mobile app should connect to: {local_ip}")
+        print(f"To test the API, you can use: GET http://{local_ip}:{self.http_port}/api/status")
+        return True
+
+    def serve_forever(self):
+        """Start the gateway and block until interrupted (for headless scripts)"""
+        if not self.start():
+            return False
+
+        try:
+            print("Server is running. Press Ctrl+C to stop.")
+            while self.is_running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("Stopping server...")
+        finally:
+            self.stop()
+        return True
+
+    def stop(self):
+        """Stop the gateway"""
+        if not self.is_running or not self._loop:
+            return
+
+        self.is_running = False
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        print("CCCD gateway stopped")
+
+    def _run_loop(self, started, errors):
+        """Event loop thread: bind both listeners then serve until stopped"""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        try:
+            self._servers = [
+                self._loop.run_until_complete(asyncio.start_server(
+                    self._handle_socket_client, self.host, self.socket_port,
+                    limit=Config.CCCD_MAX_MESSAGE_BYTES
+                )),
+                self._loop.run_until_complete(asyncio.start_server(
+                    self._handle_http_client, self.host, self.http_port,
+                    limit=Config.CCCD_MAX_MESSAGE_BYTES
+                ))
+            ]
+        except Exception as e:
+            errors.append(e)
+            for server in self._servers:
+                server.close()
+            self._loop.close()
+            started.set()
+            return
+
+        self._scheduler = _FairScheduler(
+            self._loop, self._executor, Config.CCCD_INGEST_WORKERS, self.pipeline.process_cccd_data
+        )
+        self.is_running = True
+        started.set()
+
+        try:
+            self._loop.run_forever()
+        finally:
+            for server in self._servers:
+                server.close()
+            # Cancel open client connections before closing the loop
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._servers = []
+            self._loop.close()
+            self.is_running = False
+
+    @staticmethod
+    def _client_key(data, peer):
+        """Identify the sending phone: its deviceId if it sends one, otherwise its IP address"""
+        if isinstance(data, dict) and data.get('deviceId'):
+            return str(data['deviceId'])
+        return peer[0] if peer else 'unknown'
+
+    def _update_client_stats(self, client, peer, **counters):
+        with self._stats_lock:
+            stats = self.client_stats.get(client)
+            if stats is None:
+                stats = self.client_stats[client] = {
+                    'client': client, 'address': None, 'messages': 0, 'processed': 0,
+                    'duplicates': 0, 'rate_limited': 0, 'errors': 0, 'last_seen': None
+                }
+            if peer:
+                stats['address'] = peer[0]
+            stats['last_seen'] = time.time()
+            for name, increment in counters.items():
+                stats[name] += increment
+
+    def get_client_stats(self):
+        """Per-client counters (safe to call from any thread)"""
+        with self._stats_lock:
+            clients = [dict(stats) for stats in self.client_stats.values()]
+
+        # Approximate read of the loop's queues, only used for display
+        scheduler = self._scheduler
+        for stats in clients:
+            stats['queued'] = scheduler.queued(stats['client']) if scheduler else 0
+        return clients
+
+    async def _process(self, data, peer=None):
+        """
+        Rate limit the sending client, then run the shared pipeline on a worker
+        thread, scheduled round-robin across clients
+        """
+        client = self._client_key(data, peer)
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(Config.CCCD_CLIENT_RATE_LIMIT, Config.CCCD_CLIENT_BURST)
+
+        if not bucket.try_consume():
+            self._update_client_stats(client, peer, messages=1, rate_limited=1)
+            return {
+                'status': 'error',
+                'message': 'Rate limit exceeded, retry later',
+                'citizenId': data.get('citizenId') if isinstance(data, dict) else None,
+                'rate_limited': True,
+                'retryAfter': round(bucket.time_until_available(), 2)
+            }
+
+        self._update_client_stats(client, peer, messages=1)
+        result = await self._scheduler.submit(client, data)
+
+        if result.get('duplicate'):
+            self._update_client_stats(client, peer, duplicates=1)
+        elif result['status'] == 'success':
+            self._update_client_stats(client, peer, processed=1)
+        else:
+            self._update_client_stats(client, peer, errors=1)
+        return result
+
+    async def _process_batch(self, message, peer=None, on_result=None):
+        """
+        Process the records of a batch message in parallel on the worker threads
+
+        on_result (coroutine function) is awaited with each record's result as soon
+        as that record is done. Returns the results in record order.
+        Raises ValueError if the batch itself is malformed.
+        """
+        records = message.get('records')
+        if not isinstance(records, list) or not records:
+            raise ValueError("Batch must contain a non-empty 'records' list")
+        if len(records) > Config.CCCD_MAX_BATCH_RECORDS:
+            raise ValueError(f"Batch contains more than {Config.CCCD_MAX_BATCH_RECORDS} records")
+
+        # Fields of the batch itself (examId, deviceId, ...) are defaults for every record
+        defaults = {k: v for k, v in message.items() if k not in ('type', 'messageId', 'records')}
+
+        async def process_record(index, record):
+            if isinstance(record, dict):
+                record_id = record.get('recordId')
+                result = await self._process(dict(defaults, **record), peer)
+            else:
+                record_id = None
+                result = {'status': 'error', 'message': 'Invalid CCCD data', 'citizenId': None}
+
+            entry = {
+                'index': index,
+                'recordId': record_id,
+                'citizenId': result.get('citizenId'),
+                'status': result['status'],
+                'message': result['message'],
+                'duplicate': result.get('duplicate', False)
+            }
+            if result.get('rate_limited'):
+                entry['retryAfter'] = result['retryAfter']
+            if on_result:
+                await on_result(entry)
+            return entry
+
+        return await asyncio.gather(*(process_record(i, record) for i, record in enumerate(records)))
+
+    async def _handle_socket_client(self, reader, writer):
+        """Socket protocol: a long-lived session carrying one or more JSON messages"""
+        client_address = writer.get_extra_info('peername')
+        self.clients[client_address] = 'socket'
+        print(f"New connection from {client_address}")
+
+        # Detect phones that vanished without closing the connection (Wi-Fi drop)
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        session = _SocketSession(self, reader, writer)
+        try:
+            await session.run()
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            print(f"Connection error with client {client_address}: {e}")
+        except Exception as e:
+            print(f"Error handling client {client_address}: {e}")
+        finally:
+            self.clients.pop(client_address, None)
+            writer.close()
+            print(f"Connection from {client_address} closed ({session.messages_received} message(s))")
+
+    async def _handle_http_client(self, reader, writer):
+        """Minimal HTTP/1.1 server with keep-alive for the CCCD REST endpoints"""
+        client_address = writer.get_extra_info('peername')
+        self.clients[client_address] = 'http'
+
+        try:
+            while self.is_running:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break  # Client closed the connection
+                except asyncio.LimitOverrunError:
+                    await self._send_http(writer, 413, {'status': 'error', 'message': 'Headers too large'}, False)
+                    break
+
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send_http(writer, 400, {'status': 'error', 'message': 'Bad request line'}, False)
+                    break
+
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                if 'chunked' in headers.get('transfer-encoding', '').lower():
+                    await self._send_http(writer, 501, {'status': 'error', 'message': 'Chunked bodies are not supported'}, False)
+                    break
+
+                content_length = int(headers.get('content-length', 0) or 0)
+                if content_length > Config.CCCD_MAX_MESSAGE_BYTES:
+                    await self._send_http(writer, 413, {'status': 'error', 'message': 'Payload too large'}, False)
+                    break
+                body = await reader.readexactly(content_length) if content_length else b""
+
+                status, payload = await self._route_http(method, target.split("?", 1)[0], body, client_address)
+                await self._send_http(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"Error handling HTTP client {client_address}: {e}")
+        finally:
+            self.clients.pop(client_address, None)
+            writer.close()
+
+    async def _route_http(self, method, path, body, peer=None):
+        """Dispatch an HTTP request to its endpoint, returns (status code, JSON payload)"""
+        if path == '/api/status':
+            if method != 'GET':
+                return 405, {'status': 'error', 'message': 'Method not allowed'}
+            return 200, {
+                'status': 'online',
+                'message': 'CCCD API Server is running',
+                'timestamp': time.time(),
+                'stats': self.pipeline.get_stats()
+            }
+
+        if path == '/api/cccd':
+            if method != 'POST':
+                return 405, {'status': 'error', 'message': 'Method not allowed'}
+            try:
+                data = json.loads(body.decode('utf-8')) if body else None
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                return 400, {'status': 'error', 'message': 'Invalid JSON'}
+
+            if not data:
+                return 400, {'status': 'error', 'message': 'No data provided'}
+
+            result = await self._process(data, peer)
+            if result.get('rate_limited'):
+                return 429, {'status': 'error', 'message': result['message'], 'retryAfter': result['retryAfter']}
+            if result['status'] == 'success':
+                return 200, {
+                    'status': 'success',
+                    'message': 'CCCD data received successfully',
+                    'duplicate': result.get('duplicate', False)
+                }
+            if result['message'].startswith('Server error'):
+                return 500, {'status': 'error', 'message': result['message']}
+            return 400, {'status': 'error', 'message': result['message']}
+
+        if path == '/api/cccd/batch':
+            if method != 'POST':
+                return 405, {'status': 'error', 'message': 'Method not allowed'}
+            try:
+                data = json.loads(body.decode('utf-8')) if body else None
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                return 400, {'status': 'error', 'message': 'Invalid JSON'}
+
+            # Accept either {"records": [...], "examId": ...} or a bare list of records
+            if isinstance(data, list):
+                data = {'records': data}
+            if not isinstance(data, dict):
+                return 400, {'status': 'error', 'message': 'No data provided'}
+
+            try:
+                results = await self._process_batch(data, peer)
+            except ValueError as e:
+                return 400, {'status': 'error', 'message': str(e)}
+
+            succeeded = sum(1 for result in results if result['status'] == 'success')
+            if succeeded == len(results):
+                status = 'success'
+            else:
+                status = 'partial' if succeeded else 'error'
+            return 200, {
+                'status': status,
+                'message': f'{succeeded}/{len(results)} CCCD records received',
+                'results': results
+            }
+
+        return 404, {'status': 'error', 'message': 'Not found'}
+
+    async def _send_http(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
@@ -0,0 +1,281 @@
+import base64
+import binascii
+import hashlib
+import os
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from app.utils.datetime_utils import format_datetime_for_filename, format_datetime_for_api, get_current_time
+from app.utils.face_recognition import face_encoding_from_image
+from app.utils.image_utils import canonicalize_image, guess_image_extension
+from app.utils.cccd_store import CCCDStore
+from app.utils.event_bus import EventBus, CCCD_RECEIVED
+from config.config import Config
+
+class CCCDIngestPipeline:
+    """Processing pipeline for CCCD data received from mobile devices, shared by every ingest protocol"""
+    _instance = None
+    
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = CCCDIngestPipeline()
+        return cls._instance
+    
+    def __init__(self):
+        self.received_data = {}  # In-memory cache of received CCCD data (backed by CCCDStore)
+        self.store = CCCDStore.get_instance()
+        self.event_bus = EventBus.get_instance()  # Delivers CCCD_RECEIVED events to subscribers
+        
+        # Recently received image hashes, to recognize the same card scanned again
+        self.recent_hashes = {}  # (citizen_id, exam_id) -> (sha256 of image bytes, monotonic time)
+        self.dedup_lock = threading.Lock()
+        self.stats = {'received': 0, 'processed': 0, 'duplicates': 0, 'errors': 0}
+        
+        # Background workers that encode the CCCD face as soon as the image arrives,
+        # so face verification only has to encode the live capture
+        self.encoding_executor = ThreadPoolExecutor(
+            max_workers=Config.CCCD_ENCODING_WORKERS,
+            thread_name_prefix="cccd-encoding"
+        )
+        
+        # Ensure data directory exists
+        self.data_dir = os.path.join("app", "data", "cccd_images")
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.originals_dir = os.path.join("app", "data", "cccd_originals")
+        if Config.CCCD_ARCHIVE_ORIGINALS:
+            os.makedirs(self.originals_dir, exist_ok=True)
+    
+    def process_cccd_data(self, data):
+        """
+        Process one CCCD message (citizenId + base64 faceImage)
+        
+        Blocking (decodes and writes the image), so network servers should call it
+        from a worker thread.
+        
+        Returns:
+            dict: Result with keys:
+                - status: 'success' or 'error'
+                - message: Human-readable message
+                - citizenId: The citizen ID from the message (if any)
+                - duplicate: True if the same image was already received recently
+        """
+        result = self._process_cccd_data(data)
+        if result.get('duplicate'):
+            outcome = 'duplicates'
+        elif result['status'] == 'success':
+            outcome = 'processed'
+        else:
+            outcome = 'errors'
+        
+        # Called from several ingest worker threads at once
+        with self.dedup_lock:
+            self.stats['received'] += 1
+            self.stats[outcome] += 1
+        return result
+    
+    def _process_cccd_data(self, data):
+        if not isinstance(data, dict):
+            return {'status': 'error', 'message': 'Invalid CCCD data', 'citizenId': None}
+        
+        # Extract the CCCD data
+        citizen_id = data.get('citizenId')
+        image_data = data.get('faceImage')
+        
+        if not citizen_id or not image_data:
+            return {
+                'status': 'error',
+                'message': 'Missing required fields (citizenId, faceImage)',
+                'citizenId': citizen_id
+            }
+        
+        try:
+            # Decode base64 image data
+            image_bytes = base64.b64decode(image_data)
+        except (binascii.Error, ValueError) as e:
+            return {'status': 'error', 'message': f'Invalid faceImage: {e}', 'citizenId': citizen_id}
+        
+        # Quét lại cùng một thẻ: xác nhận ngay, không ghi file và không gửi lại sự kiện
+        dedup_key = (citizen_id, data.get('examId'))
+        if self._is_duplicate(dedup_key, hashlib.sha256(image_bytes).hexdigest()):
+            print(f"Duplicate CCCD scan for ID: {citizen_id}, skipped")
+            return {
+                'status': 'success',
+                'message': 'CCCD data already received',
+                'citizenId': citizen_id,
+                'duplicate': True
+            }
+        
+        try:
+            # Save image to file
+            timestamp = format_datetime_for_filename()
+            file_path = os.path.join(self.data_dir, f"cccd_{citizen_id}_{timestamp}.jpg")
+            
+            with open(file_path, 'wb') as f:
+                f.write(self._canonicalize_image(image_bytes, citizen_id))
+            
+            if Config.CCCD_ARCHIVE_ORIGINALS:
+                original_path = os.path.join(
+                    self.originals_dir,
+                    f"cccd_{citizen_id}_{timestamp}{guess_image_extension(image_bytes)}"
+                )
+                with open(original_path, 'wb') as f:
+                    f.write(image_bytes)
+            
+            # Store the data for retrieval
+            record = {
+                'citizenId': citizen_id,
+                'examId': data.get('examId'),
+                'image_path': file_path,
+                'timestamp': format_datetime_for_api(),
+                'raw_data': data,
+                'face_encodings': None,
+                'verification': None,
+                'encoding_future': None
+            }
+            self.store.save_receipt(record)
+            self.received_data[citizen_id] = record
+            
+            # Schedule face encoding of the CCCD photo in the background
+            self._attach_encoding_future(record)
+            
+            print(f"Received CCCD data for ID: {citizen_id}")
+            
+            # Notify subscribers asynchronously, off the network thread
+            self.event_bus.publish(CCCD_RECEIVED, citizen_id, file_path, data)
+            
+            return {'status': 'success', 'message': 'CCCD data received', 'citizenId': citizen_id}
+        except Exception as e:
+            print(f"Error processing CCCD data: {e}")
+            # Allow the phone to retry with the same image
+            with self.dedup_lock:
+                self.recent_hashes.pop(dedup_key, None)
+            return {'status': 'error', 'message': f'Server error: {e}', 'citizenId': citizen_id}
+    
+    def _is_duplicate(self, key, image_hash):
+        """
+        Check whether the same image was received for this citizen/exam within
+        CCCD_DEDUP_WINDOW seconds, and remember it otherwise
+        """
+        now = time.monotonic()
+        with self.dedup_lock:
+            previous = self.recent_hashes.get(key)
+            if previous and previous[0] == image_hash and now - previous[1] <= Config.CCCD_DEDUP_WINDOW:
+                # Mỗi lần quét lại kéo dài cửa sổ, tránh xử lý lại khi giám thị quét liên tục
+                self.recent_hashes[key] = (image_hash, now)
+                return True
+            
+            self.recent_hashes[key] = (image_hash, now)
+            if len(self.recent_hashes) > 1000:
+                self.recent_hashes = {
+                    k: v for k, v in self.recent_hashes.items()
+                    if now - v[1] <= Config.CCCD_DEDUP_WINDOW
+                }
+            return False
+    
+    def get_stats(self):
+        """Counters of received, processed, duplicate and failed CCCD messages"""
+        with self.dedup_lock:
+            return dict(self.stats)
+    
+    def _canonicalize_image(self, image_bytes, citizen_id):
+        """
+        Normalize the received image once (orientation, size, JPEG quality, no EXIF)
+        so display, face detection and encoding don't pay for the phone's resolution
+        """
+        try:
+            return canonicalize_image(
+                image_bytes,
+                Config.CCCD_IMAGE_MAX_DIMENSION,
+                Config.CCCD_IMAGE_JPEG_QUALITY
+            )
+        except ValueError as e:
+            # Giữ nguyên dữ liệu gốc nếu không đọc được ảnh
+            print(f"Could not normalize CCCD image for ID {citizen_id}, saving as received: {e}")
+            return image_bytes
+    
+    def _attach_encoding_future(self, record):
+        """Attach a future for the CCCD face encodings, encoding in the background if not cached"""
+        if record['face_encodings'] is not None:
+            future = Future()
+            future.set_result(record['face_encodings'])
+            record['encoding_future'] = future
+        else:
+            record['encoding_future'] = self.encoding_executor.submit(self._encode_cccd_face, record)
+    
+    def _encode_cccd_face(self, record):
+        """Encode the face in a received CCCD image and attach it to the record"""
+        encodings = face_encoding_from_image(record['image_path'])
+        record['face_encodings'] = encodings
+        self.store.save_encodings(record['citizenId'], record['examId'], record['image_path'], encodings)
+        print(f"Encoded CCCD face for ID: {record['citizenId']} ({len(encodings)} face(s))")
+        return encodings
+    
+    def get_cccd_face_encodings(self, citizen_id, timeout=None):
+        """
+        Get the CCCD face encodings computed at ingest time
+        
+        Waits for the background encoding if it is still running.
+        Returns None if there is no CCCD data or the encoding failed.
+        """
+        cccd_data = self.get_cccd_data(citizen_id)
+        if not cccd_data or not cccd_data.get('encoding_future'):
+            return None
+        
+        try:
+            return cccd_data['encoding_future'].result(timeout=timeout)
+        except Exception as e:
+            print(f"Error getting CCCD face encodings for ID {citizen_id}: {e}")
+            return None
+    
+    def get_cccd_data(self, citizen_id):
+        """Get the latest CCCD data for a specific citizen ID"""
+        record = self.received_data.get(citizen_id)
+        if record is None:
+            # Lazily load receipts persisted before a restart
+            record = self.store.get_receipt(citizen_id)
+            if record is not None:
+                self._attach_encoding_future(record)
+                self.received_data[citizen_id] = record
+        return record
+    
+    def get_recent_cccd_data(self, exam_id=None, hours=None):
+        """Get CCCD data received in the last few hours, used to restore state after a restart"""
+        hours = Config.CCCD_RECOVERY_HOURS if hours is None else hours
+        received_after = format_datetime_for_api(get_current_time() - datetime.timedelta(hours=hours))
+        
+        records = []
+        for stored in self.store.get_receipts_since(received_after, exam_id):
+            record = self.get_cccd_data(stored['citizenId'])
+            if record is not None:
+                records.append(record)
+        return records
+    
+    def record_verification(self, citizen_id, result):
+        """Store the face verification result for the latest CCCD data of a citizen ID"""
+        record = self.get_cccd_data(citizen_id)
+        if record is None:
+            return
+        
+        verified_at = format_datetime_for_api()
+        record['verification'] = {
+            'is_match': result.get('is_match', False),
+            'confidence': result.get('confidence', 0.0),
+            'message': result.get('message'),
+            'verified_at': verified_at
+        }
+        self.store.save_verification(citizen_id, record['examId'], result, verified_at)
+    
+    def register_data_callback(self, callback):
+        """
+        Register a callback for when CCCD data is received
+        
+        The callback runs on the event bus thread and is only weakly referenced.
+        Qt widgets should use QtEventBridge(CCCD_RECEIVED) instead.
+        """
+        self.event_bus.subscribe(CCCD_RECEIVED, callback)
+    
+    def unregister_data_callback(self, callback):
+        """Unregister a callback"""
+        self.event_bus.unsubscribe(CCCD_RECEIVED, callback)
@@ -1,49 +1,71 @@
 from app.utils.api_service import ApiService
+from app.utils.data_repository import DataRepository
 from app.models.exam import Exam
 from config.config import Config
 
 class ExamController:
     def __init__(self):
         self.api_service = ApiService.get_instance()
+        self.repository = DataRepository.get_instance()
     
-    def get_all_exams(self):
-        """Get all exams from the system"""
-        result = self.api_service.get(Config.EXAMS_URL)
-        if result:
-            return [Exam.from_json(exam_data) for exam_data in result]
-        return []
+    def get_all_exams(self, from_snapshot=False):
+        """
+        Get all exams from the system (from_snapshot: last list saved on disk, no request)
+        
+        Returns None if the request failed ([] if there is no snapshot).
+        """
+        result = self.api_service.get(Config.EXAMS_URL, from_snapshot=from_snapshot)
+        if result is None:
+            return [] if from_snapshot else None
+        exams = [Exam.from_json(exam_data) for exam_data in result]
+        if from_snapshot:
+            self.repository.put_exams(exams)
+        else:
+            self.repository.set_exams(exams)
+        return exams
     
-    def get_my_exams(self):
-        """Get exams assigned to the current logged-in candidate"""
-        result = self.api_service.get(Config.MY_EXAMS_URL)
-        if result:
-            return [Exam.from_json(exam_data) for exam_data in result]
-        return []
+    def get_my_exams(self, from_snapshot=False):
+        """Get exams assigned to the current logged-in candidate (None if the request failed)"""
+        result = self.api_service.get(Config.MY_EXAMS_URL, from_snapshot=from_snapshot)
+        if result is None:
+            return [] if from_snapshot else None
+        exams = [Exam.from_json(exam_data) for exam_data in result]
+        self.repository.put_exams(exams)
+        return exams
     
     def get_exam_by_id(self, exam_id):
         """Get an exam by ID"""
         result = self.api_service.get(f"{Config.EXAMS_URL}/{exam_id}")
         if result:
-            return Exam.from_json(result)
+            exam = Exam.from_json(result)
+            self.repository.put_exam(exam)
+            return exam
         return None
     
     def create_exam(self, exam):
         """Create a new exam"""
         result = self.api_service.post(Config.EXAMS_URL, exam.to_json())
         if result:
-            return Exam.from_json(result)
+            created = Exam.from_json(result)
+            self.repository.put_exam(created)
+            return created
         return None
     
     def update_exam(self, exam):
         """Update an existing exam"""
         result = self.api_service.put(f"{Config.EXAMS_URL}/{exam.exam_id}", exam.to_json())
         if result:
-            return Exam.from_json(result)
+            updated = Exam.from_json(result)
+            self.repository.put_exam(updated if updated.exam_id else exam)
+            return updated
         return None
     
     def delete_exam(self, exam_id):
         """Delete an exam"""
-        return self.api_service.delete(f"{Config.EXAMS_URL}/{exam_id}")
+        result = self.api_service.delete(f"{Config.EXAMS_URL}/{exam_id}")
+        if result:
+            self.repository.remove_exam(exam_id)
+        return result
     
     def validate_exam(self, exam):
         """Validate exam data"""
@@ -1,4 +1,5 @@
 from app.utils.api_service import ApiService
+from app.utils.data_repository import DataRepository
 from app.models.user import User
 from config.config import Config
 import logging
@@ -6,26 +7,49 @@ import logging
 class UserController:
     def __init__(self):
         self.api_service = ApiService.get_instance()
+        self.repository = DataRepository.get_instance()
     
-    def get_all_users(self):
-        """Get all users from the system with admin permission"""
+    def get_all_users(self, from_snapshot=False):
+        """
+        Get all users from the system with admin permission
+        
+        from_snapshot=True returns the last list saved on disk without a request
+        ([] if there is none). Returns None if the request failed.
+        """
+        if from_snapshot:
+            result = self.api_service.get(Config.USER_ALL_URL, from_snapshot=True)
+            users = [User.from_json(user_data) for user_data in result or []]
+            self.repository.put_users(users)
+            return users
+        
         # Sử dụng API endpoint cho admin /api/user/all
         print(f"Đang lấy danh sách tất cả người dùng từ {Config.USER_ALL_URL}")
         result = self.api_service.get(Config.USER_ALL_URL)
         
-        if result:
+        if result is not None:
             print(f"Đã nhận được dữ liệu: {len(result)} người dùng")
-            return [User.from_json(user_data) for user_data in result]
+            users = [User.from_json(user_data) for user_data in result]
+            self.repository.set_users(users)
+            return users
         else:
             print(f"Không thể lấy danh sách người dùng từ API admin. Đảm bảo bạn đang đăng nhập với quyền admin.")
             # Không quay lại API cũ vì API cũ không trả về tất cả người dùng cho admin
-            return []
+            return None
+    
+    def iter_all_users(self):
+        """Yield all users one by one while the list is downloading (admin permission)"""
+        for user_data in self.api_service.stream_list(Config.USER_ALL_URL):
+            user = User.from_json(user_data)
+            self.repository.put_user(user)
+            yield user
     
     def get_user_by_id(self, user_id):
         """Get a user by ID"""
         result = self.api_service.get(f"{Config.USERS_URL}/{user_id}")
         if result:
-            return User.from_json(result)
+            user = User.from_json(result)
+            self.repository.put_user(user)
+            return user
         return None
     
     def get_current_user_profile(self):
@@ -67,19 +91,26 @@ class UserController:
         """Create a new user"""
         result = self.api_service.post(Config.USERS_URL, user.to_json())
         if result:
-            return User.from_json(result)
+            created = User.from_json(result)
+            self.repository.put_user(created)
+            return created
         return None
     
     def update_user(self, user):
         """Update an existing user"""
         result = self.api_service.put(f"{Config.USERS_URL}/{user.user_id}", user.to_json())
         if result:
-            return User.from_json(result)
+            updated = User.from_json(result)
+            self.repository.put_user(updated if updated.user_id else user)
+            return updated
         return None
     
     def delete_user(self, user_id):
         """Delete a user"""
-        return self.api_service.delete(f"{Config.USERS_URL}/{user_id}")
+        result = self.api_service.delete(f"{Config.USERS_URL}/{user_id}")
+        if result:
+            self.repository.remove_user(user_id)
+        return result
     
     def validate_user(self, user):
         """Validate user data"""
@@ -109,5 +140,7 @@ class UserController:
         
         result = self.api_service.post(Config.USER_REGISTER_URL, registration_data)
         if result:
-            return User.from_json(result)
+            registered = User.from_json(result)
+            self.repository.put_user(registered)
+            return registered
         return None
\ No newline at end of file
@@ -2,6 +2,16 @@ import requests
 import json
 import os
 import time
+import base64
+import datetime
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.utils.response_cache import ResponseCache, CacheEntry
+from app.utils.single_flight import SingleFlight
+from app.utils.json_stream import iter_json_array
+from app.utils.snapshot_store import SnapshotStore
+from app.utils.request_metrics import RequestMetrics, TIMED_POOL_CLASSES, connect_timer
 from config.config import Config
 
 class ApiService:
@@ -30,9 +40,100 @@ class ApiService:
     
     def __init__(self):
         self.token = None
+        self.token_expires_at = None  # Thời điểm hết hạn (epoch giây) đọc từ JWT, None nếu không rõ
         self.token_path = Config.TOKEN_STORAGE
         self.user_data = None  # Lưu trữ thông tin người dùng trong phiên làm việc hiện tại
         # Đã loại bỏ việc tự động tải token cũ khi khởi tạo
+        
+        # Dùng chung một session để tái sử dụng kết nối TCP (keep-alive) giữa các request
+        self.session = self._create_session()
+        
+        # Thời gian từng request theo endpoint và nhật ký các request chậm
+        self.metrics = RequestMetrics()
+        
+        # Cache các response GET (TTL theo endpoint + xác thực lại bằng ETag/Last-Modified)
+        self.response_cache = ResponseCache(Config.API_CACHE_MAX_ENTRIES)
+        
+        # Gộp các GET giống hệt đang chạy đồng thời (nhiều màn hình cùng gọi get_all_users)
+        self.single_flight = SingleFlight()
+        
+        # Lưu response của các danh sách chính xuống đĩa để hiển thị ngay khi mở lại ứng dụng
+        self.snapshots = SnapshotStore(Config.API_SNAPSHOT_DIR, Config.API_SNAPSHOT_MAX_FILES)
+        
+        # Làm mới token trước khi hết hạn; lock đảm bảo chỉ một lần refresh chạy tại một thời điểm
+        self._refresh_lock = threading.Lock()
+        self._refresh_timer = None
+    
+    def _create_session(self):
+        """Create the shared HTTP session with a sized connection pool and retry policy"""
+        session = requests.Session()
+        
+        # Chỉ tự động thử lại các phương thức idempotent; lỗi kết nối (request chưa được gửi)
+        # được thử lại cho mọi phương thức
+        retry = Retry(
+            total=Config.API_RETRY_TOTAL,
+            backoff_factor=Config.API_RETRY_BACKOFF,
+            status_forcelist=Config.API_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=Config.API_POOL_CONNECTIONS,
+            pool_maxsize=Config.API_POOL_MAXSIZE,
+            max_retries=retry
+        )
+        # Kết nối đo thời gian mở (DNS + TCP + TLS) cho RequestMetrics
+        adapter.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    @staticmethod
+    def _endpoint_setting(url, settings, default):
+        """
+        Look up a per-endpoint setting
+        
+        Keys of `settings` are paths relative to API_BASE_URL; the longest key that
+        is the URL's path or a parent of it ("/exam" matches "/exam/my-exams" but
+        not "/exam-attendances") wins.
+        """
+        path = url[len(Config.API_BASE_URL):] if url.startswith(Config.API_BASE_URL) else url
+        path = path.split('?', 1)[0]
+        best_match = None
+        for prefix in settings:
+            base = prefix.rstrip('/')
+            if (path == base or path.startswith(base + '/')) and (best_match is None or len(prefix) > len(best_match)):
+                best_match = prefix
+        return settings[best_match] if best_match is not None else default
+    
+    def get_timeout(self, url):
+        """Get the (connect, read) timeout for an endpoint (Config.API_ENDPOINT_TIMEOUTS)"""
+        return self._endpoint_setting(url, Config.API_ENDPOINT_TIMEOUTS, Config.API_TIMEOUT)
+    
+    def get_connection_stats(self):
+        """
+        Connection reuse statistics of the session's pools, per host
+        
+        Returns:
+            dict: host -> {'connections': new TCP connections opened,
+                           'requests': requests sent,
+                           'reuse_ratio': share of requests sent on a reused connection}
+        """
+        stats = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                requests_sent = pool.num_requests
+                stats[host] = {
+                    'connections': pool.num_connections,
+                    'requests': requests_sent,
+                    'reuse_ratio': 1 - pool.num_connections / requests_sent if requests_sent else 0.0
+                }
+        return stats
     
     def _load_token(self):
         """Load token and user data from storage if exists"""
@@ -43,12 +144,98 @@ class ApiService:
         """Save token and user data to memory only"""
         # Chỉ lưu token và dữ liệu người dùng vào bộ nhớ, không lưu vào file
         self.token = token
+        self.token_expires_at = self._decode_token_expiry(token)
         if user_data:
             self.user_data = user_data
+        
+        self._schedule_refresh()
             
         # Thông báo về việc không còn lưu token vào file
         print("Token saved to memory only. Auto-login has been disabled.")
     
+    @staticmethod
+    def _decode_token_expiry(token):
+        """
+        Read the "exp" claim of a JWT without verifying it
+        
+        Returns:
+            float: Expiry as a Unix timestamp, or None if the token is not a JWT with "exp"
+        """
+        try:
+            payload = token.split('.')[1]
+            payload += '=' * (-len(payload) % 4)
+            claims = json.loads(base64.urlsafe_b64decode(payload))
+            return float(claims['exp'])
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+            return None
+    
+    def is_token_expired(self, margin=None):
+        """
+        Check the token expiry locally, without calling the server
+        
+        A token without a readable expiry is treated as not expired.
+        """
+        if not self.token:
+            return True
+        if self.token_expires_at is None:
+            return False
+        if margin is None:
+            margin = Config.TOKEN_EXPIRY_MARGIN
+        return time.time() + margin >= self.token_expires_at
+    
+    def has_valid_token(self):
+        """
+        Check whether there is a usable token, refreshing it if it has expired
+        
+        Tokens without a readable expiry are trusted until the server rejects
+        them (a 401 then triggers a refresh in _fetch).
+        """
+        if not self.token:
+            return False
+        if not self.is_token_expired():
+            return True
+        
+        # Timer không kịp làm mới (máy ngủ, mất mạng...): thử làm mới ngay
+        try:
+            return self.refresh_token(self.token)
+        except requests.RequestException as e:
+            print(f"Network error refreshing expired token: {e}")
+            return False
+    
+    def _schedule_refresh(self):
+        """(Re)start the background timer that refreshes the token before it expires"""
+        self._cancel_refresh()
+        if not self.token or self.token_expires_at is None:
+            return
+        
+        delay = max(0.0, self.token_expires_at - Config.TOKEN_REFRESH_LEAD_TIME - time.time())
+        self._start_refresh_timer(delay, self.token)
+    
+    def _start_refresh_timer(self, delay, token):
+        timer = threading.Timer(delay, self._on_refresh_timer, args=(token,))
+        timer.daemon = True
+        self._refresh_timer = timer
+        timer.start()
+    
+    def _cancel_refresh(self):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+    
+    def _on_refresh_timer(self, token):
+        if self.token != token:
+            return  # Đã đăng xuất hoặc token đã được làm mới
+        try:
+            if self.refresh_token(token):
+                print("Token refreshed before expiry")
+            else:
+                print("Scheduled token refresh was rejected")
+        except requests.RequestException as e:
+            # Thử lại khi token vẫn còn hạn; khi hết hạn, request tiếp theo sẽ làm mới
+            if self.token == token and not self.is_token_expired():
+                print(f"Network error refreshing token, retrying in {Config.TOKEN_REFRESH_RETRY_INTERVAL}s: {e}")
+                self._start_refresh_timer(Config.TOKEN_REFRESH_RETRY_INTERVAL, token)
+    
     def _get_headers(self):
         """Get headers for API requests"""
         headers = {'Content-Type': 'application/json'}
@@ -62,16 +249,17 @@ class ApiService:
         self.clear_token()
         
         try:
-            response = requests.post(
+            response = self._request(
+                'POST',
                 Config.AUTH_LOGIN,
                 json={'email': email, 'password': password},
                 headers={'Content-Type': 'application/json'},
-                timeout=10  # Timeout để không đợi quá lâu
+                timeout=self.get_timeout(Config.AUTH_LOGIN)  # Timeout để không đợi quá lâu
             )
             
             if response.status_code == 200:
                 data = response.json()
-                print(f"Login response: {data}")
+                print(f"Login succeeded for {email}")
                 # Theo tài liệu API: lấy token từ cấu trúc authentication
                 if 'authentication' in data and 'token' in data['authentication']:
                     token = data['authentication']['token']
@@ -95,9 +283,14 @@ class ApiService:
     def clear_token(self):
         """Xóa token khỏi bộ nhớ và file lưu trữ"""
         # Xóa token và user_data khỏi bộ nhớ
+        self._cancel_refresh()
         self.token = None
+        self.token_expires_at = None
         self.user_data = None
         
+        # Dữ liệu đã cache thuộc về người dùng trước
+        self.response_cache.clear()
+        
         # Xóa file token.json
         if os.path.exists(self.token_path):
             try:
@@ -111,9 +304,11 @@ class ApiService:
         try:
             # Thử gọi API logout nếu có token
             if self.token:
-                response = requests.post(
+                response = self._request(
+                    'POST',
                     Config.AUTH_LOGOUT,
-                    headers=self._get_headers()
+                    headers=self._get_headers(),
+                    timeout=self.get_timeout(Config.AUTH_LOGOUT)
                 )
         except Exception as e:
             print(f"Error calling logout API: {e}")
@@ -125,30 +320,44 @@ class ApiService:
         # Dù API có thành công hay không, vẫn trả về True vì đã xóa token cục bộ
         return True
     
-    def refresh_token(self):
-        """Refresh token if expired"""
-        response = requests.post(
-            Config.AUTH_REFRESH_TOKEN,
-            headers=self._get_headers()
-        )
+    def refresh_token(self, stale_token=None):
+        """
+        Refresh the token
         
-        if response.status_code == 200:
-            data = response.json()
-            # Theo tài liệu API mới: lấy accessToken
-            if 'accessToken' in data:
-                self._save_token(data['accessToken'])
-                return True
+        Concurrent callers are serialized: when `stale_token` (the token the caller
+        found expired or rejected) has already been replaced by another caller's
+        refresh, that result is used without calling the server again.
+        """
+        with self._refresh_lock:
+            if stale_token is not None and self.token != stale_token:
+                return self.token is not None
+            
+            response = self._request(
+                'POST',
+                Config.AUTH_REFRESH_TOKEN,
+                headers=self._get_headers(),
+                timeout=self.get_timeout(Config.AUTH_REFRESH_TOKEN)
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                # Theo tài liệu API mới: lấy accessToken
+                if 'accessToken' in data:
+                    self._save_token(data['accessToken'])
+                    return True
+                return False
             return False
-        return False
     
     def validate_token(self):
         """Validate if token is still valid"""
         if not self.token:
             return False
             
-        response = requests.get(
+        response = self._request(
+            'GET',
             Config.AUTH_VALIDATE_TOKEN,
-            headers=self._get_headers()
+            headers=self._get_headers(),
+            timeout=self.get_timeout(Config.AUTH_VALIDATE_TOKEN)
         )
         
         if response.status_code == 200:
@@ -156,58 +365,358 @@ class ApiService:
             return data.get('valid', False)
         return False
     
-    def get(self, url, params=None):
-        """Generic GET request"""
-        try:
-            print(f"\n=== GET request to: {url} ===")
-            # In ra headers để kiểm tra token authentication
+    def _fetch(self, method, url, params=None, json_data=None, extra_headers=None, stream=False):
+        """
+        Send one request with the current token
+        
+        A token about to expire is refreshed before sending. On 401 the token is
+        refreshed and the request retried once; the final response is returned
+        either way. Network errors are raised to the caller.
+        """
+        if self.token and self.is_token_expired():
+            # Timer chưa kịp làm mới: làm mới trước để không mất một lượt 401
+            try:
+                self.refresh_token(self.token)
+            except requests.RequestException as e:
+                print(f"Network error refreshing token: {e}")
+        
+        for attempt in range(2):
+            token = self.token
             headers = self._get_headers()
-            print(f"Headers: {headers}")
+            if extra_headers:
+                headers.update(extra_headers)
             
-            response = requests.get(
+            response = self._request(
+                method,
                 url,
                 params=params,
-                headers=headers
+                json=json_data,
+                headers=headers,
+                timeout=self.get_timeout(url),
+                stream=stream
             )
             
-            print(f"Response status: {response.status_code}")
+            if response.status_code != 401 or attempt == 1:
+                return response
             
-            if response.status_code == 401:  # Unauthorized
-                print("Unauthorized response (401). Attempting to refresh token...")
-                if self.refresh_token():
-                    print("Token refreshed successfully, retrying request...")
-                    return self.get(url, params)
+            if stream:
+                self._record_response(response)
+            response.close()
+            print("Unauthorized response (401). Attempting to refresh token...")
+            if not self.refresh_token(token):
                 print("Token refresh failed")
-                return None
+                return response
+            print("Token refreshed successfully, retrying request...")
+        return response
+    
+    def _request(self, method, url, **kwargs):
+        """
+        session.request, timed into self.metrics
+        
+        Streamed responses are recorded by _record_response once their body has been read.
+        """
+        connect_timer.reset()
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.metrics.record(method, url, None, time.perf_counter() - started, connect=connect_timer.take())
+            raise
+        response.timing = (method, url, started, connect_timer.take())
+        if not kwargs.get('stream'):
+            self._record_response(response)
+        return response
+    
+    def _record_response(self, response):
+        method, url, started, connect = response.timing
+        total = time.perf_counter() - started
+        ttfb = min(response.elapsed.total_seconds(), total)
+        body = response.request.body or b''
+        received = response.raw.tell() if hasattr(response.raw, 'tell') else len(response.content or b'')
+        self.metrics.record(
+            method, url, response.status_code, total,
+            connect=connect, ttfb=ttfb, download=total - ttfb,
+            request_bytes=len(body), response_bytes=received
+        )
+    
+    def get_request_stats(self):
+        """Latency statistics per endpoint, see RequestMetrics.get_stats"""
+        return self.metrics.get_stats()
+    
+    def get_slow_calls(self):
+        return self.metrics.get_slow_calls()
+    
+    def dump_metrics(self, path=None):
+        """
+        Write the request metrics (with cache, coalescing and connection statistics)
+        as JSON for analysis
+        
+        Returns:
+            str: Path of the written file
+        """
+        path = path or Config.API_METRICS_DUMP_PATH
+        report = {
+            'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'slow_call_threshold_ms': self.metrics.slow_threshold * 1000,
+            'endpoints': self.get_request_stats(),
+            'slow_calls': self.get_slow_calls(),
+            'cache': self.get_cache_stats(),
+            'coalescing': self.get_coalescing_stats(),
+            'connections': self.get_connection_stats()
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return path
+    
+    def get(self, url, params=None, use_cache=True, revalidate=False, from_snapshot=False):
+        """
+        Generic GET request
+        
+        Responses are cached for Config.API_CACHE_TTLS seconds per endpoint; stale
+        entries are revalidated with If-None-Match/If-Modified-Since. Pass
+        revalidate=True to revalidate even a fresh entry, use_cache=False to
+        always fetch from the server. from_snapshot=True returns the last
+        response saved on disk (Config.API_SNAPSHOT_MAX_AGE) without any request.
+        """
+        if from_snapshot:
+            return self.get_snapshot(url, params)[0]
+        
+        key = self.response_cache.make_key(url, params)
+        entry = self.response_cache.get(key) if use_cache else None
+        if entry is not None and entry.is_fresh() and not revalidate:
+            self.response_cache.record('hits')
+            return entry.json()
+        
+        # Identical GETs already in flight share that request's response
+        (json_data, content), shared = self.single_flight.do(
+            key, lambda: self._get_from_server(url, params, key, entry, use_cache)
+        )
+        if shared and content is not None:
+            return json.loads(content)  # Each caller gets its own copy
+        return json_data
+    
+    def _get_from_server(self, url, params, key, entry, use_cache):
+        """
+        Send the GET request for get(), revalidating `entry` if there is one
+        
+        Returns:
+            tuple: (parsed JSON, raw JSON bytes), or (None, None) on failure
+        """
+        generation = self.response_cache.generation
+        try:
+            print(f"\n=== GET request to: {url} ===")
+            
+            response = self._fetch(
+                'GET', url, params=params,
+                extra_headers=entry.conditional_headers() if entry is not None else None
+            )
+            
+            print(f"Response status: {response.status_code}")
+            ttl = self._endpoint_setting(url, Config.API_CACHE_TTLS, Config.API_CACHE_DEFAULT_TTL)
+            
+            if response.status_code == 304 and entry is not None:
+                # Dữ liệu không đổi: dùng lại bản đã cache
+                self.response_cache.record('revalidated')
+                entry.refresh(ttl)
+                if use_cache:
+                    self._touch_snapshot(url, key)
+                return entry.json(), entry.content
+            
+            if use_cache:
+                self.response_cache.record('misses')
+            
+            if response.status_code == 401:
+                return None, None
             
             if response.status_code == 200:
                 try:
                     json_data = response.json()
-                    return json_data
                 except json.JSONDecodeError:
                     print(f"Error decoding JSON response: {response.text}")
-                    return None
+                    return None, None
+                
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if use_cache and (ttl > 0 or etag or last_modified):
+                    self.response_cache.put(key, CacheEntry(response.content, etag, last_modified, ttl), generation)
+                if use_cache:
+                    # Truy vấn không dùng cache (vd. delta sync) không được lưu thành snapshot
+                    self._save_snapshot(url, key, response.content)
+                return json_data, response.content
             else:
                 print(f"API error: {response.status_code} - {response.text}")
-            return None
+            return None, None
         except Exception as e:
             print(f"Exception during GET request to {url}: {str(e)}")
             import traceback
             traceback.print_exc()
+            return None, None
+    
+    def stream_list(self, url, params=None, use_cache=True):
+        """
+        GET a JSON array and yield its elements while the body is downloading
+        
+        Uses the same response cache as get() (fresh entries are served locally,
+        stale ones revalidated), after waiting for a get() of the same list that
+        is already running. Errors are printed and end the iteration, like
+        get() returning None.
+        """
+        key = self.response_cache.make_key(url, params)
+        if use_cache:
+            self.single_flight.wait(key)  # get() đang chạy (vd. tải trước) sẽ lưu kết quả vào cache
+        entry = self.response_cache.get(key) if use_cache else None
+        if entry is not None and entry.is_fresh():
+            self.response_cache.record('hits')
+            yield from entry.json()
+            return
+        
+        response = None
+        generation = self.response_cache.generation
+        try:
+            print(f"\n=== Streaming GET request to: {url} ===")
+            response = self._fetch(
+                'GET', url, params=params,
+                extra_headers=entry.conditional_headers() if entry is not None else None,
+                stream=True
+            )
+            print(f"Response status: {response.status_code}")
+            ttl = self._endpoint_setting(url, Config.API_CACHE_TTLS, Config.API_CACHE_DEFAULT_TTL)
+            
+            if response.status_code == 304 and entry is not None:
+                self.response_cache.record('revalidated')
+                entry.refresh(ttl)
+                yield from entry.json()
+                return
+            
+            if use_cache:
+                self.response_cache.record('misses')
+            
+            if response.status_code != 200:
+                print(f"API error: {response.status_code} - {response.text}")
+                return
+            
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            chunks = response.iter_content(Config.API_STREAM_CHUNK_SIZE)
+            
+            # Giữ lại bytes thô chỉ khi response sẽ được cache
+            raw = None
+            if use_cache and (ttl > 0 or etag or last_modified):
+                raw = []
+                chunks = self._collect_chunks(chunks, raw)
+            
+            count = 0
+            for item in iter_json_array(chunks):
+                count += 1
+                yield item
+            print(f"Streamed {count} items from {url}")
+            
+            if raw is not None:
+                content = b''.join(raw)
+                self.response_cache.put(key, CacheEntry(content, etag, last_modified, ttl), generation)
+                self._save_snapshot(url, key, content)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error streaming GET request to {url}: {e}")
+        finally:
+            if response is not None:
+                self._record_response(response)
+                response.close()
+    
+    @staticmethod
+    def _collect_chunks(chunks, into):
+        for chunk in chunks:
+            into.append(chunk)
+            yield chunk
+    
+    def _snapshot_user(self):
+        """Snapshots are kept per user: their data depends on the user's role"""
+        if not self.user_data:
             return None
+        return (self.user_data.get('userId') or self.user_data.get('id') or self.user_data.get('user_id')
+                or self.user_data.get('email'))
     
-    def post(self, url, data):
-        """Generic POST request"""
-        response = requests.post(
-            url,
-            json=data,
-            headers=self._get_headers()
-        )
+    def _snapshot_max_age(self, url):
+        """Max age of the endpoint's snapshots in seconds, None if it is not snapshotted"""
+        return self._endpoint_setting(url, Config.API_SNAPSHOT_MAX_AGE, None)
+    
+    def _save_snapshot(self, url, key, content):
+        user = self._snapshot_user()
+        if user is not None and self._snapshot_max_age(url) is not None:
+            self.snapshots.save(user, key, content)
+    
+    def _touch_snapshot(self, url, key):
+        user = self._snapshot_user()
+        if user is not None and self._snapshot_max_age(url) is not None:
+            self.snapshots.touch(user, key)
+    
+    def get_snapshot(self, url, params=None):
+        """
+        Last response of a GET saved on disk for the current user
         
-        if response.status_code == 401:  # Unauthorized
-            if self.refresh_token():
-                return self.post(url, data)
+        Returns:
+            tuple: (parsed JSON, datetime the server last confirmed it), or (None, None)
+        """
+        user = self._snapshot_user()
+        max_age = self._snapshot_max_age(url)
+        if user is None or max_age is None:
+            return None, None
+        return self.snapshots.load(user, self.response_cache.make_key(url, params), max_age)
+    
+    def get_snapshot_time(self, url, params=None):
+        """When the saved response of a GET was last confirmed by the server (None if there is none)"""
+        user = self._snapshot_user()
+        if user is None or self._snapshot_max_age(url) is None:
             return None
+        return self.snapshots.saved_at(user, self.response_cache.make_key(url, params))
+    
+    def invalidate_cache(self, url):
+        """
+        Drop cached GET responses made stale by a write to this URL
+        (Config.API_CACHE_INVALIDATION, default: everything under the URL's first path segment)
+        """
+        path = url[len(Config.API_BASE_URL):] if url.startswith(Config.API_BASE_URL) else url
+        default = ['/' + path.split('?', 1)[0].strip('/').split('/')[0]]
+        for prefix in self._endpoint_setting(url, Config.API_CACHE_INVALIDATION, default):
+            self.response_cache.invalidate(Config.API_BASE_URL + prefix)
+    
+    def get_cache_stats(self):
+        """Hit/miss/revalidation counters and hit rate of the response cache"""
+        return self.response_cache.get_stats()
+    
+    def get_coalescing_stats(self):
+        """Number of GETs sent to the server vs. served by joining an identical request in flight"""
+        return self.single_flight.get_stats()
+    
+    def send(self, method, url, data=None, headers=None):
+        """
+        Send a request and return its outcome without interpreting it
+        
+        Returns:
+            tuple: (status code, parsed JSON body or None)
+        Raises:
+            requests.RequestException: If the server could not be reached
+        """
+        try:
+            response = self._fetch(method, url, json_data=data, extra_headers=headers)
+        finally:
+            if method != 'GET':
+                self.invalidate_cache(url)
+        
+        try:
+            body = response.json() if response.content else None
+        except ValueError:
+            body = None
+        return response.status_code, body
+    
+    def post(self, url, data):
+        """Generic POST request"""
+        try:
+            response = self._fetch('POST', url, json_data=data)
+        finally:
+            self.invalidate_cache(url)
         
         if response.status_code in [200, 201]:
             return response.json() if response.content else {'status': 'success'}
@@ -215,16 +724,10 @@ class ApiService:
     
     def put(self, url, data):
         """Generic PUT request"""
-        response = requests.put(
-            url,
-            json=data,
-            headers=self._get_headers()
-        )
-        
-        if response.status_code == 401:  # Unauthorized
-            if self.refresh_token():
-                return self.put(url, data)
-            return None
+        try:
+            response = self._fetch('PUT', url, json_data=data)
+        finally:
+            self.invalidate_cache(url)
         
         if response.status_code in [200, 204]:
             return response.json() if response.content else {'status': 'success'}
@@ -232,16 +735,11 @@ class ApiService:
     
     def delete(self, url):
         """Generic DELETE request"""
-        response = requests.delete(
-            url,
-            headers=self._get_headers()
-        )
-        
-        if response.status_code == 401:  # Unauthorized
-            if self.refresh_token():
-                return self.delete(url)
-            return None
+        try:
+            response = self._fetch('DELETE', url)
+        finally:
+            self.invalidate_cache(url)
         
         if response.status_code in [200, 204]:
             return {'status': 'success'}
-        return None
\ No newline at end of file
+        return None
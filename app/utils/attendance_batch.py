@@ -0,0 +1,152 @@
+"""
+Batch delivery of attendance submissions.
+Records are POSTed in chunks of Config.ATTENDANCE_BATCH_SIZE to the batch
+endpoint ({url}/batch), each with its own idempotency key. Backends without
+that endpoint (404/405/501) get parallel single POSTs instead, at most
+Config.ATTENDANCE_SUBMIT_WORKERS at a time, and are remembered as such.
+Every record gets its own SubmitOutcome.
+
+Batch request:  [{...attendance, "idempotencyKey": "..."}, ...]
+Batch response: {"results": [{"idempotencyKey": "...", "status": 201, "record": {...}}, ...]}
+                (a plain list of results or created records, in request order, is accepted too)
+"""
+
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.api_service import ApiService
+from config.config import Config
+
+# Delivery states
+PENDING = "pending"
+DELIVERED = "delivered"
+FAILED = "failed"  # Rejected by the backend, will not be retried
+
+def delivery_state(status):
+    """Delivery state of a submission the backend answered with `status` (None: no answer)"""
+    # 409: đã tồn tại trên máy chủ (lần gửi trước đã tới nơi), coi như đã gửi
+    if status in (200, 201, 409):
+        return DELIVERED
+    # Dữ liệu bị máy chủ từ chối, gửi lại cũng không thành công
+    if status is not None and 400 <= status < 500 and status not in (401, 408, 429):
+        return FAILED
+    return PENDING
+
+class SubmitOutcome:
+    """Result of delivering one record"""
+
+    def __init__(self, key, status=None, body=None, error=None):
+        self.key = key  # Idempotency key of the record
+        self.status = status  # HTTP status for this record, None if it got no answer
+        self.body = body  # Server's answer for this record (created record or error details)
+        self.error = error  # Network error, None if the record was answered or not sent at all
+
+    @property
+    def state(self):
+        return delivery_state(self.status)
+
+    def __repr__(self):
+        return f"SubmitOutcome(key={self.key}, status={self.status}, state={self.state}, error={self.error})"
+
+class AttendanceBatchSender:
+    """Deliver attendance records in batch requests, or in parallel one by one"""
+
+    def __init__(self):
+        # None: chưa biết máy chủ có endpoint batch không; False: gửi từng bản ghi song song
+        self.batch_supported = None
+        self._executor = ThreadPoolExecutor(max_workers=Config.ATTENDANCE_SUBMIT_WORKERS,
+                                            thread_name_prefix="attendance-submit")
+
+    def send(self, url, items):
+        """
+        Deliver (idempotency key, payload) pairs to `url`
+
+        Stops at the first network error: the records after it are returned
+        unsent (no status, no error).
+
+        Returns:
+            list: SubmitOutcome for every item, in the same order
+        """
+        outcomes = []
+        size = Config.ATTENDANCE_BATCH_SIZE
+        for start in range(0, len(items), size):
+            chunk = items[start:start + size]
+            results = None
+            try:
+                if self.batch_supported is not False:
+                    results = self._send_batch(url, chunk)
+                if results is None:
+                    results = self._send_singles(url, chunk)
+            except requests.RequestException as e:
+                results = [SubmitOutcome(key, error=f"Network error: {e}") for key, _ in chunk]
+            outcomes.extend(results)
+            if any(outcome.error for outcome in results):
+                break
+        outcomes.extend(SubmitOutcome(key) for key, _ in items[len(outcomes):])
+        return outcomes
+
+    def _send_batch(self, url, chunk):
+        """One batch request; None if the chunk has to be sent record by record"""
+        body = [dict(payload, idempotencyKey=key) for key, payload in chunk]
+        status, result = ApiService.get_instance().send('POST', f"{url}/batch", body)
+
+        if status in (404, 405, 501):
+            print("Attendance batch endpoint not available, sending records one by one")
+            self.batch_supported = False
+            return None
+        if status in (200, 201, 207):
+            self.batch_supported = True
+            return self._match_results(chunk, result)
+        if delivery_state(status) == FAILED:
+            # Cả lô bị từ chối: gửi riêng từng bản ghi để chỉ loại bỏ bản ghi không hợp lệ
+            print(f"Attendance batch rejected with HTTP {status}, sending its records one by one")
+            return None
+        # Lỗi máy chủ/quá tải: cả lô gửi lại sau
+        return [SubmitOutcome(key, status, result) for key, _ in chunk]
+
+    @staticmethod
+    def _match_results(chunk, result):
+        """Per-record outcomes of a batch response, matched by idempotency key or position"""
+        if isinstance(result, dict):
+            result = result.get('results')
+        if not isinstance(result, list):
+            print(f"Unexpected attendance batch response: {type(result).__name__}")
+            result = []
+
+        by_key = {entry.get('idempotencyKey'): entry for entry in result
+                  if isinstance(entry, dict) and entry.get('idempotencyKey')}
+        outcomes = []
+        for index, (key, _) in enumerate(chunk):
+            entry = by_key.get(key) if by_key else (result[index] if index < len(result) else None)
+            if not isinstance(entry, dict):
+                # Máy chủ không báo kết quả: coi như chưa gửi, lần sau gửi lại với cùng idempotency key
+                outcomes.append(SubmitOutcome(key))
+            elif 'status' in entry:
+                outcomes.append(SubmitOutcome(key, entry['status'], entry.get('record', entry)))
+            else:
+                outcomes.append(SubmitOutcome(key, 201, entry))  # Danh sách bản ghi đã tạo
+        return outcomes
+
+    def _send_singles(self, url, chunk):
+        """Single POSTs, ATTENDANCE_SUBMIT_WORKERS at a time"""
+        api = ApiService.get_instance()
+        unreachable = threading.Event()
+
+        def post(item):
+            key, payload = item
+            if unreachable.is_set():
+                return SubmitOutcome(key)
+            try:
+                status, body = api.send('POST', url, payload, headers={'Idempotency-Key': key})
+            except requests.RequestException as e:
+                unreachable.set()
+                return SubmitOutcome(key, error=f"Network error: {e}")
+            return SubmitOutcome(key, status, body)
+
+        if len(chunk) == 1:
+            return [post(chunk[0])]
+        try:
+            return list(self._executor.map(post, chunk))
+        except RuntimeError:
+            # Ứng dụng đang thoát (executor đã đóng): để lại cho lần gửi sau
+            return [SubmitOutcome(key) for key, _ in chunk]
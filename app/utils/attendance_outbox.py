@@ -0,0 +1,330 @@
+"""
+Durable outbox for attendance submissions.
+Attendance writes are stored locally (SQLite) with an idempotency key and
+acknowledged at once; a background flusher delivers them to the backend
+(in batch requests when it supports them, see AttendanceBatchSender),
+retrying with exponential backoff while it is slow or unreachable.
+Delivery state changes are published on the event bus (ATTENDANCE_DELIVERY).
+"""
+
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+import traceback
+import uuid
+from app.utils.attendance_batch import AttendanceBatchSender, PENDING, DELIVERED, FAILED
+from app.utils.datetime_utils import format_datetime_for_api
+from app.utils.event_bus import EventBus, ATTENDANCE_DELIVERY
+from config.config import Config
+
+class AttendanceOutbox:
+    """Local write-ahead queue of attendance submissions with a background flusher"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = AttendanceOutbox()
+        return cls._instance
+
+    def __init__(self, db_path=None, start_flusher=True):
+        self.db_path = db_path or Config.ATTENDANCE_OUTBOX_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+        self.event_bus = EventBus.get_instance()
+        self.sender = AttendanceBatchSender()
+        self._in_flight = set()  # Keys being sent by flush (payload must not change meanwhile)
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        # start_flusher=False: chỉ gửi khi gọi flush() (dùng cho kiểm thử)
+        self._flusher = None
+        if start_flusher:
+            self._flusher = threading.Thread(target=self._flush_loop, name="attendance-outbox", daemon=True)
+            self._flusher.start()
+
+    def _init_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS attendance_outbox (
+                    idempotency_key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    user_id TEXT,
+                    exam_id TEXT,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at TEXT NOT NULL,
+                    delivered_at TEXT,
+                    response TEXT
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_attendance_outbox_due ON attendance_outbox (state, next_attempt_at)"
+            )
+
+    def enqueue(self, url, payload, user_id=None, exam_id=None, idempotency_key=None):
+        """
+        Store an attendance submission for delivery and return its idempotency key
+
+        A submission still waiting for the same user and exam is reused instead of
+        queueing a second one: as is when the payload is the same (the proctor
+        confirms twice), with the new payload if it was never sent (e.g. a
+        CCCD/face-verified mark after a manual one). Once sent, the backend may
+        already have the old payload under its key, so a different payload is
+        queued separately. Pass the idempotency_key of a submission already
+        sent once, so the backend can recognise it if that attempt arrived.
+        """
+        payload_json = json.dumps(payload, ensure_ascii=False)
+        with self._lock, self._conn:
+            if user_id and exam_id:
+                rows = self._conn.execute(
+                    """
+                    SELECT idempotency_key, url, payload, attempts FROM attendance_outbox
+                    WHERE user_id = ? AND exam_id = ? AND state = ?
+                    ORDER BY created_at DESC
+                    """,
+                    (user_id, exam_id, PENDING)
+                ).fetchall()
+                for row in rows:
+                    if row['url'] == url and row['payload'] == payload_json:
+                        return row['idempotency_key']
+                for row in rows:
+                    if row['attempts'] == 0 and row['idempotency_key'] not in self._in_flight:
+                        self._conn.execute(
+                            "UPDATE attendance_outbox SET url = ?, payload = ? WHERE idempotency_key = ?",
+                            (url, payload_json, row['idempotency_key'])
+                        )
+                        self._wakeup.set()
+                        return row['idempotency_key']
+
+            key = idempotency_key or str(uuid.uuid4())
+            self._conn.execute(
+                """
+                INSERT INTO attendance_outbox
+                    (idempotency_key, url, payload, user_id, exam_id, state, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, url, payload_json, user_id, exam_id, PENDING, format_datetime_for_api())
+            )
+
+        self.event_bus.publish(ATTENDANCE_DELIVERY, key, PENDING, user_id, exam_id)
+        self._wakeup.set()
+        return key
+
+    def get_entries(self, states=(PENDING, FAILED)):
+        """Get queued submissions in the given states, oldest first"""
+        placeholders = ", ".join("?" for _ in states)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM attendance_outbox WHERE state IN ({placeholders}) ORDER BY created_at",
+                tuple(states)
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def get_entry(self, key):
+        """Get one queued submission by its idempotency key (None if unknown)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM attendance_outbox WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def get_state(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM attendance_outbox WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        return row['state'] if row else None
+
+    def get_stats(self):
+        """Number of submissions per delivery state"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) AS count FROM attendance_outbox GROUP BY state"
+            ).fetchall()
+        return {row['state']: row['count'] for row in rows}
+
+    def retry_failed(self):
+        """Queue rejected submissions again (e.g. after fixing data on the server)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE attendance_outbox SET state = ?, next_attempt_at = 0 WHERE state = ?",
+                (PENDING, FAILED)
+            )
+        self._wakeup.set()
+
+    def flush_now(self):
+        """Wake the flusher without waiting for the next poll"""
+        self._wakeup.set()
+
+    def close(self):
+        """Stop the flusher and close the database (queued submissions stay for the next start)"""
+        self._closed.set()
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_entry(row):
+        return {
+            'idempotency_key': row['idempotency_key'],
+            'url': row['url'],
+            'payload': json.loads(row['payload']),
+            'user_id': row['user_id'],
+            'exam_id': row['exam_id'],
+            'state': row['state'],
+            'attempts': row['attempts'],
+            'last_error': row['last_error'],
+            'created_at': row['created_at'],
+            'delivered_at': row['delivered_at'],
+            'response': json.loads(row['response']) if row['response'] else None
+        }
+
+    def _due_entries(self):
+        """Pending submissions due for delivery, marked in flight until flush has sent them"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT * FROM attendance_outbox
+                WHERE state = ? AND next_attempt_at <= ?
+                ORDER BY created_at LIMIT ?
+                """,
+                (PENDING, time.time(), Config.ATTENDANCE_OUTBOX_BATCH_SIZE)
+            ).fetchall()
+            self._in_flight.update(row['idempotency_key'] for row in rows)
+        return [self._row_to_entry(row) for row in rows]
+
+    def _next_wait(self):
+        """Seconds until the next pending submission is due (None if there is none)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) AS due FROM attendance_outbox WHERE state = ?", (PENDING,)
+            ).fetchone()
+        if row['due'] is None:
+            return None
+        return max(0.0, row['due'] - time.time())
+
+    def _flush_loop(self):
+        """Deliver due submissions in batches until the process exits"""
+        failures = 0
+        while not self._closed.is_set():
+            if failures:
+                # Lỗi ở lượt trước (vd. lỗi SQLite): chờ tăng dần thay vì thử lại liên tục
+                timeout = min(Config.ATTENDANCE_OUTBOX_MAX_BACKOFF, Config.ATTENDANCE_OUTBOX_BASE_BACKOFF * (2 ** (failures - 1)))
+            else:
+                wait = self._next_wait()
+                timeout = Config.ATTENDANCE_OUTBOX_POLL_INTERVAL if wait is None else min(wait, Config.ATTENDANCE_OUTBOX_POLL_INTERVAL)
+            if self._wakeup.wait(timeout):
+                # Được đánh thức bởi một lần điểm danh: chờ thêm chút để các lần điểm danh liền nhau đi cùng một lô
+                time.sleep(Config.ATTENDANCE_OUTBOX_COALESCE_DELAY)
+            self._wakeup.clear()
+            if self._closed.is_set():
+                break
+
+            try:
+                self.flush()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                print(f"Error flushing attendance outbox ({failures} in a row): {e}")
+                traceback.print_exc()
+
+    def flush(self):
+        """Deliver one batch of due submissions, returns the number delivered"""
+        entries = self._due_entries()
+        delivered = 0
+
+        by_url = {}
+        for entry in entries:
+            by_url.setdefault(entry['url'], []).append(entry)
+
+        applied = set()
+        try:
+            for url, group in by_url.items():
+                outcomes = self.sender.send(url, [(entry['idempotency_key'], entry['payload']) for entry in group])
+                for entry, outcome in zip(group, outcomes):
+                    if self._apply_outcome(entry, outcome):
+                        delivered += 1
+                    applied.add(entry['idempotency_key'])
+        except Exception as e:
+            # Lỗi giữa chừng: các bản ghi chưa ghi nhận kết quả chờ như khi gửi lỗi, không được gửi lại ngay
+            for entry in entries:
+                if entry['idempotency_key'] not in applied:
+                    self._schedule_retry(entry, f"Flush error: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(entry['idempotency_key'] for entry in entries)
+
+        if delivered:
+            print(f"Delivered {delivered} queued attendance submission(s)")
+        return delivered
+
+    def _apply_outcome(self, entry, outcome):
+        """Record the delivery outcome of a queued submission, True if it was delivered"""
+        key = entry['idempotency_key']
+        state = outcome.state
+        if state == DELIVERED:
+            self._mark(key, DELIVERED, response=outcome.body)
+            self.event_bus.publish(ATTENDANCE_DELIVERY, key, DELIVERED, entry['user_id'], entry['exam_id'])
+            return True
+        if state == FAILED:
+            self._mark(key, FAILED, error=f"HTTP {outcome.status}: {outcome.body}")
+            self.event_bus.publish(ATTENDANCE_DELIVERY, key, FAILED, entry['user_id'], entry['exam_id'])
+            print(f"Attendance submission {key} rejected with HTTP {outcome.status}")
+        elif outcome.error:
+            # Backend unreachable: back off (the submissions after it were not sent)
+            self._schedule_retry(entry, outcome.error)
+        elif outcome.status is not None:
+            self._schedule_retry(entry, f"HTTP {outcome.status}")
+        else:
+            # Không được gửi (máy chủ không truy cập được) hoặc máy chủ không báo kết quả: cùng chờ như bản ghi lỗi
+            self._schedule_retry(entry, "not attempted: backend unreachable")
+        return False
+
+    def _mark(self, key, state, response=None, error=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE attendance_outbox
+                SET state = ?, attempts = attempts + 1, last_error = ?, delivered_at = ?, response = ?
+                WHERE idempotency_key = ?
+                """,
+                (
+                    state,
+                    error,
+                    format_datetime_for_api() if state == DELIVERED else None,
+                    json.dumps(response, ensure_ascii=False) if response is not None else None,
+                    key
+                )
+            )
+
+    def _schedule_retry(self, entry, error):
+        """Exponential backoff with jitter, capped at ATTENDANCE_OUTBOX_MAX_BACKOFF"""
+        attempts = entry['attempts'] + 1
+        backoff = min(Config.ATTENDANCE_OUTBOX_MAX_BACKOFF, Config.ATTENDANCE_OUTBOX_BASE_BACKOFF * (2 ** (attempts - 1)))
+        backoff *= random.uniform(0.8, 1.2)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE attendance_outbox SET attempts = ?, next_attempt_at = ?, last_error = ?
+                WHERE idempotency_key = ?
+                """,
+                (attempts, time.time() + backoff, error, entry['idempotency_key'])
+            )
+        print(f"Attendance submission {entry['idempotency_key']} not delivered ({error}), retrying in {backoff:.1f}s")
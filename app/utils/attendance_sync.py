@@ -0,0 +1,229 @@
+"""
+Delta sync of attendance records.
+Keeps a local copy of the attendance records of each exam and, on every
+sync, asks the backend only for the records changed since the last one
+(high-water mark, `updatedSince`). Changes are merged by record ID and
+returned as a SyncResult so views update only the rows that changed.
+Servers that cannot answer delta queries are handled by diffing the
+per-exam list (revalidated with its ETag) against the local copy.
+"""
+
+import datetime
+import threading
+import time
+from app.models.exam_attendance import ExamAttendance
+from app.utils.api_service import ApiService
+from app.utils.pagination import page_params, parse_page
+from config.config import Config
+
+def _record_id(data):
+    return data.get('id') or data.get('attendanceId')
+
+class SyncResult:
+    """Outcome of one sync of an exam's attendance records"""
+
+    def __init__(self, exam_id, changed=None, removed=None, full=False, total=0):
+        self.exam_id = exam_id
+        self.changed = changed or []  # ExamAttendance added or updated since the last sync
+        self.removed = removed or []  # IDs of records deleted since the last sync
+        self.full = full  # True for the first sync of the exam: `changed` holds every record
+        self.total = total  # Number of records in the local copy after the sync
+
+    @property
+    def has_changes(self):
+        return bool(self.changed or self.removed)
+
+    def __repr__(self):
+        return (f"SyncResult(exam_id={self.exam_id}, changed={len(self.changed)}, "
+                f"removed={len(self.removed)}, full={self.full}, total={self.total})")
+
+class _Scope:
+    """Local copy of one exam's records"""
+
+    def __init__(self):
+        self.raw = {}  # record ID -> JSON dict as last received
+        self.records = {}  # record ID -> ExamAttendance
+        self.high_water_mark = None  # Server time of the last sync (None = never synced)
+        self.synced = False
+        self.prefetched_at = None  # time.monotonic() of a prefetch not yet shown by a view
+        self.lock = threading.Lock()
+
+class AttendanceSync:
+    """Local copies of attendance records kept up to date with delta queries"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = AttendanceSync()
+        return cls._instance
+
+    def __init__(self):
+        self.api_service = ApiService.get_instance()
+        self._scopes = {}  # exam_id (None = every exam) -> _Scope
+        self._lock = threading.Lock()
+        # None: chưa biết máy chủ có hỗ trợ updatedSince không; False: so sánh với danh sách đầy đủ
+        self.server_delta = None
+        self.stats = {'syncs': 0, 'delta_syncs': 0, 'records_received': 0, 'records_changed': 0}
+
+    def _scope(self, exam_id):
+        with self._lock:
+            scope = self._scopes.get(exam_id)
+            if scope is None:
+                scope = self._scopes[exam_id] = _Scope()
+            return scope
+
+    def get_records(self, exam_id=None):
+        """Records of the local copy (as of the last sync)"""
+        scope = self._scope(exam_id)
+        with scope.lock:
+            return list(scope.records.values())
+
+    def reset(self, exam_id=None):
+        """Forget the local copy, the next sync downloads everything again"""
+        with self._lock:
+            self._scopes.pop(exam_id, None)
+
+    def sync(self, exam_id=None, prefetch=False):
+        """
+        Bring the local copy of an exam's records up to date
+
+        With prefetch=True the sync warms the copy for a view opened later: the
+        next sync within Config.PREFETCH_MAX_AGE uses it without a request
+        (waiting for the prefetch if it is still running).
+
+        Returns:
+            SyncResult, or None if the backend could not be reached
+        """
+        scope = self._scope(exam_id)
+        with scope.lock:
+            prefetched_at, scope.prefetched_at = scope.prefetched_at, None
+            if not prefetch and prefetched_at is not None and time.monotonic() - prefetched_at < Config.PREFETCH_MAX_AGE:
+                # Vừa được tải trước: dùng ngay bản sao cục bộ
+                return SyncResult(exam_id, total=len(scope.records))
+
+            fetched = False
+            if self.server_delta is not False:
+                fetched = self._fetch_changes(exam_id, scope.high_water_mark)
+                if fetched is None:
+                    return None
+
+            if fetched is False:
+                items = self._fetch_snapshot(exam_id)
+                if items is None:
+                    return None
+                result = self._merge(scope, exam_id, items, snapshot=True)
+            else:
+                items, deleted, high_water_mark = fetched
+                result = self._merge(scope, exam_id, items, deleted, snapshot=not scope.synced)
+                scope.high_water_mark = high_water_mark
+                if not result.full:
+                    self.stats['delta_syncs'] += 1
+
+            scope.synced = True
+            if prefetch:
+                scope.prefetched_at = time.monotonic()
+            self.stats['syncs'] += 1
+            self.stats['records_received'] += len(items)
+            self.stats['records_changed'] += len(result.changed) + len(result.removed)
+            return result
+
+    def _fetch_changes(self, exam_id, since):
+        """
+        Query the records changed since `since`, following pages
+
+        Returns:
+            tuple: (items, deleted IDs, new high-water mark); False if the server
+                   does not support delta queries; None on errors
+        """
+        started = datetime.datetime.now(datetime.timezone.utc)
+        filters = {}
+        if exam_id is not None:
+            filters['examId'] = exam_id
+        if since is not None:
+            filters['updatedSince'] = since
+
+        items, deleted = [], []
+        server_time = None
+        cursor = None
+        while True:
+            params = dict(filters)
+            params.update(page_params(Config.ATTENDANCE_SYNC_PAGE_SIZE, cursor))
+            result = self.api_service.get(Config.ATTENDANCE_URL, params=params, use_cache=False)
+            if result is None:
+                return None
+
+            parsed = parse_page(result, Config.ATTENDANCE_SYNC_PAGE_SIZE, cursor)
+            if parsed is None:
+                # Máy chủ bỏ qua tham số (trả về cả danh sách): không hỗ trợ delta
+                print("Attendance endpoint does not support delta queries, diffing full lists")
+                self.server_delta = False
+                return False
+
+            page_items, cursor, _ = parsed
+            items.extend(page_items)
+            deleted.extend(result.get('deleted') or [])
+            # Mốc thời gian lấy từ trang đầu tiên: thay đổi xảy ra trong lúc đọc các trang sau sẽ được lấy lại lần sau
+            if server_time is None:
+                server_time = result.get('serverTime')
+            if cursor is None:
+                break
+
+        high_water_mark = server_time or max((data.get('updatedAt') for data in items if data.get('updatedAt')), default=None)
+        if high_water_mark is None:
+            if since is None and not items:
+                # Chưa có bản ghi nào: dùng giờ máy trừ khoảng chồng lấn
+                high_water_mark = (started - datetime.timedelta(seconds=Config.ATTENDANCE_SYNC_OVERLAP)).isoformat()
+            elif since is not None:
+                high_water_mark = since
+            else:
+                print("Attendance records carry no updatedAt/serverTime, diffing full lists")
+                self.server_delta = False
+                return items, deleted, None
+
+        self.server_delta = True
+        return items, deleted, high_water_mark
+
+    def _fetch_snapshot(self, exam_id):
+        """Whole list of the scope (ETag revalidation keeps unchanged lists cheap)"""
+        if exam_id is not None:
+            return self.api_service.get(f"{Config.ATTENDANCE_URL}/exam/{exam_id}", revalidate=True)
+        return self.api_service.get(Config.ATTENDANCE_URL, revalidate=True)
+
+    @staticmethod
+    def _merge(scope, exam_id, items, deleted=(), snapshot=False):
+        """
+        Merge received records into the local copy by ID
+
+        With snapshot=True, `items` is the complete list: local records missing
+        from it are removed.
+        """
+        first = not scope.synced
+        changed = []
+        seen = set()
+        for data in items:
+            record_id = _record_id(data)
+            if record_id is None:
+                continue
+            seen.add(record_id)
+            if scope.raw.get(record_id) == data:
+                continue
+            scope.raw[record_id] = data
+            attendance = ExamAttendance.from_json(data)
+            scope.records[record_id] = attendance
+            changed.append(attendance)
+
+        removed = [record_id for record_id in deleted if record_id in scope.raw]
+        if snapshot:
+            removed.extend(record_id for record_id in scope.raw if record_id not in seen)
+        for record_id in removed:
+            scope.raw.pop(record_id, None)
+            scope.records.pop(record_id, None)
+
+        if first:
+            changed = list(scope.records.values())
+        return SyncResult(exam_id, changed, removed, full=first, total=len(scope.records))
+
+    def get_stats(self):
+        """Sync counters: records received vs. records that actually changed"""
+        return dict(self.stats)
@@ -0,0 +1,189 @@
+"""
+Local SQLite store for CCCD receipts and face verification results.
+Keeps scanned CCCD data across application restarts so candidates don't
+have to re-scan after a crash.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+from config.config import Config
+
+class CCCDStore:
+    """Durable store (SQLite, WAL mode) for received CCCD data"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = CCCDStore()
+        return cls._instance
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Config.CCCD_STORE_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        # Một kết nối dùng chung cho mọi luồng (socket, encoding, UI), được bảo vệ bằng lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        """Create tables and indexes if they don't exist"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cccd_receipts (
+                    citizen_id TEXT NOT NULL,
+                    exam_id TEXT NOT NULL DEFAULT '',
+                    image_path TEXT NOT NULL,
+                    received_at TEXT NOT NULL,
+                    raw_data TEXT,
+                    face_encodings BLOB,
+                    is_match INTEGER,
+                    confidence REAL,
+                    verification_message TEXT,
+                    verified_at TEXT,
+                    PRIMARY KEY (citizen_id, exam_id)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cccd_receipts_exam ON cccd_receipts (exam_id, received_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cccd_receipts_received ON cccd_receipts (received_at)"
+            )
+
+    @staticmethod
+    def _encode_encodings(encodings):
+        """Serialize a list of face encodings to bytes (None means not computed yet)"""
+        if encodings is None:
+            return None
+        if len(encodings) == 0:
+            return b""
+        return np.asarray(encodings, dtype=np.float64).tobytes()
+
+    @staticmethod
+    def _decode_encodings(blob):
+        """Deserialize face encodings stored by _encode_encodings"""
+        if blob is None:
+            return None
+        if len(blob) == 0:
+            return []
+        return list(np.frombuffer(blob, dtype=np.float64).reshape(-1, 128))
+
+    def _row_to_record(self, row):
+        """Convert a database row to the receipt format used by CCCDIngestPipeline"""
+        verification = None
+        if row['verified_at']:
+            verification = {
+                'is_match': bool(row['is_match']),
+                'confidence': row['confidence'],
+                'message': row['verification_message'],
+                'verified_at': row['verified_at']
+            }
+
+        return {
+            'citizenId': row['citizen_id'],
+            'examId': row['exam_id'] or None,
+            'image_path': row['image_path'],
+            'timestamp': row['received_at'],
+            'raw_data': json.loads(row['raw_data']) if row['raw_data'] else {},
+            'face_encodings': self._decode_encodings(row['face_encodings']),
+            'verification': verification
+        }
+
+    def save_receipt(self, record):
+        """Insert or replace a CCCD receipt (resets cached encodings and verification)"""
+        # Không lưu ảnh base64 vào DB, ảnh đã được ghi ra file
+        raw_data = {k: v for k, v in record.get('raw_data', {}).items() if k != 'faceImage'}
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cccd_receipts
+                    (citizen_id, exam_id, image_path, received_at, raw_data)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    record['citizenId'],
+                    record.get('examId') or '',
+                    record['image_path'],
+                    record['timestamp'],
+                    json.dumps(raw_data, ensure_ascii=False)
+                )
+            )
+
+    def save_encodings(self, citizen_id, exam_id, image_path, encodings):
+        """
+        Cache the face encodings computed from image_path for a receipt
+
+        Nothing is written if the receipt has been replaced by a newer scan
+        (different image) while the encoding was running.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE cccd_receipts SET face_encodings = ?
+                WHERE citizen_id = ? AND exam_id = ? AND image_path = ?
+                """,
+                (self._encode_encodings(encodings), citizen_id, exam_id or '', image_path)
+            )
+
+    def save_verification(self, citizen_id, exam_id, result, verified_at):
+        """Store the outcome of a face verification for a receipt"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE cccd_receipts
+                SET is_match = ?, confidence = ?, verification_message = ?, verified_at = ?
+                WHERE citizen_id = ? AND exam_id = ?
+                """,
+                (
+                    1 if result.get('is_match') else 0,
+                    float(result.get('confidence', 0.0)),
+                    result.get('message'),
+                    verified_at,
+                    citizen_id,
+                    exam_id or ''
+                )
+            )
+
+    def get_receipt(self, citizen_id, exam_id=None):
+        """Get the latest receipt for a citizen ID (optionally for a specific exam)"""
+        with self._lock:
+            if exam_id is None:
+                row = self._conn.execute(
+                    "SELECT * FROM cccd_receipts WHERE citizen_id = ? ORDER BY received_at DESC LIMIT 1",
+                    (citizen_id,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT * FROM cccd_receipts WHERE citizen_id = ? AND exam_id = ?",
+                    (citizen_id, exam_id or '')
+                ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def get_receipts_since(self, received_after, exam_id=None):
+        """Get receipts received after the given ISO timestamp, oldest first"""
+        with self._lock:
+            if exam_id is None:
+                rows = self._conn.execute(
+                    "SELECT * FROM cccd_receipts WHERE received_at >= ? ORDER BY received_at",
+                    (received_after,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM cccd_receipts WHERE exam_id = ? AND received_at >= ? ORDER BY received_at",
+                    (exam_id or '', received_after)
+                ).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
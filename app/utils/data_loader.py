@@ -0,0 +1,168 @@
+"""
+Concurrent data loading for views.
+Runs independent controller calls on a shared thread pool and delivers the
+joined results to the GUI thread through a Qt signal, so a screen waits for
+its slowest call instead of the sum of all of them.
+StreamLoader does the same for one long list, delivering it in batches as
+the items arrive.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+from config.config import Config
+
+class DataLoader(QObject):
+    """
+    Load several independent pieces of data at once
+
+    Usage:
+        self.loader = DataLoader(self)
+        self.loader.loaded.connect(self.on_data_loaded)
+        self.loader.load({
+            'users': self.user_controller.get_all_users,
+            'exams': self.exam_controller.get_all_exams
+        })
+
+    `loaded` is emitted once on the GUI thread with {name: result}; a call that
+    raised has None as its result. Calling load() again before the previous
+    load finished discards the previous results.
+    """
+
+    loaded = pyqtSignal(dict)
+    _finished = pyqtSignal(int, dict)
+
+    # Dùng chung cho mọi view; số luồng không vượt quá pool kết nối của ApiService
+    _executor = ThreadPoolExecutor(max_workers=Config.DATA_LOADER_WORKERS, thread_name_prefix="data-loader")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generation = 0
+        self.is_loading = False
+        self.last_duration = None  # Seconds taken by the last completed load
+
+        # Emitted from a worker thread, delivered to _on_finished on the GUI thread
+        self._finished.connect(self._on_finished)
+
+    def load(self, calls):
+        """Start the calls (dict name -> callable without arguments) concurrently"""
+        self._generation += 1
+        generation = self._generation
+        self.is_loading = True
+
+        if not calls:
+            self._finished.emit(generation, {})
+            return
+
+        results = {}
+        remaining = [len(calls)]
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def run(name, func):
+            try:
+                result = func()
+            except Exception as e:
+                print(f"Error loading '{name}': {e}")
+                result = None
+
+            with lock:
+                results[name] = result
+                remaining[0] -= 1
+                done = remaining[0] == 0
+
+            if done:
+                self.last_duration = time.perf_counter() - started
+                try:
+                    self._finished.emit(generation, results)
+                except RuntimeError:
+                    pass  # The view was closed while loading
+
+        for name, func in calls.items():
+            self._executor.submit(run, name, func)
+
+    def _on_finished(self, generation, results):
+        if generation != self._generation:
+            return  # Superseded by a newer load
+        self.is_loading = False
+        self.loaded.emit(results)
+
+class StreamLoader(QObject):
+    """
+    Feed the items of a generator to the GUI thread in batches as they arrive
+
+    Usage:
+        self.user_stream = StreamLoader(self)
+        self.user_stream.batch_loaded.connect(self.append_users)
+        self.user_stream.finished.connect(self.on_users_loaded)
+        self.user_stream.load(self.user_controller.iter_all_users)
+
+    `batch_loaded` carries at most Config.STREAM_BATCH_SIZE items and is
+    emitted at least every Config.STREAM_BATCH_INTERVAL seconds while items
+    keep arriving; `finished` carries the total number of items. Calling
+    load() again or cancel() discards the batches of the previous load.
+    """
+
+    batch_loaded = pyqtSignal(list)
+    finished = pyqtSignal(int)
+    _batch = pyqtSignal(int, list)
+    _done = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generation = 0
+        self.is_loading = False
+        self.last_duration = None
+
+        self._batch.connect(self._on_batch)
+        self._done.connect(self._on_done)
+
+    def load(self, make_iterator):
+        """Start iterating make_iterator() on the shared DataLoader pool"""
+        self._generation += 1
+        generation = self._generation
+        self.is_loading = True
+        DataLoader._executor.submit(self._run, generation, make_iterator)
+
+    def cancel(self):
+        """Stop delivering the current load (its download stops at the next item)"""
+        self._generation += 1
+        self.is_loading = False
+
+    def _run(self, generation, make_iterator):
+        started = time.perf_counter()
+        batch = []
+        total = 0
+        last_emit = started
+        try:
+            for item in make_iterator():
+                if generation != self._generation:
+                    return  # Superseded: stop downloading
+                batch.append(item)
+                total += 1
+                now = time.perf_counter()
+                if len(batch) >= Config.STREAM_BATCH_SIZE or now - last_emit >= Config.STREAM_BATCH_INTERVAL:
+                    self._batch.emit(generation, batch)
+                    batch = []
+                    last_emit = now
+        except Exception as e:
+            print(f"Error streaming data: {e}")
+
+        self.last_duration = time.perf_counter() - started
+        try:
+            if batch:
+                self._batch.emit(generation, batch)
+            self._done.emit(generation, total)
+        except RuntimeError:
+            pass  # The view was closed while loading
+
+    def _on_batch(self, generation, batch):
+        if generation == self._generation:
+            self.batch_loaded.emit(batch)
+
+    def _on_done(self, generation, total):
+        if generation != self._generation:
+            return
+        self.is_loading = False
+        self.finished.emit(total)
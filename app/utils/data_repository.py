@@ -0,0 +1,229 @@
+"""
+Shared in-memory repository of the users, exams and attendance records loaded
+by the controllers.
+Records are indexed by ID, users also by citizen ID and email, and attendance
+records by exam, so views look them up in O(1) instead of scanning lists.
+The controllers fill it from every list they load and update it write-through
+after each successful create/update/delete, so all views read the same copy.
+Attendance queued in the outbox has no ID yet: it is kept by its delivery key
+until the delivered record (same delivery_key, with ID) replaces it.
+"""
+
+import threading
+
+def _citizen_key(citizen_id):
+    return str(citizen_id).strip() if citizen_id else None
+
+def _email_key(email):
+    return email.strip().lower() if email else None
+
+class DataRepository:
+    """Indexed users, exams and attendance records shared by controllers and views"""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = DataRepository()
+        return cls._instance
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """Forget everything (e.g. on logout)"""
+        with self._lock:
+            self._users = {}  # user_id -> User
+            self._users_by_citizen_id = {}
+            self._users_by_email = {}
+            self._user_keys = {}  # user_id -> (citizen_id, email) it is indexed under
+            self._exams = {}  # exam_id -> Exam
+            self._attendance = {}  # attendance_id -> ExamAttendance
+            self._attendance_by_exam = {}  # exam_id -> {attendance_id: ExamAttendance}
+            self._pending_attendance = {}  # delivery_key -> ExamAttendance not delivered yet
+
+    # Users
+
+    def set_users(self, users):
+        """Replace all users with a complete list"""
+        with self._lock:
+            self._users = {}
+            self._users_by_citizen_id = {}
+            self._users_by_email = {}
+            self._user_keys = {}
+            self.put_users(users)
+
+    def put_users(self, users):
+        with self._lock:
+            for user in users:
+                self.put_user(user)
+
+    def put_user(self, user):
+        """Add or replace a user (created, updated or loaded)"""
+        if user is None or user.user_id is None:
+            return
+        user_id = str(user.user_id)
+        with self._lock:
+            self._unindex_user(user_id)
+            self._users[user_id] = user
+            citizen_id = _citizen_key(user.citizen_id)
+            if citizen_id:
+                self._users_by_citizen_id[citizen_id] = user
+            email = _email_key(user.email)
+            if email:
+                self._users_by_email[email] = user
+            self._user_keys[user_id] = (citizen_id, email)
+
+    def remove_user(self, user_id):
+        with self._lock:
+            self._unindex_user(str(user_id))
+            self._users.pop(str(user_id), None)
+
+    def _unindex_user(self, user_id):
+        # Dùng khóa đã index (đối tượng User có thể đã bị sửa trực tiếp)
+        citizen_id, email = self._user_keys.pop(user_id, (None, None))
+        old = self._users.get(user_id)
+        if citizen_id and self._users_by_citizen_id.get(citizen_id) is old:
+            del self._users_by_citizen_id[citizen_id]
+        if email and self._users_by_email.get(email) is old:
+            del self._users_by_email[email]
+
+    def get_user(self, user_id):
+        if user_id is None:
+            return None
+        with self._lock:
+            return self._users.get(str(user_id))
+
+    def find_user_by_citizen_id(self, citizen_id):
+        with self._lock:
+            return self._users_by_citizen_id.get(_citizen_key(citizen_id))
+
+    def find_user_by_email(self, email):
+        with self._lock:
+            return self._users_by_email.get(_email_key(email))
+
+    def get_users(self):
+        with self._lock:
+            return list(self._users.values())
+
+    # Exams
+
+    def set_exams(self, exams):
+        """Replace all exams with a complete list"""
+        with self._lock:
+            self._exams = {}
+            self.put_exams(exams)
+
+    def put_exams(self, exams):
+        with self._lock:
+            for exam in exams:
+                self.put_exam(exam)
+
+    def put_exam(self, exam):
+        if exam is None or exam.exam_id is None:
+            return
+        with self._lock:
+            self._exams[str(exam.exam_id)] = exam
+
+    def remove_exam(self, exam_id):
+        """Remove an exam together with its attendance records"""
+        with self._lock:
+            self._exams.pop(str(exam_id), None)
+            for attendance_id in self._attendance_by_exam.pop(str(exam_id), {}):
+                self._attendance.pop(attendance_id, None)
+            self._pending_attendance = {
+                key: attendance for key, attendance in self._pending_attendance.items()
+                if str(attendance.exam_id) != str(exam_id)
+            }
+
+    def get_exam(self, exam_id):
+        if exam_id is None:
+            return None
+        with self._lock:
+            return self._exams.get(str(exam_id))
+
+    def get_exams(self):
+        with self._lock:
+            return list(self._exams.values())
+
+    # Attendance
+
+    def put_attendance(self, records):
+        """
+        Add or replace attendance records
+
+        Records without ID are queued submissions: they are kept by delivery_key
+        (see get_pending_attendance), records without either are skipped. A record
+        with ID and delivery_key is the delivered one and replaces the queued copy.
+        """
+        with self._lock:
+            for attendance in records:
+                if attendance is None:
+                    continue
+                delivery_key = getattr(attendance, 'delivery_key', None)
+                if attendance.attendance_id is None:
+                    if delivery_key:
+                        self._pending_attendance[delivery_key] = attendance
+                    continue
+                if delivery_key:
+                    self._pending_attendance.pop(delivery_key, None)
+                attendance_id = str(attendance.attendance_id)
+                self._unindex_attendance(self._attendance.get(attendance_id))
+                self._attendance[attendance_id] = attendance
+                self._attendance_by_exam.setdefault(str(attendance.exam_id), {})[attendance_id] = attendance
+
+    def set_exam_attendance(self, exam_id, records):
+        """Replace the attendance records of one exam with its complete list"""
+        with self._lock:
+            for attendance_id in self._attendance_by_exam.pop(str(exam_id), {}):
+                self._attendance.pop(attendance_id, None)
+            self._attendance_by_exam[str(exam_id)] = {}
+            self.put_attendance(records)
+
+    def remove_attendance(self, attendance_ids):
+        with self._lock:
+            for attendance_id in attendance_ids:
+                self._unindex_attendance(self._attendance.pop(str(attendance_id), None))
+
+    def _unindex_attendance(self, attendance):
+        if attendance is not None:
+            self._attendance_by_exam.get(str(attendance.exam_id), {}).pop(str(attendance.attendance_id), None)
+
+    def get_attendance(self, attendance_id):
+        if attendance_id is None:
+            return None
+        with self._lock:
+            return self._attendance.get(str(attendance_id))
+
+    def get_attendance_by_exam(self, exam_id):
+        """Attendance records of an exam loaded so far (delivered ones, see get_pending_attendance)"""
+        with self._lock:
+            return list(self._attendance_by_exam.get(str(exam_id), {}).values())
+
+    def get_pending_attendance(self, exam_id=None):
+        """Queued attendance submissions (no ID yet), of one exam or all"""
+        with self._lock:
+            return [
+                attendance for attendance in self._pending_attendance.values()
+                if exam_id is None or str(attendance.exam_id) == str(exam_id)
+            ]
+
+    def find_pending_attendance(self, delivery_key):
+        with self._lock:
+            return self._pending_attendance.get(delivery_key)
+
+    def remove_pending_attendance(self, delivery_key):
+        """Forget a queued submission (delivered without a record in the response)"""
+        with self._lock:
+            return self._pending_attendance.pop(delivery_key, None)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'exams': len(self._exams),
+                'attendance': len(self._attendance),
+                'exams_with_attendance': len(self._attendance_by_exam)
+            }
@@ -0,0 +1,96 @@
+"""
+In-process event bus used to hand events from background threads
+(socket server, encoding workers, ...) to their subscribers.
+Events are queued and delivered by a single dispatcher thread, and
+subscribers are held through weak references so closed dialogs are
+dropped automatically.
+"""
+
+import queue
+import threading
+import weakref
+from config.config import Config
+
+# Event topics
+CCCD_RECEIVED = "cccd.received"  # args: citizen_id, image_path, data
+ATTENDANCE_DELIVERY = "attendance.delivery"  # args: idempotency_key, state, user_id, exam_id
+
+class EventBus:
+    """Bounded-queue event bus with weak-referenced subscribers"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = EventBus()
+        return cls._instance
+
+    def __init__(self, max_queue_size=None):
+        self._subscribers = {}  # topic -> list of weak references to callbacks
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue_size or Config.EVENT_BUS_QUEUE_SIZE)
+        self.dropped_events = 0
+
+        self._dispatch_thread = threading.Thread(target=self._dispatch_loop, name="event-bus", daemon=True)
+        self._dispatch_thread.start()
+
+    @staticmethod
+    def _make_ref(callback):
+        """Create a weak reference to a function or bound method"""
+        if hasattr(callback, '__self__') and hasattr(callback, '__func__'):
+            return weakref.WeakMethod(callback)
+        return weakref.ref(callback)
+
+    def subscribe(self, topic, callback):
+        """
+        Subscribe a callback to a topic
+
+        Only a weak reference is kept: the subscription ends when the owner of
+        the callback is garbage collected. Lambdas and local closures must be
+        kept alive by the caller.
+        """
+        with self._lock:
+            refs = self._subscribers.setdefault(topic, [])
+            if any(ref() == callback for ref in refs):
+                return
+            refs.append(self._make_ref(callback))
+
+    def unsubscribe(self, topic, callback):
+        """Remove a callback from a topic"""
+        with self._lock:
+            refs = self._subscribers.get(topic, [])
+            self._subscribers[topic] = [ref for ref in refs if ref() is not None and ref() != callback]
+
+    def publish(self, topic, *args):
+        """
+        Queue an event for delivery
+
+        Blocks for at most EVENT_BUS_PUBLISH_TIMEOUT seconds when the queue is
+        full, then drops the event so the publishing thread never stalls.
+        """
+        try:
+            self._queue.put((topic, args), timeout=Config.EVENT_BUS_PUBLISH_TIMEOUT)
+            return True
+        except queue.Full:
+            self.dropped_events += 1
+            print(f"Event bus queue full, dropped event '{topic}' ({self.dropped_events} dropped so far)")
+            return False
+
+    def _dispatch_loop(self):
+        """Deliver queued events to the live subscribers of their topic"""
+        while True:
+            topic, args = self._queue.get()
+
+            with self._lock:
+                refs = self._subscribers.get(topic, [])
+                callbacks = [ref() for ref in refs]
+                # Prune subscribers that have been garbage collected
+                self._subscribers[topic] = [ref for ref, cb in zip(refs, callbacks) if cb is not None]
+
+            for callback in callbacks:
+                if callback is None:
+                    continue
+                try:
+                    callback(*args)
+                except Exception as e:
+                    print(f"Error in event bus subscriber for '{topic}': {e}")
@@ -77,8 +77,22 @@ def compare_faces(cccd_image_path, captured_face_image_path, tolerance=0.55):
     """
     # Get face encodings
     cccd_face_encodings = face_encoding_from_image(cccd_image_path)
-    captured_face_encodings = face_encoding_from_image(captured_face_image_path)
+    return compare_faces_with_encodings(cccd_face_encodings, captured_face_image_path, tolerance)
+
+def compare_faces_with_encodings(cccd_face_encodings, captured_face_image_path, tolerance=0.55):
+    """
+    Compare a captured face image against CCCD face encodings computed beforehand
+    (for example in the background when the CCCD was received), so only the
+    captured image has to be encoded here
     
+    Args:
+        cccd_face_encodings (list): Face encodings from the CCCD image
+        captured_face_image_path (str): Path to the captured face image
+        tolerance (float): Matching tolerance (lower is stricter)
+        
+    Returns:
+        dict: Comparison result, same format as compare_faces
+    """
     # Check if faces were detected in both images
     if not cccd_face_encodings:
         return {
@@ -87,6 +101,8 @@ def compare_faces(cccd_image_path, captured_face_image_path, tolerance=0.55):
             'message': 'Không tìm thấy khuôn mặt trong ảnh CCCD. Vui lòng quét lại.'
         }
     
+    captured_face_encodings = face_encoding_from_image(captured_face_image_path)
+    
     if not captured_face_encodings:
         return {
             'is_match': False,
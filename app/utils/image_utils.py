@@ -0,0 +1,51 @@
+"""
+Utility functions for normalizing images received from mobile devices
+"""
+
+import io
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+def canonicalize_image(image_bytes, max_dimension, quality):
+    """
+    Normalize an image to the canonical CCCD format
+
+    Applies the EXIF orientation, converts to RGB, downscales so the longest side
+    is at most max_dimension and re-encodes as JPEG without metadata.
+
+    Args:
+        image_bytes (bytes): Image as received (JPEG, PNG, ...)
+        max_dimension (int): Maximum width/height in pixels
+        quality (int): JPEG quality (1-95)
+
+    Returns:
+        bytes: The canonical JPEG image
+
+    Raises:
+        ValueError: If the bytes are not a readable image
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # Với JPEG, giải mã trực tiếp ở độ phân giải thấp hơn (nhanh hơn nhiều với ảnh lớn)
+        image.draft('RGB', (max_dimension, max_dimension))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise ValueError(f"Not a readable image: {e}")
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    # thumbnail() giữ nguyên tỉ lệ và không phóng to ảnh nhỏ
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+    # Ghi lại không kèm EXIF/metadata
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=quality, optimize=True)
+    return output.getvalue()
+
+def guess_image_extension(image_bytes):
+    """Guess the file extension of an image from its header, used to archive originals"""
+    if image_bytes.startswith(b'\x89PNG'):
+        return '.png'
+    if image_bytes[:4] == b'RIFF' and image_bytes[8:12] == b'WEBP':
+        return '.webp'
+    return '.jpg'
@@ -0,0 +1,89 @@
+"""
+Incremental parsing of JSON arrays.
+Elements of a top-level array are decoded as soon as their text has arrived,
+so a large list response can be consumed while it is still downloading and
+without holding the whole body, its text and its dict tree at the same time.
+"""
+
+import codecs
+import json
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a JSON array from an iterable of byte chunks
+
+    A body that is not an array (e.g. an error object) is parsed whole; if it
+    is not a list either, ValueError is raised.
+
+    Raises:
+        ValueError: If the body is not valid JSON or ends before the array is closed
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    eof = False
+    expect = '['  # '[', 'first' (value or ']'), 'value', ',' (',' or ']')
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expect == '[':
+                if char != '[':
+                    # Không phải mảng: đọc hết rồi parse một lần
+                    rest = buffer[pos:] + ''.join(text.decode(chunk) for chunk in chunks) + text.decode(b'', final=True)
+                    value = json.loads(rest)
+                    if not isinstance(value, list):
+                        raise ValueError(f"Expected a JSON array, got {type(value).__name__}")
+                    yield from value
+                    return
+                pos += 1
+                expect = 'first'
+                continue
+
+            if char == ']' and expect in ('first', ','):
+                return
+            if expect == ',':
+                if char != ',':
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+                pos += 1
+                expect = 'value'
+                continue
+
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            complete = end is not None and (end < len(buffer) or eof)
+            # A number may continue in the next chunk ("1" + ".5"): complete only once a delimiter follows
+            if complete and not eof and _is_number(value) and buffer[end] not in _DELIMITERS:
+                complete = False
+            if complete:
+                yield value
+                pos = end
+                expect = ','
+                continue
+        elif eof:
+            raise ValueError("JSON array ended unexpectedly")
+
+        # Cần thêm dữ liệu: bỏ phần đã xử lý rồi đọc chunk tiếp theo
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = next(chunks, None)
+        if chunk is None:
+            buffer += text.decode(b'', final=True)
+            eof = True
+        else:
+            buffer += text.decode(chunk)
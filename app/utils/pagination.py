@@ -0,0 +1,81 @@
+"""
+Paged list queries.
+Understands the page formats a list endpoint may answer with:
+- cursor pages:  {"items": [...], "nextCursor": "...", "total": 123}
+- Spring pages:  {"content": [...], "number": 0, "totalElements": 123, "last": false}
+- a plain list:  the server does not page, the page is cut locally
+Cursors are opaque strings for the views: "page:N" for Spring pages,
+"offset:N" for local pages, anything else is the server's own cursor.
+"""
+
+class Page:
+    """One page of query results"""
+
+    def __init__(self, items, cursor=None, next_cursor=None, total=None, page_size=None):
+        self.items = items
+        self.cursor = cursor  # Cursor this page was requested with (None = first page)
+        self.next_cursor = next_cursor  # None on the last page
+        self.total = total  # Number of matching items, None if the server does not say
+        self.page_size = page_size
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def page_count(self):
+        if self.total is None or not self.page_size:
+            return None
+        return max(1, -(-self.total // self.page_size))
+
+    def __repr__(self):
+        return f"Page(items={len(self.items)}, cursor={self.cursor}, next_cursor={self.next_cursor}, total={self.total})"
+
+def is_local_cursor(cursor):
+    return isinstance(cursor, str) and cursor.startswith('offset:')
+
+def page_params(page_size, cursor=None):
+    """Query parameters selecting one page"""
+    params = {'size': page_size}
+    if cursor is None:
+        params['page'] = 0
+    elif cursor.startswith('page:'):
+        params['page'] = int(cursor[len('page:'):])
+    else:
+        params['cursor'] = cursor
+    return params
+
+def parse_page(result, page_size, cursor=None):
+    """
+    Read a paged response
+
+    Returns:
+        tuple: (raw items, next cursor, total), or None if the result is not a
+               page (e.g. a plain list from a server that ignores paging)
+    """
+    if not isinstance(result, dict):
+        return None
+
+    if isinstance(result.get('items'), list):
+        total = result.get('total')
+        return result['items'], result.get('nextCursor') or None, total
+
+    if isinstance(result.get('content'), list):
+        number = result.get('number', 0)
+        total = result.get('totalElements')
+        if 'last' in result:
+            last = result['last']
+        elif total is not None:
+            last = (number + 1) * page_size >= total
+        else:
+            last = len(result['content']) < page_size
+        return result['content'], None if last else f"page:{number + 1}", total
+
+    return None
+
+def paginate_locally(items, page_size, cursor=None):
+    """Cut one page out of a complete list (cursor "offset:N")"""
+    offset = int(cursor[len('offset:'):]) if is_local_cursor(cursor) else 0
+    end = offset + page_size
+    next_cursor = f"offset:{end}" if end < len(items) else None
+    return Page(items[offset:end], cursor, next_cursor, len(items), page_size)
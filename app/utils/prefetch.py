@@ -0,0 +1,110 @@
+"""
+Cache warm-up right after login.
+Fetches the data the user's screens will ask for first, in the order they
+are likely to be opened for the user's role, on a small thread pool of its
+own. The results land in ApiService's response cache (and the snapshots on
+disk); a panel asking while a prefetch of the same data is still running
+joins that request instead of sending its own (SingleFlight).
+
+Admins/proctors: exam list, user directory, first attendance page, then the
+roster of every exam taking place today, synced into AttendanceSync where
+the attendance panel picks it up when the exam is selected.
+Candidates: their exams, their attendance records, their profile.
+"""
+
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.config import Config
+
+class Prefetcher:
+    """
+    Warm the response cache for the logged-in user's screens
+
+    Usage:
+        self.prefetcher = Prefetcher(auth_controller, user_controller, exam_controller, attendance_controller)
+        self.prefetcher.start()
+        ...
+        self.prefetcher.cancel()  # On logout: calls not started yet are skipped
+    """
+
+    # Ít luồng hơn DataLoader để các màn hình đang mở luôn còn kết nối trống
+    _executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+    def __init__(self, auth_controller, user_controller, exam_controller, attendance_controller):
+        self.auth_controller = auth_controller
+        self.user_controller = user_controller
+        self.exam_controller = exam_controller
+        self.attendance_controller = attendance_controller
+        self.durations = {}  # name -> seconds taken, None if the call failed
+        self.finished = threading.Event()  # Set once every queued call has run
+        self._cancelled = threading.Event()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._started = None
+
+    def start(self):
+        """Queue the calls for the current user's role, most needed first"""
+        user = self.auth_controller.get_current_user()
+        if user is None:
+            return
+        self._started = time.perf_counter()
+        self._pending = 1  # Chưa báo xong khi các lệnh gọi còn đang được xếp hàng
+        if self.auth_controller.is_admin():
+            # Cùng thứ tự các tab của dashboard: kỳ thi (danh sách + bộ lọc), người dùng, điểm danh
+            self._submit('exams', self._prefetch_exams)
+            self._submit('users', self.user_controller.get_all_users)
+            self._submit('attendance', self.attendance_controller.query_attendance)
+        else:
+            self._submit('my_exams', self.exam_controller.get_my_exams)
+            self._submit('my_attendance', lambda: self.attendance_controller.get_attendance_by_user(user.user_id))
+            self._submit('profile', self.user_controller.get_current_user_profile)
+        self._finish_one()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _prefetch_exams(self):
+        exams = self.exam_controller.get_all_exams()
+        if exams is None:
+            return None
+        # Danh sách điểm danh của các kỳ thi diễn ra hôm nay, qua cùng đường đồng bộ bảng điểm danh dùng khi chọn kỳ thi
+        today = datetime.date.today().isoformat()
+        todays_exams = [exam for exam in exams if str(exam.exam_date or '')[:10] == today]
+        for exam in todays_exams[:Config.PREFETCH_MAX_ROSTERS]:
+            self._submit(f"roster {exam.exam_id}",
+                         lambda exam_id=exam.exam_id: self.attendance_controller.sync_attendance(exam_id, prefetch=True))
+        return exams
+
+    def _submit(self, name, func):
+        if self._cancelled.is_set():
+            return
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._run, name, func)
+
+    def _run(self, name, func):
+        try:
+            if self._cancelled.is_set():
+                return
+            started = time.perf_counter()
+            try:
+                result = func()
+            except Exception as e:
+                print(f"Prefetch of '{name}' failed: {e}")
+                result = None
+            self.durations[name] = time.perf_counter() - started if result is not None else None
+        finally:
+            self._finish_one()
+
+    def _finish_one(self):
+        with self._lock:
+            self._pending -= 1
+            done = self._pending == 0
+        if done:
+            self.finished.set()
+        if done and not self._cancelled.is_set():
+            failed = [name for name, seconds in self.durations.items() if seconds is None]
+            print(f"Prefetch finished: {len(self.durations)} calls in "
+                  f"{time.perf_counter() - self._started:.2f}s" + (f", failed: {', '.join(failed)}" if failed else ""))
@@ -0,0 +1,71 @@
+"""
+Bridge from the EventBus to the Qt GUI thread.
+"""
+
+import threading
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+from app.utils.event_bus import EventBus
+from config.config import Config
+
+class QtEventBridge(QObject):
+    """
+    Deliver EventBus events of one topic to the GUI thread
+
+    Events arriving in a burst are collected and emitted together through the
+    single `events_ready` signal, so the receiver can refresh its widgets once
+    for many events. Each emitted item is the tuple of arguments of one event.
+    """
+
+    events_ready = pyqtSignal(list)
+    _flush_requested = pyqtSignal()
+
+    def __init__(self, topic, parent=None, coalesce_ms=None):
+        super().__init__(parent)
+        self.topic = topic
+        self.coalesce_ms = Config.EVENT_COALESCE_MS if coalesce_ms is None else coalesce_ms
+        self._pending = []
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Queued connection: _schedule_flush always runs in the GUI thread
+        self._flush_requested.connect(self._schedule_flush, Qt.QueuedConnection)
+
+        self.bus = EventBus.get_instance()
+        self.bus.subscribe(self.topic, self._on_event)
+
+    def _on_event(self, *args):
+        """Called on the event bus dispatcher thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.append(args)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        try:
+            self._flush_requested.emit()
+        except RuntimeError:
+            # The underlying Qt object has already been deleted
+            self.close()
+
+    def _schedule_flush(self):
+        """Wait a little so events of the same burst are delivered together"""
+        QTimer.singleShot(self.coalesce_ms, self._flush)
+
+    def _flush(self):
+        with self._lock:
+            events = self._pending
+            self._pending = []
+            self._flush_scheduled = False
+
+        if events and not self._closed:
+            self.events_ready.emit(events)
+
+    def close(self):
+        """Stop receiving events"""
+        with self._lock:
+            self._closed = True
+            self._pending = []
+        self.bus.unsubscribe(self.topic, self._on_event)
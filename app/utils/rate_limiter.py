@@ -0,0 +1,38 @@
+"""
+Token bucket rate limiter used to keep one client from flooding a server
+"""
+
+import threading
+import time
+
+class TokenBucket:
+    """Allows `rate` operations per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_consume(self, tokens=1):
+        """Take tokens if available, returns False (and takes nothing) otherwise"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def time_until_available(self, tokens=1):
+        """Seconds until the given number of tokens will be available"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens or self.rate <= 0:
+                return 0.0
+            return (tokens - self.tokens) / self.rate
@@ -0,0 +1,203 @@
+"""
+Timing of the HTTP requests sent by ApiService.
+Every request is recorded under its URL template ("GET /exam/{id}") into a
+latency histogram, with its phases where requests/urllib3 expose them:
+- connect:  opening a new connection (DNS lookup + TCP + TLS), 0 on a reused one
+- ttfb:     from sending the request until the response headers arrived
+- download: reading the body
+Requests slower than Config.API_SLOW_CALL_THRESHOLD are also kept in a
+bounded slow-call log with their payload sizes.
+"""
+
+import bisect
+import collections
+import datetime
+import re
+import threading
+import time
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from config.config import Config
+
+PHASES = ('connect', 'ttfb', 'download')
+
+class _ConnectTimer(threading.local):
+    """Time spent opening connections by the current thread's request"""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def reset(self):
+        self.seconds = 0.0
+
+    def take(self):
+        seconds, self.seconds = self.seconds, 0.0
+        return seconds
+
+connect_timer = _ConnectTimer()
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            connect_timer.seconds += time.perf_counter() - started
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            connect_timer.seconds += time.perf_counter() - started
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+# PoolManager.pool_classes_by_scheme của HTTPAdapter
+TIMED_POOL_CLASSES = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+_ID_SEGMENT = re.compile(r'\d')
+
+def url_template(url):
+    """
+    Path of a URL relative to API_BASE_URL, with ID segments replaced by {id}
+    ("http://host/api/exam/E0001?size=5" -> "/exam/{id}")
+    """
+    path = url[len(Config.API_BASE_URL):] if url.startswith(Config.API_BASE_URL) else url
+    path = path.split('?', 1)[0]
+    segments = ['{id}' if _ID_SEGMENT.search(segment) else segment for segment in path.split('/')]
+    return '/'.join(segments) or '/'
+
+class LatencyHistogram:
+    """Request durations counted into fixed buckets (upper bounds in milliseconds)"""
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Ô cuối: chậm hơn mốc lớn nhất
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, milliseconds):
+        self.counts[bisect.bisect_left(self.bounds, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of requests (max for the last one)"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return dict(zip(labels, self.counts))
+
+class _EndpointStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram(Config.API_LATENCY_BUCKETS)
+        self.errors = 0
+        self.new_connections = 0
+        self.phase_totals = dict.fromkeys(PHASES, 0.0)
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+class RequestMetrics:
+    """Per-endpoint latency histograms and slow-call log of ApiService's requests"""
+
+    def __init__(self, slow_threshold=None, slow_log_size=None):
+        self.slow_threshold = Config.API_SLOW_CALL_THRESHOLD if slow_threshold is None else slow_threshold
+        self._endpoints = {}  # "METHOD /template" -> _EndpointStats
+        self._slow_calls = collections.deque(maxlen=slow_log_size or Config.API_SLOW_LOG_SIZE)
+        self._lock = threading.Lock()
+
+    def record(self, method, url, status, total, connect=0.0, ttfb=None, download=None,
+               request_bytes=0, response_bytes=0):
+        """
+        Record one request (durations in seconds; status None for network errors)
+        """
+        template = url_template(url)
+        name = f"{method} {template}"
+        phases = {'connect': connect, 'ttfb': ttfb, 'download': download}
+        with self._lock:
+            stats = self._endpoints.get(name)
+            if stats is None:
+                stats = self._endpoints[name] = _EndpointStats()
+            stats.histogram.add(total * 1000)
+            if status is None or status >= 400:
+                stats.errors += 1
+            if connect:
+                stats.new_connections += 1
+            for phase, seconds in phases.items():
+                stats.phase_totals[phase] += seconds or 0.0
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+
+            if total >= self.slow_threshold:
+                self._slow_calls.append({
+                    'time': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'method': method,
+                    'endpoint': template,
+                    'status': status,
+                    'total_ms': round(total * 1000, 1),
+                    **{f"{phase}_ms": None if seconds is None else round(seconds * 1000, 1)
+                       for phase, seconds in phases.items()},
+                    'request_bytes': request_bytes,
+                    'response_bytes': response_bytes
+                })
+        if total >= self.slow_threshold:
+            print(f"Slow API call: {method} {template} -> {status} in {total * 1000:.0f} ms "
+                  f"(sent {request_bytes} B, received {response_bytes} B)")
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: "METHOD /template" -> count, errors, mean/p50/p95/p99/max (ms),
+                  average phase durations (ms), new connections, average payload sizes
+        """
+        with self._lock:
+            stats = {}
+            for name, endpoint in self._endpoints.items():
+                histogram = endpoint.histogram
+                count = histogram.count
+                stats[name] = {
+                    'count': count,
+                    'errors': endpoint.errors,
+                    'mean_ms': round(histogram.mean, 1),
+                    'p50_ms': histogram.percentile(0.5),
+                    'p95_ms': histogram.percentile(0.95),
+                    'p99_ms': histogram.percentile(0.99),
+                    'max_ms': round(histogram.max, 1),
+                    **{f"{phase}_ms": round(total * 1000 / count, 1) for phase, total in endpoint.phase_totals.items()},
+                    'new_connections': endpoint.new_connections,
+                    'avg_request_bytes': endpoint.request_bytes // count,
+                    'avg_response_bytes': endpoint.response_bytes // count,
+                    'histogram_ms': histogram.to_dict()
+                }
+            return stats
+
+    def get_slow_calls(self):
+        """Slowest recent calls, oldest first"""
+        with self._lock:
+            return list(self._slow_calls)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._slow_calls.clear()
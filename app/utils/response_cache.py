@@ -0,0 +1,108 @@
+"""
+In-memory HTTP response cache used by ApiService.get.
+Keeps the raw body of GET responses with their ETag/Last-Modified validators,
+so repeated reads are served locally while fresh and revalidated with a
+conditional request (304 Not Modified) once stale.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+class CacheEntry:
+    """One cached GET response"""
+
+    def __init__(self, content, etag=None, last_modified=None, ttl=0):
+        self.content = content  # Raw body bytes, parsed again for every caller
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = time.monotonic() + ttl
+
+    def is_fresh(self):
+        return time.monotonic() < self.expires_at
+
+    def refresh(self, ttl):
+        """Mark the entry fresh again after the server confirmed it (304)"""
+        self.expires_at = time.monotonic() + ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def json(self):
+        return json.loads(self.content)
+
+class ResponseCache:
+    """Thread-safe LRU cache of GET responses keyed by URL and query parameters"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> CacheEntry
+        self._lock = threading.Lock()
+        # Tăng mỗi lần invalidate/clear: response của request gửi trước đó không được lưu nữa
+        self.generation = 0
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+
+    @staticmethod
+    def make_key(url, params=None):
+        if not params:
+            return url
+        return url + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, generation=None):
+        """
+        Store a response; pass the generation read before sending its request so a
+        response that raced an invalidation (a write in between) is not stored
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats['stores'] += 1
+            return True
+
+    def record(self, outcome):
+        """Count a lookup outcome: 'hits', 'revalidated' or 'misses'"""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def invalidate(self, url_prefix):
+        """Drop every entry whose URL is url_prefix or below it"""
+        with self._lock:
+            self.generation += 1
+            prefix = url_prefix.rstrip('/')
+            keys = [key for key in self._entries
+                    if key == prefix or key.startswith(prefix + '/') or key.startswith(prefix + '?')]
+            for key in keys:
+                del self._entries[key]
+            self.stats['invalidations'] += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def get_stats(self):
+        """Counters plus hit rate (fresh hits and 304 revalidations over all lookups)"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['revalidated']) / lookups if lookups else 0.0
+        return stats
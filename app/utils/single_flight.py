@@ -0,0 +1,79 @@
+"""
+Coalescing of identical concurrent calls: while a call for a key is running,
+other callers with the same key wait for it and share its result instead of
+repeating the work.
+"""
+
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Run at most one call per key at a time, sharing the result with concurrent callers"""
+
+    def __init__(self):
+        self._calls = {}  # key -> _Call in progress
+        self._lock = threading.Lock()
+        self.stats = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key, func):
+        """
+        Call func() unless a call for the same key is already running
+
+        Returns:
+            tuple: (result, shared) where shared is True if the result came from
+                   another caller's call. Exceptions raised by func are re-raised
+                   in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.stats['executed'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def wait(self, key):
+        """Wait for the call running for key, if any, without sharing its result; True if there was one"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                return False
+            call.waiters += 1
+            self.stats['coalesced'] += 1
+        call.done.wait()
+        return True
+
+    def get_stats(self):
+        """Executed and coalesced call counts, with the share of calls that were coalesced"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self._calls)
+        total = stats['executed'] + stats['coalesced']
+        stats['coalesced_ratio'] = stats['coalesced'] / total if total else 0.0
+        return stats
@@ -0,0 +1,91 @@
+"""
+On-disk snapshots of API responses for fast cold starts.
+The last response body of selected GET endpoints is kept gzip-compressed per
+user, so screens can show the last-known data right after login while fresh
+data is fetched in the background (stale-while-revalidate). The file's
+modification time is the time the data was last confirmed by the server.
+"""
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+class SnapshotStore:
+    """gzip JSON snapshots keyed by user and request (URL + query parameters)"""
+
+    def __init__(self, directory, max_files=200):
+        self.directory = directory
+        self.max_files = max_files  # Per user; the oldest snapshots are removed beyond this
+        self._lock = threading.Lock()
+
+    def _path(self, user_key, key):
+        user_dir = hashlib.sha1(str(user_key).encode('utf-8')).hexdigest()[:16]
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, user_dir, name + ".json.gz")
+
+    def save(self, user_key, key, content):
+        """Store the raw JSON body (bytes) of a response"""
+        path = self._path(user_key, key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp_path, 'wb', compresslevel=5) as f:
+                f.write(content)
+            os.replace(tmp_path, path)  # Không để lại file hỏng nếu ứng dụng bị tắt giữa chừng
+            self._prune(os.path.dirname(path))
+        except OSError as e:
+            print(f"Error saving snapshot for {key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def touch(self, user_key, key):
+        """Mark a snapshot as confirmed by the server now (e.g. after a 304)"""
+        try:
+            os.utime(self._path(user_key, key))
+        except OSError:
+            pass
+
+    def saved_at(self, user_key, key):
+        """Datetime the snapshot was last saved or confirmed, None if there is none"""
+        try:
+            return datetime.datetime.fromtimestamp(os.path.getmtime(self._path(user_key, key)))
+        except OSError:
+            return None
+
+    def load(self, user_key, key, max_age=None):
+        """
+        Read a snapshot
+
+        Returns:
+            tuple: (parsed JSON, datetime it was saved), or (None, None) if there is
+                   no usable snapshot (missing, unreadable or older than max_age seconds)
+        """
+        path = self._path(user_key, key)
+        try:
+            saved_at = os.path.getmtime(path)
+            if max_age is not None and datetime.datetime.now().timestamp() - saved_at > max_age:
+                return None, None
+            with gzip.open(path, 'rb') as f:
+                data = json.loads(f.read())
+        except (OSError, EOFError, zlib.error, ValueError):
+            # File gzip bị cắt hoặc hỏng: coi như không có snapshot
+            return None, None
+        return data, datetime.datetime.fromtimestamp(saved_at)
+
+    def _prune(self, user_dir):
+        with self._lock:
+            files = [os.path.join(user_dir, name) for name in os.listdir(user_dir) if name.endswith(".json.gz")]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=os.path.getmtime)
+            for path in files[:len(files) - self.max_files]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,137 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog,
+                             QMessageBox, QTabWidget)
+from PyQt5.QtCore import Qt, QTimer
+from app.utils.api_service import ApiService
+from config.config import Config
+
+class ApiMetricsDialog(QDialog):
+    """Live request timings of ApiService: per-endpoint latencies and slow calls"""
+
+    ENDPOINT_COLUMNS = [
+        ("endpoint", "Endpoint"),
+        ("count", "Số lượt"),
+        ("errors", "Lỗi"),
+        ("mean_ms", "TB (ms)"),
+        ("p50_ms", "p50"),
+        ("p95_ms", "p95"),
+        ("p99_ms", "p99"),
+        ("max_ms", "Max"),
+        ("connect_ms", "Kết nối TB"),
+        ("ttfb_ms", "TTFB TB"),
+        ("download_ms", "Tải TB"),
+        ("new_connections", "Kết nối mới"),
+        ("avg_response_bytes", "Nhận TB (B)")
+    ]
+
+    SLOW_COLUMNS = [
+        ("time", "Thời điểm"),
+        ("endpoint", "Endpoint"),
+        ("status", "Trạng thái"),
+        ("total_ms", "Tổng (ms)"),
+        ("connect_ms", "Kết nối"),
+        ("ttfb_ms", "TTFB"),
+        ("download_ms", "Tải"),
+        ("request_bytes", "Gửi (B)"),
+        ("response_bytes", "Nhận (B)")
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.api_service = ApiService.get_instance()
+
+        self.setWindowTitle("Hiệu năng API")
+        self.setMinimumSize(1000, 450)
+        self.init_ui()
+        self.refresh()
+
+        # Làm mới số liệu định kỳ khi hộp thoại đang mở
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(2000)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("font-weight: bold;")
+        layout.addWidget(self.summary_label)
+
+        tabs = QTabWidget()
+        self.endpoints_table = self.create_table(self.ENDPOINT_COLUMNS)
+        tabs.addTab(self.endpoints_table, "Theo endpoint")
+        self.slow_table = self.create_table(self.SLOW_COLUMNS)
+        tabs.addTab(self.slow_table, f"Request chậm (> {Config.API_SLOW_CALL_THRESHOLD:g}s)")
+        layout.addWidget(tabs)
+
+        button_layout = QHBoxLayout()
+        export_button = QPushButton("Xuất JSON...")
+        export_button.clicked.connect(self.export_json)
+        button_layout.addWidget(export_button)
+        reset_button = QPushButton("Đặt lại")
+        reset_button.clicked.connect(self.reset_metrics)
+        button_layout.addWidget(reset_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Đóng")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    @staticmethod
+    def create_table(columns):
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels([title for _, title in columns])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectRows)
+        return table
+
+    @staticmethod
+    def fill_table(table, columns, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, (key, _) in enumerate(columns):
+                value = values.get(key)
+                item = QTableWidgetItem("" if value is None else str(value))
+                if isinstance(value, (int, float)):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+
+    def refresh(self):
+        """Reload the statistics from ApiService"""
+        endpoints = self.api_service.get_request_stats()
+        rows = [dict(stats, endpoint=name) for name, stats in endpoints.items()]
+        rows.sort(key=lambda stats: stats['count'] * stats['mean_ms'], reverse=True)  # Tốn thời gian nhất lên đầu
+        self.fill_table(self.endpoints_table, self.ENDPOINT_COLUMNS, rows)
+
+        slow_calls = self.api_service.get_slow_calls()
+        for call in slow_calls:
+            call['endpoint'] = f"{call['method']} {call['endpoint']}"
+        self.fill_table(self.slow_table, self.SLOW_COLUMNS, list(reversed(slow_calls)))
+
+        cache = self.api_service.get_cache_stats()
+        total = sum(stats['count'] for stats in endpoints.values())
+        errors = sum(stats['errors'] for stats in endpoints.values())
+        self.summary_label.setText(
+            f"{total} request, {errors} lỗi, {len(slow_calls)} request chậm - "
+            f"cache: {cache.get('hits', 0)} lần dùng lại, {cache.get('revalidated', 0)} lần xác thực lại"
+        )
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Xuất số liệu API", Config.API_METRICS_DUMP_PATH, "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.api_service.dump_metrics(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Lỗi", f"Không thể ghi file: {e}")
+            return
+        QMessageBox.information(self, "Đã xuất", f"Đã lưu số liệu vào {path}")
+
+    def reset_metrics(self):
+        self.api_service.metrics.reset()
+        self.refresh()
+
+    def done(self, result):
+        self.refresh_timer.stop()
+        super().done(result)
@@ -17,7 +17,11 @@ import json
 import face_recognition
 import socket
 from app.controllers.cccd_api import CCCDApiController
-from app.controllers.cccd_socket_server import CCCDSocketServer
+from app.controllers.cccd_gateway import CCCDGateway
+from app.controllers.cccd_pipeline import CCCDIngestPipeline
+from app.utils.event_bus import CCCD_RECEIVED
+from app.utils.data_repository import DataRepository
+from app.utils.qt_event_bridge import QtEventBridge
 from app.utils.face_recognition import compare_faces
 from app.utils.datetime_utils import format_datetime_for_api, format_datetime_for_filename, format_time_from_iso
 
@@ -39,6 +43,7 @@ class AttendanceCCCDScannerDialog(QDialog):
         super().__init__(parent)
         self.exam = exam
         self.attendees = attendees or []
+        self.attendee_items = {}  # citizen_id -> item of the attendee list
         self.current_user = None
         self.scanning = False
         self.camera = None
@@ -51,13 +56,15 @@ class AttendanceCCCDScannerDialog(QDialog):
         self.captured_face_path = None
         self.cccd_data_received = {}  # Store all received CCCD data
         
-        # Initialize socket server if not already running
-        self.socket_server = CCCDSocketServer.get_instance()
-        if not self.socket_server.is_running:
-            self.socket_server.start()
+        # Start the CCCD ingest gateway if not already running
+        self.gateway = CCCDGateway.get_instance()
+        if not self.gateway.is_running:
+            self.gateway.start()
+        self.pipeline = CCCDIngestPipeline.get_instance()
         
-        # Register for CCCD data callbacks
-        self.socket_server.register_data_callback(self.on_cccd_data_received)
+        # Receive CCCD data on the GUI thread, batched during bursts
+        self.cccd_events = QtEventBridge(CCCD_RECEIVED, self)
+        self.cccd_events.events_ready.connect(self.on_cccd_events_received)
         
         # Create data directories
         self.data_dir = os.path.join("app", "data", "captured_faces")
@@ -68,6 +75,9 @@ class AttendanceCCCDScannerDialog(QDialog):
         self.setMinimumHeight(700)
         self.init_ui()
         
+        # Restore CCCD data received before the application was restarted
+        self.restore_received_cccd_data()
+        
     def init_ui(self):
         """Initialize the user interface"""
         # Main layout
@@ -276,11 +286,27 @@ class AttendanceCCCDScannerDialog(QDialog):
     def populate_attendee_list(self):
         """Populate the attendee list with data"""
         self.attendee_list.clear()
+        self.attendee_items = {}
         
         for attendee in self.attendees:
             item = QListWidgetItem(f"{attendee.name} - {attendee.citizen_id}")
             item.setData(Qt.UserRole, attendee)
             self.attendee_list.addItem(item)
+            if attendee.citizen_id:
+                self.attendee_items[str(attendee.citizen_id).strip()] = item
+    
+    def find_attendee(self, citizen_id):
+        """
+        Attendee of the list with this citizen ID
+        
+        Returns:
+            tuple: (item of the attendee list or None, User or None); a user
+                   outside the list is looked up in the shared DataRepository
+        """
+        item = self.attendee_items.get(str(citizen_id).strip())
+        if item is not None:
+            return item, item.data(Qt.UserRole)
+        return None, DataRepository.get_instance().find_user_by_citizen_id(citizen_id)
     
     def on_attendee_selected(self, current, previous):
         """Handle attendee selection change"""
@@ -326,24 +352,60 @@ class AttendanceCCCDScannerDialog(QDialog):
             # Switch to CCCD tab
             self.tab_widget.setCurrentIndex(0)
     
-    def on_cccd_data_received(self, citizen_id, image_path, data):
-        """Callback when CCCD data is received from mobile app"""        # Store the received data
-        self.cccd_data_received[citizen_id] = {
-            'image_path': image_path,
-            'data': data,
-            'timestamp': format_datetime_for_api()
-        }
+    def restore_received_cccd_data(self):
+        """Load recently received CCCD data from the local store"""
+        exam_id = getattr(self.exam, 'exam_id', None) if self.exam else None
+        for record in self.pipeline.get_recent_cccd_data(exam_id):
+            self.cccd_data_received[record['citizenId']] = {
+                'image_path': record['image_path'],
+                'data': record['raw_data'],
+                'timestamp': record['timestamp'],
+                'verification': record.get('verification')
+            }
+        
+        if self.cccd_data_received:
+            self.cccd_status.setText(f"Đã khôi phục {len(self.cccd_data_received)} CCCD đã nhận trước đó")
+            self.update_received_cccd_table()
+    
+    def on_cccd_events_received(self, events):
+        """Handle a batch of CCCD data received from the mobile app (GUI thread)"""
+        current_user_image = None
+        
+        for citizen_id, image_path, data in events:
+            # Store the received data
+            self.cccd_data_received[citizen_id] = {
+                'image_path': image_path,
+                'data': data,
+                'timestamp': format_datetime_for_api(),
+                'verification': None
+            }
+            
+            if self.current_user and self.current_user.citizen_id == citizen_id:
+                current_user_image = image_path
         
         # Update CCCD status
-        self.cccd_status.setText(f"Đã nhận dữ liệu CCCD: {citizen_id}")
+        last_citizen_id = events[-1][0]
+        last_item, last_user = self.find_attendee(last_citizen_id)
+        owner = f" ({last_user.name})" if last_user else ""
+        if last_user and last_item is None:
+            owner = f" ({last_user.name}, không có trong danh sách thí sinh)"
+        if len(events) > 1:
+            self.cccd_status.setText(f"Đã nhận {len(events)} dữ liệu CCCD, mới nhất: {last_citizen_id}{owner}")
+        else:
+            self.cccd_status.setText(f"Đã nhận dữ liệu CCCD: {last_citizen_id}{owner}")
         
-        # Update received CCCD list
+        # Update received CCCD list once for the whole batch
         self.update_received_cccd_table()
         
+        # Chưa chọn thí sinh: chọn thí sinh có CCCD vừa quét (on_attendee_selected chuyển sang tab khuôn mặt)
+        if self.current_user is None and last_item is not None:
+            self.attendee_list.setCurrentItem(last_item)
+            return
+        
         # If this matches the current user, update UI
-        if self.current_user and self.current_user.citizen_id == citizen_id:
+        if current_user_image:
             # Update CCCD image
-            pixmap = QPixmap(image_path)
+            pixmap = QPixmap(current_user_image)
             self.cccd_image.setPixmap(pixmap.scaled(
                 self.cccd_image.width(), 
                 self.cccd_image.height(),
@@ -372,8 +434,16 @@ class AttendanceCCCDScannerDialog(QDialog):
             self.received_cccd_list.setItem(row, 1, QTableWidgetItem(timestamp))
             
             # Status
-            status_item = QTableWidgetItem("Chưa xác thực")
-            status_item.setForeground(QColor("#EA4335"))  # Red color
+            verification = data.get('verification')
+            if verification and verification['is_match']:
+                status_item = QTableWidgetItem("Đã xác thực")
+                status_item.setForeground(QColor("#34A853"))  # Green color
+            elif verification:
+                status_item = QTableWidgetItem("Xác thực thất bại")
+                status_item.setForeground(QColor("#EA4335"))  # Red color
+            else:
+                status_item = QTableWidgetItem("Chưa xác thực")
+                status_item.setForeground(QColor("#EA4335"))  # Red color
             self.received_cccd_list.setItem(row, 2, status_item)
             
             row += 1
@@ -508,6 +578,7 @@ class AttendanceCCCDScannerDialog(QDialog):
         
         # Compare faces
         result = self.cccd_api.verify_face_with_cccd(citizen_id, self.captured_face_path)
+        cccd_data['verification'] = result
         
         if result['is_match']:
             self.status_label.setText(f"Xác thực thành công! {result['message']} Độ chính xác: {result['confidence']:.1%}")
@@ -547,14 +618,14 @@ class AttendanceCCCDScannerDialog(QDialog):
             # Truyền user_id và exam_id để gọi phương thức update với API mới
             self.attendance_recorded.emit(self.current_user.id, self.exam.id, timestamp)
             
-            QMessageBox.information(self, "Điểm danh thành công", 
-                                   f"Đã điểm danh thành công cho thí sinh {self.current_user.name} tham dự kỳ thi {self.exam.name}.")
+            QMessageBox.information(self, "Đã xác minh thí sinh", 
+                                   f"Đã xác minh và ghi nhận điểm danh cho thí sinh {self.current_user.name} tham dự kỳ thi {self.exam.name}.")
         else:
             # Điểm danh chung
             self.attendance_recorded.emit(self.current_user.id, "", timestamp)
             
-            QMessageBox.information(self, "Điểm danh thành công", 
-                                   f"Đã điểm danh thành công cho thí sinh {self.current_user.name}.")
+            QMessageBox.information(self, "Đã xác minh thí sinh", 
+                                   f"Đã xác minh và ghi nhận điểm danh cho thí sinh {self.current_user.name}.")
         
         # Reset for next user
         self.reset_verification()
@@ -578,7 +649,14 @@ class AttendanceCCCDScannerDialog(QDialog):
         
         self.scanning = False
     
+    def done(self, result):
+        """Stop receiving CCCD events once the dialog is closed"""
+        self.stop_camera()
+        self.cccd_events.close()
+        super().done(result)
+    
     def closeEvent(self, event):
         """Handle dialog close event"""
         self.stop_camera()
+        self.cccd_events.close()
         event.accept()
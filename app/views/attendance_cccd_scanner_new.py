@@ -17,7 +17,10 @@ import json
 import face_recognition
 import socket
 from app.controllers.cccd_api import CCCDApiController
-from app.controllers.cccd_socket_server import CCCDSocketServer
+from app.controllers.cccd_gateway import CCCDGateway
+from app.controllers.cccd_pipeline import CCCDIngestPipeline
+from app.utils.event_bus import CCCD_RECEIVED
+from app.utils.qt_event_bridge import QtEventBridge
 from app.utils.face_recognition import compare_faces
 from app.utils.datetime_utils import format_datetime_for_api, format_datetime_for_filename, format_time_from_iso
 
@@ -51,13 +54,15 @@ class AttendanceCCCDScannerDialog(QDialog):
         self.captured_face_path = None
         self.cccd_data_received = {}  # Store all received CCCD data
         
-        # Initialize socket server if not already running
-        self.socket_server = CCCDSocketServer.get_instance()
-        if not self.socket_server.is_running:
-            self.socket_server.start()
+        # Start the CCCD ingest gateway if not already running
+        self.gateway = CCCDGateway.get_instance()
+        if not self.gateway.is_running:
+            self.gateway.start()
+        self.pipeline = CCCDIngestPipeline.get_instance()
         
-        # Register for CCCD data callbacks
-        self.socket_server.register_data_callback(self.on_cccd_data_received)
+        # Nhận dữ liệu CCCD qua event bus, xử lý trên luồng GUI
+        self.cccd_events = QtEventBridge(CCCD_RECEIVED, self)
+        self.cccd_events.events_ready.connect(self.on_cccd_events_received)
         
         # Create data directories
         self.data_dir = os.path.join("app", "data", "captured_faces")
@@ -326,24 +331,35 @@ class AttendanceCCCDScannerDialog(QDialog):
             # Switch to CCCD tab
             self.tab_widget.setCurrentIndex(0)
     
-    def on_cccd_data_received(self, citizen_id, image_path, data):
-        """Callback when CCCD data is received from mobile app"""        # Store the received data
-        self.cccd_data_received[citizen_id] = {
-            'image_path': image_path,
-            'data': data,
-            'timestamp': format_datetime_for_api()
-        }
+    def on_cccd_events_received(self, events):
+        """Handle a batch of CCCD data received from the mobile app (GUI thread)"""
+        current_user_image = None
+        
+        for citizen_id, image_path, data in events:
+            # Store the received data
+            self.cccd_data_received[citizen_id] = {
+                'image_path': image_path,
+                'data': data,
+                'timestamp': format_datetime_for_api()
+            }
+            
+            if self.current_user and self.current_user.citizen_id == citizen_id:
+                current_user_image = image_path
         
         # Update CCCD status
-        self.cccd_status.setText(f"Đã nhận dữ liệu CCCD: {citizen_id}")
+        last_citizen_id = events[-1][0]
+        if len(events) > 1:
+            self.cccd_status.setText(f"Đã nhận {len(events)} dữ liệu CCCD, mới nhất: {last_citizen_id}")
+        else:
+            self.cccd_status.setText(f"Đã nhận dữ liệu CCCD: {last_citizen_id}")
         
-        # Update received CCCD list
+        # Update received CCCD list once for the whole batch
         self.update_received_cccd_table()
         
         # If this matches the current user, update UI
-        if self.current_user and self.current_user.citizen_id == citizen_id:
+        if current_user_image:
             # Update CCCD image
-            pixmap = QPixmap(image_path)
+            pixmap = QPixmap(current_user_image)
             self.cccd_image.setPixmap(pixmap.scaled(
                 self.cccd_image.width(), 
                 self.cccd_image.height(),
@@ -546,14 +562,14 @@ class AttendanceCCCDScannerDialog(QDialog):
             # If this is for a specific exam
             self.attendance_recorded.emit(self.current_user.id, self.exam.id, timestamp)
             
-            QMessageBox.information(self, "Điểm danh thành công", 
-                                   f"Đã điểm danh thành công cho thí sinh {self.current_user.name} tham dự kỳ thi {self.exam.name}.")
+            QMessageBox.information(self, "Đã xác minh thí sinh", 
+                                   f"Đã xác minh và ghi nhận điểm danh cho thí sinh {self.current_user.name} tham dự kỳ thi {self.exam.name}.")
         else:
             # General attendance
             self.attendance_recorded.emit(self.current_user.id, "", timestamp)
             
-            QMessageBox.information(self, "Điểm danh thành công", 
-                                   f"Đã điểm danh thành công cho thí sinh {self.current_user.name}.")
+            QMessageBox.information(self, "Đã xác minh thí sinh", 
+                                   f"Đã xác minh và ghi nhận điểm danh cho thí sinh {self.current_user.name}.")
         
         # Reset for next user
         self.reset_verification()
@@ -577,7 +593,14 @@ class AttendanceCCCDScannerDialog(QDialog):
         
         self.scanning = False
     
+    def done(self, result):
+        """Stop receiving CCCD events once the dialog is closed"""
+        self.stop_camera()
+        self.cccd_events.close()
+        super().done(result)
+    
     def closeEvent(self, event):
         """Handle dialog close event"""
         self.stop_camera()
+        self.cccd_events.close()
         event.accept()
@@ -4,6 +4,11 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt
 from app.models.exam_attendance import ExamAttendance
 from app.views.attendance_cccd_scanner import AttendanceCCCDScannerDialog
+from app.utils.data_loader import DataLoader
+from app.utils.data_repository import DataRepository
+from app.utils.attendance_batch import DELIVERED, FAILED
+from app.utils.event_bus import ATTENDANCE_DELIVERY
+from app.utils.qt_event_bridge import QtEventBridge
 
 class AttendancePanel(QWidget):
     def __init__(self, attendance_controller, user_controller, exam_controller, is_admin=True, auth_controller=None, is_candidate=False):
@@ -17,6 +22,32 @@ class AttendancePanel(QWidget):
         self.attendance_records = []
         self.users = []
         self.exams = []
+        # Tra cứu kỳ thi/thí sinh theo ID qua kho dữ liệu chung do các controller cập nhật
+        self.repository = DataRepository.get_instance()
+        
+        # Exams, users and attendance are fetched concurrently
+        self.data_loader = DataLoader(self)
+        self.data_loader.loaded.connect(self.on_data_loaded)
+        
+        # Admin view: only the page being shown is requested from the server
+        self.page_loader = DataLoader(self)
+        self.page_loader.loaded.connect(self.on_page_loaded)
+        self.current_page = None
+        self.page_cursor = None  # Cursor of the page being shown (None = first page)
+        self.page_history = []  # Cursors of the previous pages, for "Previous"
+        
+        # Admin view with an exam selected: local copy of the exam kept up to date with delta syncs
+        self.sync_loader = DataLoader(self)
+        self.sync_loader.loaded.connect(self.on_sync_loaded)
+        self.synced_exam_id = None  # Exam whose synced records the table shows
+        self.row_index = {}  # attendance_id -> table row
+        self.pending_row_count = 0  # Rows of queued (not yet delivered) records shown first
+        self.showing_snapshot = False  # Table shows data saved on disk until the server answers
+        
+        # Delivery state of attendance queued in the outbox
+        self.delivery_events = QtEventBridge(ATTENDANCE_DELIVERY, self)
+        self.delivery_events.events_ready.connect(self.on_delivery_events)
+        self.queued_marks = set()  # delivery_key of records marked here, warned about if rejected
         
         self.init_ui()
         self.load_data()
@@ -41,8 +72,17 @@ class AttendancePanel(QWidget):
             self.exam_filter_combo.addItem("All Exams", None)
             self.exam_filter_combo.currentIndexChanged.connect(self.filter_attendance)
             
+            self.verification_filter_combo = QComboBox()
+            self.verification_filter_combo.addItem("All Verifications", {})
+            self.verification_filter_combo.addItem("CCCD verified", {'citizen_card_verified': True})
+            self.verification_filter_combo.addItem("CCCD not verified", {'citizen_card_verified': False})
+            self.verification_filter_combo.addItem("Face verified", {'face_verified': True})
+            self.verification_filter_combo.addItem("Face not verified", {'face_verified': False})
+            self.verification_filter_combo.currentIndexChanged.connect(self.filter_attendance)
+            
             filter_layout.addWidget(self.exam_filter_label)
             filter_layout.addWidget(self.exam_filter_combo)
+            filter_layout.addWidget(self.verification_filter_combo)
             filter_layout.addStretch()
             
             self.refresh_btn = QPushButton("Refresh")
@@ -84,7 +124,7 @@ class AttendancePanel(QWidget):
             main_layout.addLayout(button_layout)
           # Attendance table
         self.attendance_table = QTableWidget()
-        headers = ["ID", "Exam", "Candidate", "Attendance Time", "CCCD Verified", "Face Verified"]
+        headers = ["ID", "Exam", "Candidate", "Attendance Time", "CCCD Verified", "Face Verified", "Delivery"]
         
         if self.is_admin:
             headers.append("Actions")
@@ -96,157 +136,380 @@ class AttendancePanel(QWidget):
         
         main_layout.addWidget(self.attendance_table)
         
+        if self.is_admin:
+            # Pager
+            pager_layout = QHBoxLayout()
+            
+            self.prev_page_btn = QPushButton("< Previous")
+            self.prev_page_btn.setEnabled(False)
+            self.prev_page_btn.clicked.connect(self.previous_page)
+            
+            self.page_label = QLabel("")
+            
+            self.next_page_btn = QPushButton("Next >")
+            self.next_page_btn.setEnabled(False)
+            self.next_page_btn.clicked.connect(self.next_page)
+            
+            pager_layout.addStretch()
+            pager_layout.addWidget(self.prev_page_btn)
+            pager_layout.addWidget(self.page_label)
+            pager_layout.addWidget(self.next_page_btn)
+            
+            main_layout.addLayout(pager_layout)
+        
         # Set layout
         self.setLayout(main_layout)
     
     def load_data(self):
+        """Start loading exams, users and attendance records concurrently, see on_data_loaded"""
+        calls = {}
+        
         # Load exams - chỉ tải dữ liệu cần thiết dựa trên quyền
         if self.is_admin:
             # Admin cần tất cả exams
-            self.exams = self.exam_controller.get_all_exams()
+            calls['exams'] = self.exam_controller.get_all_exams
         else:
             # Candidate chỉ cần exams của họ
             if self.is_candidate:
-                self.exams = self.exam_controller.get_my_exams()
+                calls['exams'] = self.exam_controller.get_my_exams
             else:
                 # Fallback cho các trường hợp khác
-                self.exams = self.exam_controller.get_all_exams()
+                calls['exams'] = self.exam_controller.get_all_exams
         
         # Load users - chỉ tải dữ liệu users khi cần thiết
         if self.is_admin:
             # Admin cần thông tin tất cả users
-            self.users = self.user_controller.get_all_users()
+            calls['users'] = self.user_controller.get_all_users
+            # Danh sách điểm danh có thể rất lớn: chỉ tải trang đầu tiên hoặc các thay đổi của kỳ thi đang chọn
+            self.page_history = []
+            self.page_cursor = None
+            self.load_attendance_records()
+            if not self.exams:
+                # Lần tải đầu tiên: hiển thị ngay dữ liệu đã lưu trong khi tải từ máy chủ
+                self.show_snapshot()
         else:
             # Candidate chỉ cần thông tin của họ
-            if self.auth_controller:
-                user = self.auth_controller.get_current_user()
-                if user:
-                    self.users = [user]  # Chỉ lưu thông tin của user hiện tại
-            
-        # Update exam filter
+            user = self.auth_controller.get_current_user() if self.auth_controller else None
+            if user:
+                self.users = [user]  # Chỉ lưu thông tin của user hiện tại
+                calls['attendance'] = lambda: self.attendance_controller.get_attendance_by_user(user.user_id)
+        
+        self.refresh_btn.setEnabled(False)
+        self.data_loader.load(calls)
+    
+    def on_data_loaded(self, results):
+        """Show the data once every call of load_data has returned"""
+        self.refresh_btn.setEnabled(True)
+        
+        if self.showing_snapshot and not results.get('exams'):
+            return  # Không tải được: giữ dữ liệu đã lưu đang hiển thị
+        
+        self.exams = results.get('exams') or []
+        if 'users' in results:
+            self.users = results['users'] or []
+        if 'attendance' in results:
+            self.attendance_records = results['attendance'] or []
+        
+        self.update_exam_filter()
+        self.populate_attendance_table()
+    
+    def show_snapshot(self):
+        """Admin view: show the exams, users and first page saved on disk (no requests)"""
+        exams = self.exam_controller.get_all_exams(from_snapshot=True)
+        if not exams:
+            return
+        self.exams = exams
+        self.users = self.user_controller.get_all_users(from_snapshot=True)
+        self.update_exam_filter()
+        
+        page = self.attendance_controller.query_attendance(from_snapshot=True, **self.get_attendance_filters())
+        if page is not None:
+            self.attendance_records = page.items
+            self.populate_attendance_table()
+            self.page_label.setText("Showing saved data, updating...")
+        self.showing_snapshot = True
+    
+    def update_exam_filter(self):
+        """Fill the admin exam filter from self.exams, keeping the selection"""
         if self.is_admin:
+            # Không kích hoạt filter_attendance (gọi lại API) khi đang nạp lại danh sách
+            selected_exam_id = self.exam_filter_combo.currentData()
+            self.exam_filter_combo.blockSignals(True)
             self.exam_filter_combo.clear()
             self.exam_filter_combo.addItem("All Exams", None)
             
             for exam in self.exams:
                 self.exam_filter_combo.addItem(exam.name, exam.exam_id)
+            # Giữ bộ lọc đang chọn (trang đang hiển thị được tải theo bộ lọc này)
+            self.exam_filter_combo.setCurrentIndex(max(0, self.exam_filter_combo.findData(selected_exam_id)))
+            self.exam_filter_combo.blockSignals(False)
+    
+    def get_attendance_filters(self):
+        """query_attendance filters selected in the admin view"""
+        filters = {'exam_id': self.exam_filter_combo.currentData()}
+        filters.update(self.verification_filter_combo.currentData() or {})
+        return filters
+    
+    def load_page(self, cursor=None):
+        """Request one page of attendance records for the selected filters, see on_page_loaded"""
+        self.page_cursor = cursor
+        self.prev_page_btn.setEnabled(False)
+        self.next_page_btn.setEnabled(False)
+        self.page_label.setText("Loading...")
+        
+        filters = self.get_attendance_filters()
+        self.page_loader.load({
+            'page': lambda: self.attendance_controller.query_attendance(cursor=cursor, **filters)
+        })
+    
+    def on_page_loaded(self, results):
+        page = results.get('page')
+        if page is None and self.showing_snapshot:
+            self.page_label.setText("Could not update, showing saved data")
+            return
+        self.showing_snapshot = False
+        self.current_page = page
+        self.synced_exam_id = None
         
-        # Load attendance records
-        self.load_attendance_records()
+        if page is None:
+            self.attendance_records = []
+            self.page_label.setText("Could not load attendance records")
+        else:
+            self.attendance_records = page.items
+            page_text = f"Page {len(self.page_history) + 1}"
+            if page.page_count is not None:
+                page_text += f" of {page.page_count}"
+            if page.total is not None:
+                page_text += f" ({page.total} records)"
+            self.page_label.setText(page_text)
+            self.next_page_btn.setEnabled(page.has_next)
+        self.prev_page_btn.setEnabled(bool(self.page_history))
+        
+        self.populate_attendance_table()
+    
+    def next_page(self):
+        if self.current_page is not None and self.current_page.has_next:
+            self.page_history.append(self.page_cursor)
+            self.load_page(self.current_page.next_cursor)
+    
+    def previous_page(self):
+        if self.page_history:
+            self.load_page(self.page_history.pop())
+    
+    def sync_exam(self, exam_id):
+        """Fetch the changes to an exam's attendance since the last sync, see on_sync_loaded"""
+        self.prev_page_btn.setEnabled(False)
+        self.next_page_btn.setEnabled(False)
+        self.page_label.setText("Syncing...")
+        self.sync_loader.load({'sync': lambda: self.attendance_controller.sync_attendance(exam_id)})
+    
+    def on_sync_loaded(self, results):
+        """Show an exam's records, updating only the rows that changed since the last sync"""
+        result = results.get('sync')
+        if result is None:
+            self.page_label.setText("Could not load attendance records")
+            return
+        if result.exam_id != self.exam_filter_combo.currentData():
+            return  # Another filter was selected meanwhile
+        
+        if result.full or result.removed or self.synced_exam_id != result.exam_id:
+            self.attendance_records = self.attendance_controller.get_synced_attendance(result.exam_id)
+            self.synced_exam_id = result.exam_id
+            self.populate_attendance_table()
+        else:
+            self.apply_changed_records(result.changed)
+        self.apply_verification_filter()
+        
+        page_text = f"{result.total} records"
+        if not result.full:
+            page_text += f" ({len(result.changed)} changed since last refresh)"
+        self.page_label.setText(page_text)
+    
+    def apply_changed_records(self, records):
+        """Update the rows of changed records in place and append new ones"""
+        for attendance in records:
+            row = self.row_index.get(attendance.attendance_id)
+            if row is not None:
+                self.attendance_records[row - self.pending_row_count] = attendance
+                self.set_attendance_row(row, attendance)
+            else:
+                self.attendance_records.append(attendance)
+                row = self.attendance_table.rowCount()
+                self.add_attendance_row(row, attendance)
+                self.row_index[attendance.attendance_id] = row
+    
+    def apply_verification_filter(self):
+        """Hide synced rows not matching the verification filter (filtered locally)"""
+        filters = {
+            {'citizen_card_verified': 'citizenCardVerified', 'face_verified': 'faceVerified'}[name]: value
+            for name, value in (self.verification_filter_combo.currentData() or {}).items()
+        }
+        for index, attendance in enumerate(self.attendance_records):
+            matches = self.attendance_controller.matches_filters(attendance, filters)
+            self.attendance_table.setRowHidden(index + self.pending_row_count, not matches)
     
     def load_attendance_records(self):
         if self.is_admin:
-            # Admin view - load all attendance records
-            self.attendance_records = self.attendance_controller.get_all_attendance()
+            exam_id = self.exam_filter_combo.currentData()
+            if exam_id:
+                # Admin view, one exam - fetch only what changed since the last refresh
+                self.sync_exam(exam_id)
+            else:
+                # Admin view - reload the page being shown
+                self.load_page(self.page_cursor)
         else:
             # Candidate view - load only current user's attendance
             user = self.auth_controller.get_current_user() if self.auth_controller else None
             
             if user:
                 self.attendance_records = self.attendance_controller.get_attendance_by_user(user.user_id)
-        
-        self.populate_attendance_table()
+            
+            self.populate_attendance_table()
     
     def filter_attendance(self):
-        # Get selected exam ID
-        selected_index = self.exam_filter_combo.currentIndex()
-        exam_id = self.exam_filter_combo.itemData(selected_index)
-        
-        if exam_id:
-            # Filter by exam
-            self.attendance_records = self.attendance_controller.get_attendance_by_exam(exam_id)
+        # Bộ lọc được gửi lên máy chủ; bắt đầu lại từ trang đầu tiên
+        self.page_history = []
+        self.page_cursor = None
+        self.load_attendance_records()
+    
+    def on_delivery_events(self, events):
+        """Refresh when queued attendance changes state (args: key, state, user_id, exam_id)"""
+        for key, state, user_id, _ in events:
+            if key in self.queued_marks and state in (DELIVERED, FAILED):
+                self.queued_marks.discard(key)
+                if state == FAILED:
+                    error = self.attendance_controller.get_delivery_error(key)
+                    QMessageBox.warning(self, "Attendance rejected",
+                                        f"The server rejected the attendance of user {user_id}: {error}")
+        if any(state == DELIVERED for _, state, _, _ in events):
+            # The record now comes from the server
+            if self.is_admin:
+                self.load_attendance_records()
+            else:
+                self.load_data()
         else:
-            # Show all attendance
-            self.attendance_records = self.attendance_controller.get_all_attendance()
-        
-        self.populate_attendance_table()
+            self.populate_attendance_table()
+    
+    def get_pending_records(self):
+        """Queued attendance not yet delivered, limited to what this panel shows"""
+        pending = self.attendance_controller.get_pending_attendance()
+        if self.is_admin:
+            exam_id = self.exam_filter_combo.itemData(self.exam_filter_combo.currentIndex())
+            if exam_id:
+                pending = [a for a in pending if a.exam_id == exam_id]
+        else:
+            user = self.auth_controller.get_current_user() if self.auth_controller else None
+            pending = [a for a in pending if user and a.user_id == user.user_id]
+        return pending
     
     def populate_attendance_table(self):
         self.attendance_table.setRowCount(0)
         
-        for row, attendance in enumerate(self.attendance_records):
-            self.attendance_table.insertRow(row)
-            
-            # Find exam and user names
-            exam_name = "Unknown"
-            user_name = "Unknown"
-            
-            for exam in self.exams:
-                if exam.exam_id == attendance.exam_id:
-                    exam_name = exam.name
-                    break
-            
-            for user in self.users:
-                if user.user_id == attendance.user_id:
-                    user_name = user.name
-                    break
-              # Set attendance details - using new API format
-            attendance_id = attendance.attendance_id if hasattr(attendance, 'attendance_id') else (str(getattr(attendance, 'id', 'Unknown')))
-            self.attendance_table.setItem(row, 0, QTableWidgetItem(str(attendance_id)))
-              # Exam info - Display both name and subject
-            exam_display = exam_name  # Default fallback
-            if hasattr(attendance, 'exam') and isinstance(attendance.exam, dict):
-                exam_name = attendance.exam.get('name', 'Unknown')
-                exam_subject = attendance.exam.get('subject', '')
-                if exam_subject:
-                    exam_display = f"{exam_name} - {exam_subject}"
-                else:
-                    exam_display = exam_name
-            self.attendance_table.setItem(row, 1, QTableWidgetItem(exam_display))
-            
-            # Candidate info
-            if hasattr(attendance, 'candidate') and isinstance(attendance.candidate, dict) and 'name' in attendance.candidate:
-                user_name = attendance.candidate['name']
-            self.attendance_table.setItem(row, 2, QTableWidgetItem(user_name))
-              # Attendance time
-            attendance_time = ""
-            if hasattr(attendance, 'attendanceTime') and attendance.attendanceTime:
-                attendance_time = attendance.attendanceTime
-            elif hasattr(attendance, 'attendance_time') and attendance.attendance_time:
-                attendance_time = attendance.attendance_time
-            elif hasattr(attendance, 'check_in_time') and attendance.check_in_time:
-                attendance_time = attendance.check_in_time
-            
-            print(f"DEBUG: Attendance time for attendance {attendance.attendance_id if hasattr(attendance, 'attendance_id') else 'unknown'}: {attendance_time}")
-                
-            attendance_time_item = QTableWidgetItem(str(attendance_time))
-            self.attendance_table.setItem(row, 3, attendance_time_item)
-              # CCCD Verification status
-            cccd_verified = False
-            if hasattr(attendance, 'citizenCardVerified'):
-                cccd_verified = attendance.citizenCardVerified
-            
-            print(f"DEBUG: CCCD Verified for attendance {attendance.attendance_id if hasattr(attendance, 'attendance_id') else 'unknown'}: {cccd_verified} (type: {type(cccd_verified)})")
+        # Bản ghi đang chờ gửi chỉ hiển thị ở trang đầu tiên
+        pending = self.get_pending_records() if not (self.is_admin and self.page_history) else []
+        self.pending_row_count = len(pending)
+        self.row_index = {}
+        for row, attendance in enumerate(pending + self.attendance_records):
+            self.add_attendance_row(row, attendance)
+            if row >= self.pending_row_count:
+                self.row_index[attendance.attendance_id] = row
+    
+    def find_user(self, user_id):
+        """User by ID; the candidate view only knows the logged-in user"""
+        user = self.repository.get_user(user_id)
+        if user is None and not self.is_admin and self.users and self.users[0].user_id == user_id:
+            user = self.users[0]
+        return user
+    
+    def add_attendance_row(self, row, attendance):
+        self.attendance_table.insertRow(row)
+        self.set_attendance_row(row, attendance)
+    
+    def set_attendance_row(self, row, attendance):
+        # Find exam and user names
+        exam = self.repository.get_exam(attendance.exam_id)
+        exam_name = exam.name if exam else "Unknown"
+        user = self.find_user(attendance.user_id)
+        user_name = user.name if user else "Unknown"
+          # Set attendance details - using new API format
+        attendance_id = attendance.attendance_id if hasattr(attendance, 'attendance_id') else (str(getattr(attendance, 'id', 'Unknown')))
+        self.attendance_table.setItem(row, 0, QTableWidgetItem(str(attendance_id)))
+          # Exam info - Display both name and subject
+        exam_display = exam_name  # Default fallback
+        if hasattr(attendance, 'exam') and isinstance(attendance.exam, dict):
+            exam_name = attendance.exam.get('name', 'Unknown')
+            exam_subject = attendance.exam.get('subject', '')
+            if exam_subject:
+                exam_display = f"{exam_name} - {exam_subject}"
+            else:
+                exam_display = exam_name
+        self.attendance_table.setItem(row, 1, QTableWidgetItem(exam_display))
+        
+        # Candidate info
+        if hasattr(attendance, 'candidate') and isinstance(attendance.candidate, dict) and 'name' in attendance.candidate:
+            user_name = attendance.candidate['name']
+        self.attendance_table.setItem(row, 2, QTableWidgetItem(user_name))
+          # Attendance time
+        attendance_time = ""
+        if hasattr(attendance, 'attendanceTime') and attendance.attendanceTime:
+            attendance_time = attendance.attendanceTime
+        elif hasattr(attendance, 'attendance_time') and attendance.attendance_time:
+            attendance_time = attendance.attendance_time
+        elif hasattr(attendance, 'check_in_time') and attendance.check_in_time:
+            attendance_time = attendance.check_in_time
+        
+        print(f"DEBUG: Attendance time for attendance {attendance.attendance_id if hasattr(attendance, 'attendance_id') else 'unknown'}: {attendance_time}")
             
-            cccd_item = QTableWidgetItem("✅" if cccd_verified else "❌")
-            cccd_item.setBackground(Qt.green if cccd_verified else Qt.red)
-            cccd_item.setTextAlignment(Qt.AlignCenter)
-            self.attendance_table.setItem(row, 4, cccd_item)
+        attendance_time_item = QTableWidgetItem(str(attendance_time))
+        self.attendance_table.setItem(row, 3, attendance_time_item)
+          # CCCD Verification status
+        cccd_verified = False
+        if hasattr(attendance, 'citizenCardVerified'):
+            cccd_verified = attendance.citizenCardVerified
+        
+        print(f"DEBUG: CCCD Verified for attendance {attendance.attendance_id if hasattr(attendance, 'attendance_id') else 'unknown'}: {cccd_verified} (type: {type(cccd_verified)})")
+        
+        cccd_item = QTableWidgetItem("✅" if cccd_verified else "❌")
+        cccd_item.setBackground(Qt.green if cccd_verified else Qt.red)
+        cccd_item.setTextAlignment(Qt.AlignCenter)
+        self.attendance_table.setItem(row, 4, cccd_item)
+        
+        # Face Verification status
+        face_verified = False
+        if hasattr(attendance, 'faceVerified'):
+            face_verified = attendance.faceVerified
+        
+        print(f"DEBUG: Face Verified for attendance {attendance.attendance_id if hasattr(attendance, 'attendance_id') else 'unknown'}: {face_verified} (type: {type(face_verified)})")
+        
+        face_item = QTableWidgetItem("✅" if face_verified else "❌")
+        face_item.setBackground(Qt.green if face_verified else Qt.red)
+        face_item.setTextAlignment(Qt.AlignCenter)
+        self.attendance_table.setItem(row, 5, face_item)
+        
+        # Delivery state: records from the server are delivered, others are still queued locally
+        delivery_state = getattr(attendance, 'delivery_state', 'delivered')
+        delivery_labels = {'pending': "⏳ Pending", 'failed': "⚠ Rejected", 'delivered': "Delivered"}
+        delivery_item = QTableWidgetItem(delivery_labels.get(delivery_state, delivery_state))
+        delivery_item.setTextAlignment(Qt.AlignCenter)
+        if delivery_state == 'pending':
+            delivery_item.setBackground(Qt.yellow)
+        elif delivery_state == 'failed':
+            delivery_item.setBackground(Qt.red)
+        self.attendance_table.setItem(row, 6, delivery_item)
+        
+        if self.is_admin and delivery_state == 'delivered':
+            # Action buttons for admin
+            action_widget = QWidget()
+            action_layout = QHBoxLayout()
+            action_layout.setContentsMargins(0, 0, 0, 0)
             
-            # Face Verification status
-            face_verified = False
-            if hasattr(attendance, 'faceVerified'):
-                face_verified = attendance.faceVerified
+            edit_btn = QPushButton("Edit")
+            edit_btn.clicked.connect(lambda checked, a=attendance: self.edit_attendance(a))
             
-            print(f"DEBUG: Face Verified for attendance {attendance.attendance_id if hasattr(attendance, 'attendance_id') else 'unknown'}: {face_verified} (type: {type(face_verified)})")
+            action_layout.addWidget(edit_btn)
             
-            face_item = QTableWidgetItem("✅" if face_verified else "❌")
-            face_item.setBackground(Qt.green if face_verified else Qt.red)
-            face_item.setTextAlignment(Qt.AlignCenter)
-            self.attendance_table.setItem(row, 5, face_item)
-            if self.is_admin:
-                # Action buttons for admin
-                action_widget = QWidget()
-                action_layout = QHBoxLayout()
-                action_layout.setContentsMargins(0, 0, 0, 0)
-                
-                edit_btn = QPushButton("Edit")
-                edit_btn.clicked.connect(lambda checked, a=attendance: self.edit_attendance(a))
-                
-                action_layout.addWidget(edit_btn)
-                
-                action_widget.setLayout(action_layout)
-                self.attendance_table.setCellWidget(row, 6, action_widget)
+            action_widget.setLayout(action_layout)
+            self.attendance_table.setCellWidget(row, 7, action_widget)
     
     def show_mark_attendance_dialog(self):
         """Show dialog to mark attendance manually"""
@@ -255,8 +518,7 @@ class AttendancePanel(QWidget):
             attendance = dialog.get_attendance()
             
             result = self.attendance_controller.mark_attendance(attendance)
-            if result:
-                QMessageBox.information(self, "Success", "Attendance recorded successfully.")
+            if self.report_marked(result):
                 self.load_attendance_records()
             else:
                 QMessageBox.warning(self, "Error", "Failed to record attendance.")
@@ -270,13 +532,7 @@ class AttendancePanel(QWidget):
         # Get the current selected exam from the filter dropdown
         selected_index = self.exam_filter_combo.currentIndex()
         exam_id = self.exam_filter_combo.itemData(selected_index)
-        selected_exam = None
-        
-        # Find the selected exam
-        for exam in self.exams:
-            if exam.exam_id == exam_id:
-                selected_exam = exam
-                break
+        selected_exam = self.repository.get_exam(exam_id)
           # Launch the CCCD scanner dialog
         dialog = AttendanceCCCDScannerDialog(self, selected_exam, self.users)
         dialog.attendance_recorded.connect(self.on_face_attendance_recorded)
@@ -289,9 +545,23 @@ class AttendancePanel(QWidget):
             user_id, exam_id
         )
         
-        if result:
-            QMessageBox.information(self, "Thành công", "Điểm danh thành công với xác thực CCCD và khuôn mặt.")
+        if self.report_marked(result):
             self.load_attendance_records()  # Refresh the attendance records
+    
+    def report_marked(self, result):
+        """
+        Tell whether a marked record reached the server or is waiting in the outbox
+        (the answer for queued records comes through on_delivery_events)
+        """
+        if not result or result.delivery_state == FAILED:
+            return False
+        if result.delivery_state == DELIVERED:
+            QMessageBox.information(self, "Success", "Attendance recorded successfully.")
+        else:
+            self.queued_marks.add(result.delivery_key)
+            QMessageBox.information(self, "Attendance queued",
+                                    "Attendance recorded locally, it is being sent to the server.")
+        return True
         
     def edit_attendance(self, attendance):
         """Show dialog to edit an existing attendance record"""
@@ -3,6 +3,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                               QMessageBox, QDialog)
 from PyQt5.QtCore import Qt
 from app.models.exam import Exam
+from app.utils.data_repository import DataRepository
 from config.config import Config
 # These imports will be used in the show_exam_detail method
 # We don't import them at the top to avoid circular imports
@@ -55,7 +56,7 @@ class CandidateExamPanel(QWidget):
         self.setLayout(main_layout)
     
     def load_exams(self):
-        self.exams = self.exam_controller.get_my_exams()
+        self.exams = self.exam_controller.get_my_exams() or []
         self.populate_exam_table()
     
     def populate_exam_table(self):
@@ -83,11 +84,7 @@ class CandidateExamPanel(QWidget):
         exam_id = self.exam_table.item(row, 0).text()  # Do not cast to int, keep as string (UUID or int)
         
         # Get the selected exam object
-        selected_exam = None
-        for exam in self.exams:
-            if str(exam.exam_id) == exam_id:
-                selected_exam = exam
-                break
+        selected_exam = DataRepository.get_instance().get_exam(exam_id)
         
         if selected_exam:
             from app.views.exam_detail_dialog import ExamDetailDialog
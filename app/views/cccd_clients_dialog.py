@@ -0,0 +1,84 @@
+import datetime
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt5.QtCore import Qt, QTimer
+from app.controllers.cccd_gateway import CCCDGateway
+from app.utils.datetime_utils import VIETNAM_TZ
+
+class CCCDClientsDialog(QDialog):
+    """Live per-phone statistics of the CCCD ingest gateway"""
+
+    COLUMNS = [
+        ("client", "Thiết bị"),
+        ("address", "Địa chỉ IP"),
+        ("messages", "Bản ghi nhận"),
+        ("processed", "Đã xử lý"),
+        ("duplicates", "Quét trùng"),
+        ("rate_limited", "Bị giới hạn"),
+        ("errors", "Lỗi"),
+        ("queued", "Đang chờ"),
+        ("last_seen", "Lần cuối")
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.gateway = CCCDGateway.get_instance()
+
+        self.setWindowTitle("Thiết bị quét CCCD")
+        self.setMinimumSize(900, 400)
+        self.init_ui()
+        self.refresh()
+
+        # Làm mới số liệu định kỳ khi hộp thoại đang mở
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(2000)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("font-weight: bold;")
+        layout.addWidget(self.summary_label)
+
+        self.clients_table = QTableWidget(0, len(self.COLUMNS))
+        self.clients_table.setHorizontalHeaderLabels([title for _, title in self.COLUMNS])
+        self.clients_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.clients_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.clients_table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(self.clients_table)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        close_button = QPushButton("Đóng")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        """Reload the statistics from the gateway"""
+        if self.gateway.is_running:
+            pipeline_stats = self.gateway.pipeline.get_stats()
+            self.summary_label.setText(
+                f"Máy chủ đang chạy - {len(self.gateway.clients)} kết nối đang mở - "
+                f"đã nhận {pipeline_stats['received']} bản ghi, "
+                f"{pipeline_stats['duplicates']} quét trùng, {pipeline_stats['errors']} lỗi"
+            )
+        else:
+            self.summary_label.setText("Máy chủ nhận dữ liệu CCCD chưa chạy")
+
+        clients = sorted(self.gateway.get_client_stats(), key=lambda stats: stats['last_seen'] or 0, reverse=True)
+        self.clients_table.setRowCount(len(clients))
+        for row, stats in enumerate(clients):
+            for column, (key, _) in enumerate(self.COLUMNS):
+                value = stats.get(key)
+                if key == 'last_seen':
+                    value = datetime.datetime.fromtimestamp(value, VIETNAM_TZ).strftime("%d/%m/%Y %H:%M:%S") if value else ""
+                item = QTableWidgetItem("" if value is None else str(value))
+                if isinstance(value, int):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.clients_table.setItem(row, column, item)
+
+    def done(self, result):
+        self.refresh_timer.stop()
+        super().done(result)
@@ -3,6 +3,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QFrame, QSplitter, QGridLayout)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QFont
+import datetime
 
 from app.views.user_management import UserManagementPanel
 from app.views.exam_management import ExamManagementPanel
@@ -10,6 +11,8 @@ from app.views.attendance_panel import AttendancePanel
 from app.views.monitoring_panel import MonitoringPanel
 from app.views.candidate_exam_panel import CandidateExamPanel
 from app.utils.datetime_utils import format_date_vietnamese
+from app.utils.data_loader import DataLoader
+from app.utils.api_service import ApiService
 from config.config import Config
 
 class DashboardScreen(QWidget):
@@ -20,7 +23,12 @@ class DashboardScreen(QWidget):
         self.exam_controller = exam_controller
         self.attendance_controller = attendance_controller
         
+        # Tải số liệu tổng quan song song, không chặn giao diện
+        self.summary_loader = DataLoader(self)
+        self.summary_loader.loaded.connect(self.on_summary_loaded)
+        
         self.init_ui()
+        self.load_summary()
     
     def init_ui(self):
         # Main layout
@@ -95,12 +103,21 @@ class DashboardScreen(QWidget):
         # Actions section
         actions_layout = QHBoxLayout()
         
+        # Thời điểm của số liệu đang hiển thị và trạng thái cập nhật nền
+        self.freshness_label = QLabel("")
+        self.freshness_label.setStyleSheet("color: #555; font-size: 12px;")
+        self.updating_label = QLabel("⟳ Đang cập nhật...")
+        self.updating_label.setStyleSheet("color: #1a73e8; font-size: 12px;")
+        self.updating_label.setVisible(False)
+        
         refresh_btn = QPushButton("Làm mới dữ liệu")
         refresh_btn.setProperty("secondary", "true")
         refresh_btn.setIcon(self.style().standardIcon(self.style().SP_BrowserReload))
         refresh_btn.clicked.connect(self.load_data)
         
         actions_layout.addStretch()
+        actions_layout.addWidget(self.updating_label)
+        actions_layout.addWidget(self.freshness_label)
         actions_layout.addWidget(refresh_btn)
         
         # Add to header layout
@@ -163,24 +180,7 @@ class DashboardScreen(QWidget):
         # Kiểm tra vai trò người dùng để chỉ gọi API cần thiết
         is_admin = self.auth_controller.is_admin()
         
-        # Lấy số liệu API dựa trên vai trò
-        if is_admin:
-            # Admin có quyền xem tất cả dữ liệu
-            users_count = len(self.user_controller.get_all_users())
-            exams_count = len(self.exam_controller.get_all_exams())
-            
-            try:
-                attendances_count = len(self.attendance_controller.get_all_attendance())
-            except:
-                attendances_count = 0
-        else:
-            # Candidate chỉ cần API liên quan đến kỳ thi của họ
-            users_count = 1  # Chỉ họ
-            exams_count = len(self.exam_controller.get_my_exams())
-            
-            # Candidate không cần thống kê điểm danh tổng thể
-            attendances_count = 0
-        
+        # Số liệu được điền khi load_summary() tải xong
         # Users stat
         users_box = QFrame()
         users_box.setObjectName("users-box")
@@ -188,7 +188,7 @@ class DashboardScreen(QWidget):
         users_layout = QVBoxLayout(users_box)
         
         if is_admin:
-            users_value = QLabel(str(users_count))
+            users_value = QLabel("...")
             users_label = QLabel("Người dùng")
         else:
             # Đối với candidate, hiển thị thông tin cá nhân
@@ -209,7 +209,7 @@ class DashboardScreen(QWidget):
         exams_box.setProperty("class", "stat-box")
         exams_layout = QVBoxLayout(exams_box)
         
-        exams_value = QLabel(str(exams_count))
+        exams_value = QLabel("...")
         exams_value.setProperty("class", "stat-value")
         exams_value.setAlignment(Qt.AlignCenter)
         
@@ -231,7 +231,7 @@ class DashboardScreen(QWidget):
         attendance_layout = QVBoxLayout(attendance_box)
         
         if is_admin:
-            attendance_value = QLabel(str(attendances_count))
+            attendance_value = QLabel("...")
             attendance_label = QLabel("Điểm danh")
         else:
             # Chưa có API để lấy số lượng điểm danh của candidate
@@ -273,8 +273,70 @@ class DashboardScreen(QWidget):
         summary_layout.addWidget(attendance_box, 0, 2)
         summary_layout.addWidget(monitoring_box, 0, 3)
         
+        self.users_value = users_value
+        self.exams_value = exams_value
+        self.attendance_value = attendance_value
+        
         return summary_frame
     
+    def summary_calls(self, from_snapshot=False):
+        """Calls returning the summary counts, keyed like on_summary_loaded's results"""
+        if self.auth_controller.is_admin():
+            # Admin có quyền xem tất cả dữ liệu
+            return {
+                'users': lambda: self.user_controller.get_all_users(from_snapshot=from_snapshot),
+                'exams': lambda: self.exam_controller.get_all_exams(from_snapshot=from_snapshot),
+                # Chỉ cần số lượng: không tải toàn bộ danh sách điểm danh
+                'attendances': lambda: self.attendance_controller.count_attendance(from_snapshot=from_snapshot)
+            }
+        # Candidate chỉ cần API liên quan đến kỳ thi của họ
+        return {'exams': lambda: self.exam_controller.get_my_exams(from_snapshot=from_snapshot)}
+    
+    def load_summary(self):
+        """
+        Show the summary saved on disk right away, then fetch the current counts
+        concurrently in the background, see on_summary_loaded
+        """
+        self.show_summary_snapshot()
+        self.updating_label.setVisible(True)
+        self.summary_loader.load(self.summary_calls())
+    
+    def show_summary_snapshot(self):
+        """Show the counts of the last session (snapshots on disk, no requests)"""
+        if self.auth_controller.is_admin():
+            urls = [Config.USER_ALL_URL, Config.EXAMS_URL]
+        else:
+            urls = [Config.MY_EXAMS_URL]
+        api_service = ApiService.get_instance()
+        saved_times = [api_service.get_snapshot_time(url) for url in urls]
+        if None in saved_times:
+            return  # Chưa có dữ liệu lưu (lần đăng nhập đầu tiên): chờ tải từ máy chủ
+        
+        results = {name: call() for name, call in self.summary_calls(from_snapshot=True).items()}
+        self.show_summary(results)
+        # Số liệu cũ nhất quyết định độ mới của cả bảng tổng quan
+        self.freshness_label.setText(f"Dữ liệu lúc {min(saved_times).strftime('%H:%M %d/%m/%Y')}")
+    
+    def on_summary_loaded(self, results):
+        """Show the summary counts once all calls have returned"""
+        self.updating_label.setVisible(False)
+        # None: lệnh gọi thất bại (danh sách rỗng là [] / 0)
+        if any(value is None for value in results.values()):
+            if not self.freshness_label.text():
+                self.show_summary(results)  # Không có dữ liệu đã lưu: hiển thị phần tải được
+            return  # Giữ số liệu đã lưu (nếu có) cùng thời điểm của nó
+        self.show_summary(results)
+        self.freshness_label.setText(f"Cập nhật lúc {datetime.datetime.now().strftime('%H:%M %d/%m/%Y')}")
+    
+    def show_summary(self, results):
+        if 'users' in results:
+            self.users_value.setText(str(len(results['users'] or [])))
+        if 'exams' in results:
+            self.exams_value.setText(str(len(results['exams'] or [])))
+        if 'attendances' in results:
+            count = results['attendances']
+            self.attendance_value.setText(str(count) if count is not None else "-")
+    
     def initialize_panels(self):
         # Check user role
         is_admin = self.auth_controller.is_admin()
@@ -340,6 +402,7 @@ class DashboardScreen(QWidget):
     def load_data(self):
         # Refresh the header with current user info
         self.refresh_header()
+        self.load_summary()
         
         # Update data in all tabs
         for i in range(self.tab_widget.count()):
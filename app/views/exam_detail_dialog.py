@@ -4,7 +4,10 @@ from PyQt5.QtCore import Qt
 from app.models.exam_attendance import ExamAttendance
 from app.controllers.attendance_controller import AttendanceController
 from app.utils.api_service import ApiService
+from app.utils.attendance_batch import DELIVERED, FAILED
 from app.utils.datetime_utils import format_datetime_for_api
+from app.utils.event_bus import ATTENDANCE_DELIVERY
+from app.utils.qt_event_bridge import QtEventBridge
 
 class ExamDetailDialog(QDialog):
     def __init__(self, parent, exam, exam_controller):
@@ -14,6 +17,11 @@ class ExamDetailDialog(QDialog):
         self.attendance_controller = AttendanceController()
         self.api_service = ApiService.get_instance()
         
+        # Điểm danh đang chờ máy chủ xác nhận (delivery_key), kết quả báo qua on_delivery_events
+        self.pending_key = None
+        self.delivery_events = QtEventBridge(ATTENDANCE_DELIVERY, self)
+        self.delivery_events.events_ready.connect(self.on_delivery_events)
+        
         self.setWindowTitle(f"Chi tiết kỳ thi: {exam.name}")
         self.setMinimumWidth(500)
         self.setMinimumHeight(400)
@@ -128,8 +136,13 @@ class ExamDetailDialog(QDialog):
         attendance_layout.addWidget(self.attendance_btn)
         attendance_layout.addStretch()
         
+        self.delivery_label = QLabel("")
+        self.delivery_label.setAlignment(Qt.AlignCenter)
+        self.delivery_label.setVisible(False)
+        
         content_layout.addSpacing(20)
         content_layout.addLayout(attendance_layout)
+        content_layout.addWidget(self.delivery_label)
         content_layout.addStretch()
         
         # Add content frame to main layout
@@ -173,16 +186,50 @@ class ExamDetailDialog(QDialog):
             # Submit attendance
             result = self.attendance_controller.mark_attendance(attendance)
             
-            if result:
-                QMessageBox.information(
-                    self, 
-                    "Thành công", 
-                    "Đã điểm danh thành công. Chúc bạn làm bài thi tốt!"
-                )
-                self.accept()
+            if result and result.delivery_state == DELIVERED:
+                self.show_attendance_delivered()
+            elif result and result.delivery_state != FAILED:
+                # Đã lưu vào hàng đợi: chờ máy chủ xác nhận (bản ghi vẫn được gửi nếu đóng cửa sổ)
+                self.pending_key = result.delivery_key
+                self.attendance_btn.setEnabled(False)
+                self.delivery_label.setText("Đã ghi nhận điểm danh, đang gửi lên máy chủ...")
+                self.delivery_label.setStyleSheet("color: #f57c00; font-weight: bold;")
+                self.delivery_label.setVisible(True)
             else:
                 QMessageBox.warning(
                     self, 
                     "Lỗi", 
                     "Không thể điểm danh. Vui lòng thử lại hoặc liên hệ giám thị."
                 )
+    
+    def on_delivery_events(self, events):
+        """Show the server's answer to the queued attendance (args: key, state, user_id, exam_id)"""
+        for key, state, _, _ in events:
+            if key != self.pending_key:
+                continue
+            if state == DELIVERED:
+                self.pending_key = None
+                self.show_attendance_delivered()
+            elif state == FAILED:
+                self.pending_key = None
+                error = self.attendance_controller.get_delivery_error(key)
+                self.delivery_label.setText("Điểm danh bị máy chủ từ chối")
+                self.delivery_label.setStyleSheet("color: #d32f2f; font-weight: bold;")
+                self.attendance_btn.setEnabled(True)
+                QMessageBox.warning(
+                    self,
+                    "Điểm danh bị từ chối",
+                    f"Máy chủ không chấp nhận điểm danh: {error}\nVui lòng thử lại hoặc liên hệ giám thị."
+                )
+    
+    def show_attendance_delivered(self):
+        QMessageBox.information(
+            self, 
+            "Thành công", 
+            "Đã điểm danh thành công. Chúc bạn làm bài thi tốt!"
+        )
+        self.accept()
+    
+    def done(self, result):
+        self.delivery_events.close()
+        super().done(result)
@@ -54,7 +54,7 @@ class ExamManagementPanel(QWidget):
         self.setLayout(main_layout)
     
     def load_exams(self):
-        self.exams = self.exam_controller.get_all_exams()
+        self.exams = self.exam_controller.get_all_exams() or []
         self.populate_exam_table()
     
     def populate_exam_table(self):
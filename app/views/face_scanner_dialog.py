@@ -8,15 +8,17 @@ import os
 import socket
 import face_recognition
 from app.controllers.cccd_api import CCCDApiController
-from app.controllers.cccd_socket_server import CCCDSocketServer
+from app.controllers.cccd_gateway import CCCDGateway
+from app.controllers.cccd_pipeline import CCCDIngestPipeline
+from app.utils.event_bus import CCCD_RECEIVED
+from app.utils.qt_event_bridge import QtEventBridge
 from app.utils.face_recognition import compare_faces
 from app.utils.api_service import ApiService
 from app.utils.datetime_utils import format_datetime_for_filename
 from app.models.user import User
+from config.config import Config
 
 class FaceScannerDialog(QDialog):
-    cccd_data_received_signal = pyqtSignal(str, str, dict)
-    
     def __init__(self, parent, exam, user=None):
         super().__init__(parent)
         self.exam = exam
@@ -33,15 +35,16 @@ class FaceScannerDialog(QDialog):
         self.captured_face_path = None
         self.timer = None
         
-        # Initialize socket server if not already running
-        self.socket_server = CCCDSocketServer.get_instance()
-        if not self.socket_server.is_running:
-            self.socket_server.start()
+        # Start the CCCD ingest gateway if not already running
+        self.gateway = CCCDGateway.get_instance()
+        if not self.gateway.is_running:
+            self.gateway.start()
+        self.pipeline = CCCDIngestPipeline.get_instance()
         
         # Register for CCCD data callbacks
         print("Registering CCCD data callback in FaceScannerDialog")
-        self.cccd_data_received_signal.connect(self.handle_cccd_data_received)
-        self.socket_server.register_data_callback(self._cccd_data_callback_threadsafe)
+        self.cccd_events = QtEventBridge(CCCD_RECEIVED, self)
+        self.cccd_events.events_ready.connect(self.on_cccd_events_received)
         
         # Create data directories
         self.data_dir = os.path.join("app", "data", "captured_faces")
@@ -208,7 +211,7 @@ class FaceScannerDialog(QDialog):
         """Lấy thông tin user đã đăng nhập từ API nội bộ (dùng ApiService để đảm bảo có token)"""
         try:
             api = ApiService.get_instance()
-            data = api.get("http://13.212.197.79:8080/api/user/profile")
+            data = api.get(Config.USER_PROFILE_URL)
             print(f"API /api/user/profile data: {data}")
             if data and data.get("citizenId"):
                 user = User(
@@ -226,13 +229,10 @@ class FaceScannerDialog(QDialog):
             print(f"Error fetching logged-in user: {e}")
         return None
 
-    def _cccd_data_callback_threadsafe(self, citizen_id, image_path, data):
-        # This is called from the socket server thread, emit signal to main thread
-        self.cccd_data_received_signal.emit(citizen_id, image_path, data)
-
-    def on_cccd_data_received(self, citizen_id, image_path, data):
-        # Deprecated: do not use directly, use handle_cccd_data_received instead
-        pass
+    def on_cccd_events_received(self, events):
+        """Handle a batch of CCCD data events delivered on the main thread"""
+        for citizen_id, image_path, data in events:
+            self.handle_cccd_data_received(citizen_id, image_path, data)
 
     def handle_cccd_data_received(self, citizen_id, image_path, data):
         """Handle CCCD data in the main thread (UI safe)"""
@@ -403,7 +403,6 @@ class FaceScannerDialog(QDialog):
     
     def check_in_attendance_api(self):
         """Gọi API điểm danh sau khi xác thực khuôn mặt thành công (gửi form-data, không dùng api.post)"""
-        import requests
         from app.utils.api_service import ApiService
         api = ApiService.get_instance()
         print(f"[DEBUG] self.user: {self.user}")
@@ -415,7 +414,7 @@ class FaceScannerDialog(QDialog):
         if not (candidate_id and exam_id and citizen_card_number):
             QMessageBox.warning(self, "Lỗi điểm danh", f"Thiếu thông tin để điểm danh (user, exam hoặc CCCD).\nuser: {self.user}\nexam: {self.exam}")
             return False
-        url = "http://13.212.197.79:8080/api/attendance/check-in"
+        url = Config.ATTENDANCE_CHECK_IN_URL
         data = {
             'candidateId': candidate_id,
             'examId': exam_id,
@@ -425,7 +424,8 @@ class FaceScannerDialog(QDialog):
         if api.token:
             headers['Authorization'] = f'Bearer {api.token}'
         try:
-            resp = requests.post(url, data=data, headers=headers)
+            resp = api.session.post(url, data=data, headers=headers, timeout=api.get_timeout(url))
+            api.invalidate_cache(url)
             print(f"[DEBUG] Attendance API response: {resp.status_code} {resp.text}")
             if resp.status_code == 200:
                 QMessageBox.information(self, "Điểm danh thành công", "Bạn đã được điểm danh thành công!")
@@ -447,7 +447,7 @@ class FaceScannerDialog(QDialog):
         self.status_label.setText("Đang so sánh khuôn mặt với ảnh CCCD...")
         
         # Get CCCD verification data
-        cccd_data = self.socket_server.get_cccd_data(self.user.citizen_id)
+        cccd_data = self.pipeline.get_cccd_data(self.user.citizen_id)
         
         if not cccd_data:
             self.status_label.setText("Lỗi: Không tìm thấy dữ liệu CCCD")
@@ -489,13 +489,13 @@ class FaceScannerDialog(QDialog):
     def closeEvent(self, event):
         """Handle close event"""
         self.stop_camera()
-        self.socket_server.unregister_data_callback(self.on_cccd_data_received)
+        self.cccd_events.close()
         event.accept()
     
     def reject(self):
         """Handle dialog rejection"""
         self.stop_camera()
-        self.socket_server.unregister_data_callback(self.on_cccd_data_received)
+        self.cccd_events.close()
         super().reject()
     
     def accept(self):
@@ -506,5 +506,5 @@ class FaceScannerDialog(QDialog):
             return
             
         self.stop_camera()
-        self.socket_server.unregister_data_callback(self.on_cccd_data_received)
+        self.cccd_events.close()
         super().accept()
@@ -7,7 +7,13 @@ from app.views.dashboard_screen import DashboardScreen
 from app.controllers.user_controller import UserController
 from app.controllers.exam_controller import ExamController
 from app.controllers.attendance_controller import AttendanceController
+from app.utils.prefetch import Prefetcher
+from app.utils.data_repository import DataRepository
+from app.utils.attendance_batch import DELIVERED, FAILED
+from app.utils.event_bus import ATTENDANCE_DELIVERY
+from app.utils.qt_event_bridge import QtEventBridge
 from app.assets.style import STYLE
+from config.config import Config
 
 class MainWindow(QMainWindow):
     def __init__(self, auth_controller):
@@ -16,6 +22,12 @@ class MainWindow(QMainWindow):
         self.user_controller = UserController()
         self.exam_controller = ExamController()
         self.attendance_controller = AttendanceController()
+        self.prefetcher = None
+        
+        # Điểm danh CCCD đang chờ gửi lên máy chủ: delivery_key -> user_id
+        self.queued_marks = {}
+        self.delivery_events = QtEventBridge(ATTENDANCE_DELIVERY, self)
+        self.delivery_events.events_ready.connect(self.on_delivery_events)
         
         # Áp dụng stylesheet hiện đại
         self.setStyleSheet(STYLE)
@@ -97,6 +109,16 @@ class MainWindow(QMainWindow):
         fullscreen_action.toggled.connect(self.toggle_fullscreen)
         view_menu.addAction(fullscreen_action)
         
+        # CCCD scanner devices (per-phone statistics of the ingest server)
+        cccd_clients_action = QAction("Thiết bị quét CCCD", self)
+        cccd_clients_action.triggered.connect(self.show_cccd_clients_dialog)
+        view_menu.addAction(cccd_clients_action)
+        
+        # Request timings of the API client (per-endpoint latencies, slow calls)
+        api_metrics_action = QAction("Hiệu năng API", self)
+        api_metrics_action.triggered.connect(self.show_api_metrics_dialog)
+        view_menu.addAction(api_metrics_action)
+        
         # Help menu
         help_menu = menu_bar.addMenu("&Trợ giúp")
         
@@ -127,7 +149,25 @@ class MainWindow(QMainWindow):
         refresh_action.triggered.connect(self.refresh_data)
         toolbar.addAction(refresh_action)
     
+    def start_prefetch(self):
+        """Start loading the data of the new user's screens in the background"""
+        if self.prefetcher:
+            self.prefetcher.cancel()
+            self.prefetcher = None
+        if Config.PREFETCH_ENABLED:
+            self.prefetcher = Prefetcher(
+                self.auth_controller,
+                self.user_controller,
+                self.exam_controller,
+                self.attendance_controller
+            )
+            self.prefetcher.start()
+    
     def show_dashboard(self):
+        # Bắt đầu tải trước khi dựng dashboard: các panel tải dữ liệu ngay khi được tạo
+        # sẽ dùng chung request đang chạy hoặc lấy từ cache
+        self.start_prefetch()
+        
         # Always create a new dashboard screen when someone logs in
         # to ensure all components are updated with the new user's data
         if self.dashboard_screen:
@@ -170,9 +210,17 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
+                # Dừng tải trước dữ liệu của người dùng cũ
+                if self.prefetcher:
+                    self.prefetcher.cancel()
+                    self.prefetcher = None
+                
                 # Đăng xuất từ auth_controller
                 self.auth_controller.logout()
                 
+                # Xóa dữ liệu của người dùng cũ khỏi kho dữ liệu dùng chung
+                DataRepository.get_instance().clear()
+                
                 # Đảm bảo ApiService cũng được khởi tạo lại
                 from app.utils.api_service import ApiService
                 ApiService._instance = None
@@ -265,29 +313,60 @@ class MainWindow(QMainWindow):
         """Show the CCCD attendance dialog"""
         from app.views.attendance_cccd_scanner import AttendanceCCCDScannerDialog
         
-        # Get users from controller
-        users = []
-        if hasattr(self, 'user_controller'):
-            users = self.user_controller.get_all_users()
-        
-        # Get exams from controller
-        exams = []
-        if hasattr(self, 'exam_controller'):
-            exams = self.exam_controller.get_all_exams()
+        # Get users from the shared repository (already loaded by the panels), else from controller
+        users = DataRepository.get_instance().get_users()
+        if not users and hasattr(self, 'user_controller'):
+            users = self.user_controller.get_all_users() or []
         
         # Create and show dialog
         dialog = AttendanceCCCDScannerDialog(self, None, users)
         dialog.attendance_recorded.connect(self.on_cccd_attendance_recorded)
         dialog.exec_()
     
+    def on_delivery_events(self, events):
+        """Report the server's answer to the CCCD attendance queued from this window"""
+        for key, state, _, _ in events:
+            user_id = self.queued_marks.get(key)
+            if user_id is None or state not in (DELIVERED, FAILED):
+                continue
+            del self.queued_marks[key]
+            if state == DELIVERED:
+                self.status_label.setText(f"Đã gửi điểm danh của user {user_id} lên máy chủ.")
+            else:
+                error = self.attendance_controller.get_delivery_error(key)
+                msg = f"Máy chủ từ chối điểm danh của user {user_id}: {error}"
+                self.status_label.setText(msg)
+                QMessageBox.warning(self, "Điểm danh bị từ chối",
+                                    msg + "\nBản ghi vẫn nằm trong danh sách điểm danh chờ gửi để kiểm tra lại.")
+    
+    def show_cccd_clients_dialog(self):
+        """Show per-phone statistics of the CCCD ingest server"""
+        from app.views.cccd_clients_dialog import CCCDClientsDialog
+        
+        dialog = CCCDClientsDialog(self)
+        dialog.exec_()
+    
+    def show_api_metrics_dialog(self):
+        """Show the request timings of the API client"""
+        from app.views.api_metrics_dialog import ApiMetricsDialog
+        
+        dialog = ApiMetricsDialog(self)
+        dialog.exec_()
+    
     def on_cccd_attendance_recorded(self, user_id, exam_id, timestamp):
         """Handle attendance recorded from CCCD scanner"""
         # Ghi nhận điểm danh vào hệ thống qua attendance_controller
         result = self.attendance_controller.mark_attendance_with_cccd(user_id, exam_id or None)
-        if result:
+        if result and result.delivery_state == DELIVERED:
             msg = f"Đã điểm danh thành công cho user {user_id} qua CCCD và nhận diện khuôn mặt."
             self.status_label.setText(msg)
             QMessageBox.information(self, "Điểm danh thành công", msg)
+        elif result and result.delivery_state != FAILED:
+            # Đã lưu vào hàng đợi, kết quả từ máy chủ được báo qua on_delivery_events
+            self.queued_marks[result.delivery_key] = user_id
+            msg = f"Đã ghi nhận điểm danh cho user {user_id} qua CCCD, đang gửi lên máy chủ..."
+            self.status_label.setText(msg)
+            QMessageBox.information(self, "Đã ghi nhận điểm danh", msg)
         else:
             msg = f"Lỗi khi ghi nhận điểm danh cho user {user_id}."
             self.status_label.setText(msg)
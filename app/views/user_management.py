@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, QDate, QSize
 from PyQt5.QtGui import QIcon
 from app.models.user import User
+from app.utils.data_loader import StreamLoader
 from config.config import Config
 
 class UserManagementPanel(QWidget):
@@ -17,6 +18,11 @@ class UserManagementPanel(QWidget):
         self.is_personal_profile = is_personal_profile  # Flag để xác định đây là profile cá nhân
         self.users = []
         
+        # Danh sách người dùng được hiển thị dần trong lúc tải
+        self.user_stream = StreamLoader(self)
+        self.user_stream.batch_loaded.connect(self.append_users)
+        self.user_stream.finished.connect(self.on_users_loaded)
+        
         self.init_ui()
         self.load_users()
     
@@ -210,9 +216,11 @@ class UserManagementPanel(QWidget):
     
     def load_users(self):
         if self.is_admin:
-            # Admin view - load all users
-            self.users = self.user_controller.get_all_users()
-            self.populate_user_table()
+            # Admin view - load all users, rows are added as they arrive
+            self.users = []
+            self.user_table.setRowCount(0)
+            self.refresh_btn.setEnabled(False)
+            self.user_stream.load(self.user_controller.iter_all_users)
         else:
             # Candidate view hoặc profile cá nhân - chỉ tải thông tin người dùng hiện tại
             if self.user_id:
@@ -264,6 +272,19 @@ class UserManagementPanel(QWidget):
                     else:
                         self.add_offline_indicator("⚠️ Không thể tải thông tin người dùng theo ID")
     
+    def append_users(self, users):
+        """Add a batch of streamed users to the table"""
+        search_text = self.search_input.text().lower()
+        self.users.extend(users)
+        for user in users:
+            row = self.user_table.rowCount()
+            self.add_user_row(row, user)
+            self.filter_user_row(row, search_text)
+    
+    def on_users_loaded(self, count):
+        self.refresh_btn.setEnabled(True)
+        print(f"Đã nhận được dữ liệu: {count} người dùng")
+    
     def filter_users(self):
         if not self.is_admin:
             return
@@ -271,75 +292,81 @@ class UserManagementPanel(QWidget):
         search_text = self.search_input.text().lower()
         
         for row in range(self.user_table.rowCount()):
-            should_show = True
-            
-            # Check if name or email contains search text
-            name = self.user_table.item(row, 1).text().lower()
-            email = self.user_table.item(row, 2).text().lower()
-            
-            if search_text and search_text not in name and search_text not in email:
-                should_show = False
-            
-            # Show/hide row
-            self.user_table.setRowHidden(row, not should_show)
+            self.filter_user_row(row, search_text)
+    
+    def filter_user_row(self, row, search_text):
+        should_show = True
+        
+        # Check if name or email contains search text
+        name = self.user_table.item(row, 1).text().lower()
+        email = self.user_table.item(row, 2).text().lower()
+        
+        if search_text and search_text not in name and search_text not in email:
+            should_show = False
+        
+        # Show/hide row
+        self.user_table.setRowHidden(row, not should_show)
     
     def populate_user_table(self):
         self.user_table.setRowCount(0)
         
         for row, user in enumerate(self.users):
-            self.user_table.insertRow(row)
-            
-            # Set user details
-            self.user_table.setItem(row, 0, QTableWidgetItem(str(user.user_id)))
-            self.user_table.setItem(row, 1, QTableWidgetItem(user.name))
-            self.user_table.setItem(row, 2, QTableWidgetItem(user.email))
-            self.user_table.setItem(row, 3, QTableWidgetItem(user.birth_date))
-            self.user_table.setItem(row, 4, QTableWidgetItem(user.citizen_id))
-            self.user_table.setItem(row, 5, QTableWidgetItem(user.role))
-            
-            # Action buttons
-            action_widget = QWidget()
-            action_layout = QHBoxLayout()
-            action_layout.setContentsMargins(5, 2, 5, 2)
-            action_layout.setSpacing(5)
-            
-            edit_btn = QToolButton()
-            edit_btn.setIcon(self.style().standardIcon(self.style().SP_FileDialogDetailedView))
-            edit_btn.setIconSize(QSize(18, 18))
-            edit_btn.setToolTip("Chỉnh sửa")
-            edit_btn.clicked.connect(lambda checked, u=user: self.show_edit_user_dialog(u))
-            
-            delete_btn = QToolButton()
-            delete_btn.setIcon(self.style().standardIcon(self.style().SP_TrashIcon))
-            delete_btn.setIconSize(QSize(18, 18))
-            delete_btn.setToolTip("Xóa")
-            delete_btn.clicked.connect(lambda checked, u=user: self.delete_user(u))
-            
-            # More options button
-            more_btn = QToolButton()
-            more_btn.setIcon(self.style().standardIcon(self.style().SP_ToolBarHorizontalExtensionButton))
-            more_btn.setIconSize(QSize(18, 18))
-            more_btn.setToolTip("Tùy chọn khác")
-            
-            # More options menu
-            more_menu = QMenu(more_btn)
-            
-            view_action = QAction("Xem chi tiết", more_btn)
-            view_action.triggered.connect(lambda checked, u=user: self.view_user_details(u))
-            more_menu.addAction(view_action)
-            
-            reset_pwd_action = QAction("Đặt lại mật khẩu", more_btn)
-            reset_pwd_action.triggered.connect(lambda checked, u=user: self.reset_password(u))
-            more_menu.addAction(reset_pwd_action)
-            more_btn.setMenu(more_menu)
-            more_btn.setPopupMode(QToolButton.InstantPopup)
-            
-            action_layout.addWidget(edit_btn)
-            action_layout.addWidget(delete_btn)
-            action_layout.addWidget(more_btn)
-            
-            action_widget.setLayout(action_layout)
-            self.user_table.setCellWidget(row, 6, action_widget)
+            self.add_user_row(row, user)
+    
+    def add_user_row(self, row, user):
+        self.user_table.insertRow(row)
+        
+        # Set user details
+        self.user_table.setItem(row, 0, QTableWidgetItem(str(user.user_id)))
+        self.user_table.setItem(row, 1, QTableWidgetItem(user.name))
+        self.user_table.setItem(row, 2, QTableWidgetItem(user.email))
+        self.user_table.setItem(row, 3, QTableWidgetItem(user.birth_date))
+        self.user_table.setItem(row, 4, QTableWidgetItem(user.citizen_id))
+        self.user_table.setItem(row, 5, QTableWidgetItem(user.role))
+        
+        # Action buttons
+        action_widget = QWidget()
+        action_layout = QHBoxLayout()
+        action_layout.setContentsMargins(5, 2, 5, 2)
+        action_layout.setSpacing(5)
+        
+        edit_btn = QToolButton()
+        edit_btn.setIcon(self.style().standardIcon(self.style().SP_FileDialogDetailedView))
+        edit_btn.setIconSize(QSize(18, 18))
+        edit_btn.setToolTip("Chỉnh sửa")
+        edit_btn.clicked.connect(lambda checked, u=user: self.show_edit_user_dialog(u))
+        
+        delete_btn = QToolButton()
+        delete_btn.setIcon(self.style().standardIcon(self.style().SP_TrashIcon))
+        delete_btn.setIconSize(QSize(18, 18))
+        delete_btn.setToolTip("Xóa")
+        delete_btn.clicked.connect(lambda checked, u=user: self.delete_user(u))
+        
+        # More options button
+        more_btn = QToolButton()
+        more_btn.setIcon(self.style().standardIcon(self.style().SP_ToolBarHorizontalExtensionButton))
+        more_btn.setIconSize(QSize(18, 18))
+        more_btn.setToolTip("Tùy chọn khác")
+        
+        # More options menu
+        more_menu = QMenu(more_btn)
+        
+        view_action = QAction("Xem chi tiết", more_btn)
+        view_action.triggered.connect(lambda checked, u=user: self.view_user_details(u))
+        more_menu.addAction(view_action)
+        
+        reset_pwd_action = QAction("Đặt lại mật khẩu", more_btn)
+        reset_pwd_action.triggered.connect(lambda checked, u=user: self.reset_password(u))
+        more_menu.addAction(reset_pwd_action)
+        more_btn.setMenu(more_menu)
+        more_btn.setPopupMode(QToolButton.InstantPopup)
+        
+        action_layout.addWidget(edit_btn)
+        action_layout.addWidget(delete_btn)
+        action_layout.addWidget(more_btn)
+        
+        action_widget.setLayout(action_layout)
+        self.user_table.setCellWidget(row, 6, action_widget)
     
     def update_profile_view(self, user):
         self.name_value.setText(user.name)
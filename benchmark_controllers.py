@@ -0,0 +1,190 @@
+"""
+Benchmark of the API controllers against the local mock backend.
+Starts mock_backend.MockBackend with each data set size, points Config at it
+and times the controller calls the screens make (full lists, streaming,
+paged and filtered queries, counts, delta sync, cached reads), reporting the
+duration, the number of records and the HTTP requests each call needed.
+
+For example:
+    python benchmark_controllers.py --sizes 1k,10k,100k --repeat 3
+    python benchmark_controllers.py --sizes 10k --latency 0.05 --error-rate 0.05 --json-out bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from config.config import Config
+from mock_backend import MockBackend, PAGE_STYLES
+
+def parse_count(text):
+    """Parse counts like 10k or 1m"""
+    text = text.strip().lower()
+    multiplier = 1
+    if text.endswith('k'):
+        multiplier, text = 1000, text[:-1]
+    elif text.endswith('m'):
+        multiplier, text = 1000000, text[:-1]
+    return int(float(text) * multiplier)
+
+def fresh_controllers():
+    """New ApiService/AttendanceSync singletons (empty caches) and controllers using them"""
+    from app.utils.api_service import ApiService
+    from app.utils.attendance_sync import AttendanceSync
+    from app.controllers.auth_controller import AuthController
+    from app.controllers.user_controller import UserController
+    from app.controllers.exam_controller import ExamController
+    from app.controllers.attendance_controller import AttendanceController
+
+    if ApiService._instance is not None:
+        ApiService._instance.clear_token()
+        ApiService._instance.session.close()
+    ApiService._instance = None
+    AttendanceSync._instance = None
+    return ApiService.get_instance(), AuthController(), UserController(), ExamController(), AttendanceController()
+
+def walk_pages(attendance, pages):
+    """Follow the attendance pages like the pager of the attendance panel"""
+    count = 0
+    cursor = None
+    for _ in range(pages):
+        page = attendance.query_attendance(cursor=cursor)
+        if page is None:
+            return None
+        count += len(page.items)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+    return count
+
+def build_operations(users, exams, attendance, exam_ids, pages):
+    """
+    (name, function returning the number of records or None on failure, cold) tuples;
+    the response cache is cleared before each run of a cold operation
+    """
+    exam_id = exam_ids[0]
+
+    def full_sync():
+        attendance.sync.reset(exam_id)
+        result = attendance.sync_attendance(exam_id)
+        return result.total if result else None
+
+    def delta_sync():
+        result = attendance.sync_attendance(exam_id)
+        return len(result.changed) if result else None
+
+    return [
+        ('users.get_all', lambda: len(users.get_all_users()), True),
+        ('users.get_all (cached)', lambda: len(users.get_all_users()), False),
+        ('users.stream', lambda: sum(1 for _ in users.iter_all_users()), True),
+        ('exams.get_all', lambda: len(exams.get_all_exams()), True),
+        ('exams.get_by_id x10', lambda: sum(exams.get_exam_by_id(e) is not None for e in exam_ids[:10]), True),
+        ('attendance.get_all', lambda: len(attendance.get_all_attendance()), True),
+        ('attendance.first_page', lambda: len(attendance.query_attendance().items), True),
+        ('attendance.filtered_page', lambda: len(attendance.query_attendance(exam_id=exam_id, face_verified=True).items), True),
+        (f'attendance.walk_{pages}_pages', lambda: walk_pages(attendance, pages), True),
+        ('attendance.count', attendance.count_attendance, True),
+        ('attendance.by_exam', lambda: len(attendance.get_attendance_by_exam(exam_id)), True),
+        ('attendance.sync_full', full_sync, True),
+        ('attendance.sync_delta', delta_sync, False)
+    ]
+
+def run_operation(api_service, backend, function, cold, repeat):
+    durations = []
+    records = None
+    requests_sent = 0
+    for _ in range(repeat):
+        if cold:
+            api_service.response_cache.clear()
+        backend.reset_stats()
+        start = time.perf_counter()
+        try:
+            # Controller in rất nhiều log: bỏ qua để không ảnh hưởng kết quả
+            with contextlib.redirect_stdout(io.StringIO()):
+                records = function()
+        except Exception as e:
+            print(f"    failed: {e}")
+            records = None
+        durations.append(time.perf_counter() - start)
+        requests_sent = backend.get_stats()['requests']
+        if records is None:
+            break
+    return {
+        'median_ms': statistics.median(durations) * 1000,
+        'min_ms': min(durations) * 1000,
+        'records': records,
+        'requests': requests_sent,
+        'ok': records is not None
+    }
+
+def benchmark_size(size, args):
+    backend = MockBackend(attendances=size, exams=args.exams, page_style=args.page_style,
+                          latency=args.latency, jitter=args.jitter, error_rate=args.error_rate).start()
+    Config.set_api_base_url(backend.base_url)
+    try:
+        api_service, auth, users, exams, attendance = fresh_controllers()
+        with contextlib.redirect_stdout(io.StringIO()):
+            logged_in = auth.login('admin@example.com', 'admin')
+        if not logged_in:
+            raise RuntimeError("Could not log in to the mock backend")
+
+        exam_ids = [exam['examId'] for exam in backend.data.exams]
+        results = {}
+        for name, function, cold in build_operations(users, exams, attendance, exam_ids, args.pages):
+            results[name] = run_operation(api_service, backend, function, cold, args.repeat)
+            result = results[name]
+            print(f"  {name:<28} {result['median_ms']:>9.1f} ms  (min {result['min_ms']:.1f})  "
+                  f"{result['records'] if result['ok'] else 'FAILED'!s:>7} records  {result['requests']:>3} requests")
+        return {'size': size, 'operations': results, 'api_metrics': api_service.get_request_stats()}
+    finally:
+        backend.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API controllers against the local mock backend")
+    parser.add_argument('--sizes', default='1k,10k,100k', help="Comma separated numbers of attendance records")
+    parser.add_argument('--exams', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs of each operation (the median is reported)")
+    parser.add_argument('--pages', type=int, default=10, help="Pages followed by the page walk")
+    parser.add_argument('--page-style', choices=PAGE_STYLES, default='cursor')
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request by the mock")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument('--json-out', help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    # Không ghi snapshot/outbox của benchmark vào thư mục dữ liệu của ứng dụng
+    work_dir = tempfile.mkdtemp(prefix="attendance-bench-")
+    Config.API_SNAPSHOT_DIR = os.path.join(work_dir, "snapshots")
+    Config.ATTENDANCE_OUTBOX_PATH = os.path.join(work_dir, "outbox.db")
+
+    report = {
+        'config': {
+            'exams': args.exams,
+            'repeat': args.repeat,
+            'page_style': args.page_style,
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'error_rate': args.error_rate
+        },
+        'results': []
+    }
+    for size in [parse_count(size) for size in args.sizes.split(',')]:
+        print(f"\n=== {size} attendance records ===")
+        report['results'].append(benchmark_size(size, args))
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json_out}")
+
+    failed = any(not result['ok'] for size in report['results'] for result in size['operations'].values())
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
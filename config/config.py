@@ -1,8 +1,8 @@
 import os
 
 class Config:
-    # API Base URL
-    API_BASE_URL = "http://13.212.197.79:8080/api"
+    # API Base URL (đặt biến môi trường ATTENDANCE_API_BASE_URL để dùng máy chủ khác, vd. mock_backend.py)
+    API_BASE_URL = os.environ.get("ATTENDANCE_API_BASE_URL", "http://13.212.197.79:8080/api").rstrip('/')
     
     # Auth Endpoints
     AUTH_LOGIN = f"{API_BASE_URL}/auth/login"
@@ -25,13 +25,115 @@ class Config:
     
     # Attendance Endpoints
     ATTENDANCE_URL = f"{API_BASE_URL}/exam-attendances"
+    ATTENDANCE_CHECK_IN_URL = f"{API_BASE_URL}/attendance/check-in"
     
     # Monitoring Endpoints
     MONITORING_URL = f"{API_BASE_URL}/monitoring-logs"
 
+    # HTTP client settings (ApiService)
+    API_TIMEOUT = (3.05, 15)  # (connect, read) giây mặc định cho mọi request
+    API_ENDPOINT_TIMEOUTS = {  # Timeout riêng theo đường dẫn tương đối với API_BASE_URL (khớp tiền tố dài nhất)
+        "/auth": (3.05, 10),
+        "/user/all": (3.05, 30),
+        "/exam-attendances": (3.05, 30),
+        "/monitoring-logs": (3.05, 30)
+    }
+    API_POOL_CONNECTIONS = 4  # Số host được giữ pool kết nối
+    API_POOL_MAXSIZE = 10  # Số kết nối keep-alive tối đa tới một host
+    API_RETRY_TOTAL = 3  # Số lần thử lại tối đa (lỗi kết nối, hoặc lỗi máy chủ với GET/PUT/DELETE)
+    API_RETRY_BACKOFF = 0.5  # Chờ 0.5s, 1s, 2s... giữa các lần thử lại
+    API_RETRY_STATUSES = (502, 503, 504)
+    API_CACHE_MAX_ENTRIES = 256  # Số response GET tối đa được cache
+    API_CACHE_DEFAULT_TTL = 0  # Giây; 0 = chỉ dùng lại khi máy chủ xác nhận không đổi (ETag/Last-Modified)
+    API_CACHE_TTLS = {  # Thời gian dùng response đã cache mà không hỏi lại máy chủ, theo endpoint
+        "/user/all": 60,
+        "/user/profile": 300,
+        "/exam": 60,
+        "/exam-attendances": 10,
+        "/monitoring-logs": 10
+    }
+    API_CACHE_INVALIDATION = {  # Ghi vào endpoint (POST/PUT/DELETE) -> các endpoint GET cần xóa cache
+        "/users": ["/user", "/users"],
+        "/user": ["/user", "/users"],
+        "/exam": ["/exam"],
+        "/exam-attendances": ["/exam-attendances"],
+        "/attendance": ["/exam-attendances"]
+    }
+    ATTENDANCE_PAGE_SIZE = 50  # Số bản ghi điểm danh mỗi trang (AttendanceController.query_attendance)
+    ATTENDANCE_SYNC_PAGE_SIZE = 500  # Số bản ghi mỗi trang khi đồng bộ thay đổi (AttendanceSync)
+    ATTENDANCE_SYNC_OVERLAP = 5  # Giây lùi mốc đồng bộ khi phải dùng giờ máy (bù lệch đồng hồ)
+    DATA_LOADER_WORKERS = 6  # Số request tải dữ liệu chạy song song cho các màn hình (DataLoader)
+    PREFETCH_ENABLED = True  # Tải trước dữ liệu các màn hình ngay sau khi đăng nhập (Prefetcher)
+    PREFETCH_WORKERS = 3  # Số request tải trước chạy song song
+    PREFETCH_MAX_ROSTERS = 10  # Số kỳ thi hôm nay được tải trước danh sách điểm danh
+    PREFETCH_MAX_AGE = 120  # Giây danh sách điểm danh tải trước được dùng lần đầu mà không đồng bộ lại
+    API_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "data", "snapshots")
+    API_SNAPSHOT_MAX_AGE = {  # Endpoint có response được lưu xuống đĩa (gzip) -> tuổi tối đa (giây) để còn hiển thị
+        "/user/all": 7 * 24 * 3600,
+        "/exam": 7 * 24 * 3600,
+        "/exam-attendances": 24 * 3600
+    }
+    API_SNAPSHOT_MAX_FILES = 200  # Số snapshot tối đa mỗi người dùng, xóa bản cũ nhất khi vượt quá
+    API_LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)  # Mốc (ms) của histogram thời gian request
+    API_SLOW_CALL_THRESHOLD = 1.0  # Giây; request chậm hơn được ghi vào nhật ký request chậm
+    API_SLOW_LOG_SIZE = 100  # Số request chậm gần nhất được giữ lại
+    API_METRICS_DUMP_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "data", "api_metrics.json")
+    API_STREAM_CHUNK_SIZE = 64 * 1024  # Bytes đọc mỗi lần khi parse dần danh sách lớn (stream_list)
+    STREAM_BATCH_SIZE = 200  # Số bản ghi tối đa mỗi lần đẩy lên bảng khi tải dần (StreamLoader)
+    STREAM_BATCH_INTERVAL = 0.1  # Giây; đẩy phần đã nhận lên bảng ít nhất sau mỗi khoảng này
+
     # Role constants
     ROLE_ADMIN = "ADMIN"
     ROLE_CANDIDATE = "CANDIDATE"
     
+    # CCCD ingest settings
+    CCCD_GATEWAY_HOST = "0.0.0.0"
+    CCCD_SOCKET_PORT = 9999  # Cổng giao thức socket cho ứng dụng di động
+    CCCD_HTTP_PORT = 5000  # Cổng HTTP API (/api/cccd, /api/status)
+    CCCD_INGEST_WORKERS = 4  # Số luồng xử lý dữ liệu CCCD nhận được
+    CCCD_MAX_MESSAGE_BYTES = 20 * 1024 * 1024  # Kích thước tối đa của một thông điệp CCCD
+    CCCD_SESSION_IDLE_TIMEOUT = 300  # Giây không nhận dữ liệu trước khi đóng kết nối socket
+    CCCD_CLIENT_RATE_LIMIT = 5.0  # Số bản ghi CCCD mỗi giây trung bình cho một điện thoại (theo deviceId hoặc IP)
+    CCCD_CLIENT_BURST = 100  # Số bản ghi một điện thoại được gửi dồn một lúc (ví dụ khi gửi lại sau khi mất mạng)
+    CCCD_MAX_BATCH_RECORDS = 100  # Số bản ghi CCCD tối đa trong một thông điệp batch
+    CCCD_SESSION_MAX_INFLIGHT = 8  # Số thông điệp gửi liên tiếp (pipelining) tối đa đang xử lý trên một kết nối
+    CCCD_ENCODING_WORKERS = 2  # Số luồng mã hóa khuôn mặt CCCD chạy nền khi nhận dữ liệu
+    CCCD_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "data", "cccd_store.db")
+    CCCD_RECOVERY_HOURS = 12  # Khôi phục dữ liệu CCCD nhận trong khoảng thời gian này sau khi khởi động lại
+    CCCD_IMAGE_MAX_DIMENSION = 800  # Cạnh dài nhất (pixel) của ảnh CCCD sau khi chuẩn hóa
+    CCCD_IMAGE_JPEG_QUALITY = 85  # Chất lượng JPEG của ảnh CCCD sau khi chuẩn hóa
+    CCCD_DEDUP_WINDOW = 300  # Giây: ảnh giống hệt cho cùng số CCCD trong khoảng này được coi là quét trùng
+    CCCD_ARCHIVE_ORIGINALS = False  # Lưu thêm ảnh gốc từ điện thoại vào app/data/cccd_originals
+    
+    # Attendance outbox (gửi điểm danh nền, chịu được mất kết nối)
+    ATTENDANCE_OUTBOX_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "data", "attendance_outbox.db")
+    ATTENDANCE_OUTBOX_BATCH_SIZE = 20  # Số bản ghi gửi trong một lượt
+    ATTENDANCE_OUTBOX_POLL_INTERVAL = 5.0  # Giây giữa các lượt kiểm tra hàng đợi
+    ATTENDANCE_OUTBOX_COALESCE_DELAY = 0.3  # Giây chờ sau một lần điểm danh để gom các lần điểm danh liền nhau vào một lô
+    ATTENDANCE_OUTBOX_BASE_BACKOFF = 2.0  # Giây chờ trước lần thử lại đầu tiên, tăng gấp đôi mỗi lần
+    ATTENDANCE_OUTBOX_MAX_BACKOFF = 300.0  # Giây chờ tối đa giữa hai lần thử lại
+    ATTENDANCE_BATCH_SIZE = 100  # Số bản ghi điểm danh mỗi request gửi theo lô ({url}/batch)
+    ATTENDANCE_SUBMIT_WORKERS = 4  # Số request gửi song song khi máy chủ không có endpoint batch
+    
+    # Event bus settings
+    EVENT_BUS_QUEUE_SIZE = 1000  # Số sự kiện tối đa chờ phân phối
+    EVENT_BUS_PUBLISH_TIMEOUT = 1.0  # Giây chờ khi hàng đợi đầy trước khi bỏ sự kiện
+    EVENT_COALESCE_MS = 100  # Gộp các sự kiện đến dồn dập trong khoảng này thành một lần cập nhật giao diện
+    
     # Token storage path
-    TOKEN_STORAGE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "data", "token.json")
\ No newline at end of file
+    TOKEN_STORAGE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "data", "token.json")
+    
+    # Token refresh settings (hạn token được đọc từ claim "exp" của JWT)
+    TOKEN_REFRESH_LEAD_TIME = 60  # Giây làm mới token trước khi hết hạn (bằng timer chạy nền)
+    TOKEN_EXPIRY_MARGIN = 10  # Coi token đã hết hạn sớm hơn chừng này giây để bù lệch đồng hồ
+    TOKEN_REFRESH_RETRY_INTERVAL = 15  # Giây chờ trước khi thử làm mới lại khi lỗi mạng
+    
+    @classmethod
+    def set_api_base_url(cls, base_url):
+        """Point every API endpoint at another server (e.g. the local mock backend)"""
+        old_base = cls.API_BASE_URL
+        base_url = base_url.rstrip('/')
+        for name, value in list(vars(cls).items()):
+            if name != 'API_BASE_URL' and isinstance(value, str) and value.startswith(old_base + '/'):
+                setattr(cls, name, base_url + value[len(old_base):])
+        cls.API_BASE_URL = base_url
@@ -3,64 +3,11 @@ Example script to demonstrate the use of AttendanceCCCDScanner
 """
 
 import sys
-import threading
 from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QLabel, QMessageBox
 from app.views.attendance_cccd_scanner import AttendanceCCCDScannerDialog
 from app.controllers.cccd_api import CCCDApiController
-from app.controllers.cccd_socket_server import CCCDSocketServer
-from flask import Flask, request, jsonify
-import time
-import socket
-
-# Flask app for API server
-flask_app = Flask(__name__)
-socket_server = None
-cccd_api_controller = None
-
-@flask_app.route('/api/cccd', methods=['POST'])
-def receive_cccd_data():
-    """Endpoint to receive CCCD data from mobile app"""
-    try:
-        # Extract data from request
-        data = request.json
-        
-        if not data:
-            return jsonify({'status': 'error', 'message': 'No data provided'}), 400
-        
-        # Check required fields
-        if 'citizenId' not in data or 'faceImage' not in data:
-            return jsonify({
-                'status': 'error', 
-                'message': 'Missing required fields (citizenId, faceImage)'
-            }), 400
-        
-        print(f"Received CCCD data for ID: {data['citizenId']}")
-        
-        # Process the data using the socket server
-        global socket_server
-        if socket_server:
-            socket_server._process_cccd_data(data)
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'CCCD data received successfully'
-        })
-        
-    except Exception as e:
-        print(f"Error processing CCCD data: {e}")
-        return jsonify({
-            'status': 'error',
-            'message': f'Server error: {str(e)}'
-        }), 500
-
-@flask_app.route('/api/status', methods=['GET'])
-def check_status():
-    """Endpoint to check server status"""
-    return jsonify({
-        'status': 'online',
-        'message': 'CCCD API Server is running',
-        'timestamp': time.time()
-    })
+from app.controllers.cccd_gateway import CCCDGateway, get_local_ip
+from config.config import Config
 
 # Sample data for demonstration
 class User:
@@ -93,18 +40,12 @@ class AttendanceTestWindow(QMainWindow):
         self.setGeometry(100, 100, 600, 400)
         
         # Initialize controllers
-        global cccd_api_controller, socket_server
-        cccd_api_controller = CCCDApiController()
-        socket_server = CCCDSocketServer.get_instance()
-        if not socket_server.is_running:
-            socket_server.start()
-        
-        # Start Flask server in background thread
-        self.flask_thread = threading.Thread(target=self.run_flask_server, daemon=True)
-        self.flask_thread.start()
+        self.cccd_api_controller = CCCDApiController()
         
-        # Wait briefly for Flask to start
-        time.sleep(1)
+        # Start the CCCD ingest gateway (socket protocol + HTTP API)
+        gateway = CCCDGateway.get_instance()
+        if not gateway.is_running:
+            gateway.start()
         
         # Display connection information
         self.show_connection_info()
@@ -167,33 +108,11 @@ class AttendanceTestWindow(QMainWindow):
         """Handle attendance recording"""
         print(f"Attendance recorded for user {user_id} in exam {exam_id} at {timestamp}")
         
-    def run_flask_server(self):
-        """Run Flask API server to receive requests from mobile app"""
-        try:
-            # Get local IP address for display
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            # Connect to an external server to determine the local IP
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            
-            print(f"Starting Flask API server on: http://{local_ip}:5000")
-            print(f"Mobile app should connect to: {local_ip}")
-            print(f"To test the API, you can use: GET http://{local_ip}:5000/api/status")
-            
-            # Run Flask on all network interfaces
-            flask_app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
-        except Exception as e:
-            print(f"Failed to start Flask server: {e}")
-        
     def show_connection_info(self):
         """Show connection information to help user connect from mobile app"""
         try:
             # Get local IP address
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
+            local_ip = get_local_ip()
             
             msg = QMessageBox(self)
             msg.setIcon(QMessageBox.Information)
@@ -203,15 +122,15 @@ class AttendanceTestWindow(QMainWindow):
             # Format detailed instructions
             details = (
                 f"Địa chỉ IP của máy tính: {local_ip}\n"
-                f"Cổng API: 5000\n"
-                f"Cổng Socket: 9999\n\n"
+                f"Cổng API: {Config.CCCD_HTTP_PORT}\n"
+                f"Cổng Socket: {Config.CCCD_SOCKET_PORT}\n\n"
                 f"Hướng dẫn cài đặt trên ứng dụng di động:\n"
                 f"1. Mở ứng dụng CCCD Vietnam trên điện thoại\n"
                 f"2. Nhập địa chỉ IP: {local_ip}\n"
                 f"3. Nhấn nút 'Kết nối' hoặc 'Kiểm tra kết nối'\n\n"
                 f"Lưu ý: Đảm bảo điện thoại và máy tính kết nối cùng một mạng WiFi\n\n"
                 f"Nếu không kết nối được, hãy kiểm tra:\n"
-                f"- Tường lửa Windows có cho phép kết nối đến cổng 5000 và 9999\n"
+                f"- Tường lửa Windows có cho phép kết nối đến cổng {Config.CCCD_HTTP_PORT} và {Config.CCCD_SOCKET_PORT}\n"
                 f"- Phần mềm diệt virus không chặn kết nối\n"
                 f"- Điện thoại và máy tính nằm trong cùng một mạng"
             )
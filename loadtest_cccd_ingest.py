@@ -0,0 +1,380 @@
+"""
+Load generator for the CCCD ingest gateway.
+Simulates many scanner phones sending CCCD data over the socket protocol
+and/or the HTTP API, and reports throughput, acknowledgment latency,
+error rate and server memory usage.
+
+Start the server first (python run_cccd_socket_server.py or python run_cccd_api.py),
+then for example:
+    python loadtest_cccd_ingest.py --protocol both --clients 20 --messages 50 --server-pid <pid>
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import time
+
+DEFAULT_IMAGES_DIR = os.path.join("app", "data", "cccd_images")
+
+def parse_size(text):
+    """Parse sizes like 200k or 1.5m into bytes"""
+    text = text.strip().lower()
+    multiplier = 1
+    if text.endswith('k'):
+        multiplier, text = 1024, text[:-1]
+    elif text.endswith('m'):
+        multiplier, text = 1024 * 1024, text[:-1]
+    return int(float(text) * multiplier)
+
+def load_images(images_dir, synthetic_sizes):
+    """Recorded images from a directory, or random payloads of the given sizes"""
+    if images_dir:
+        images = []
+        for name in sorted(os.listdir(images_dir)):
+            if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                with open(os.path.join(images_dir, name), 'rb') as f:
+                    images.append(f.read())
+        if images:
+            return images
+        print(f"No images found in {images_dir}, using synthetic payloads")
+    return [os.urandom(size) for size in synthetic_sizes]
+
+def random_citizen_id():
+    return "".join(random.choice("0123456789") for _ in range(12))
+
+def build_message(images, message_id=None):
+    """Build one CCCD message with a random citizen ID and a random image from the pool"""
+    image = random.choice(images)
+    # Vary the payload so content-based deduplication doesn't hide the real cost
+    image = image + os.urandom(8)
+    message = {
+        'citizenId': random_citizen_id(),
+        'name': 'Load Test',
+        'faceImage': base64.b64encode(image).decode('ascii')
+    }
+    if message_id is not None:
+        message['messageId'] = message_id
+    return message
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def read_rss_bytes(pid):
+    """Resident memory of a process, via psutil if installed or /proc on Linux"""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+class Stats:
+    """Results collected for one protocol"""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []  # seconds until the final ("processed") ack
+        self.received_latencies = []  # seconds until the early "received" ack (sessions only)
+        self.sent = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.started = None
+        self.finished = None
+
+    def report(self):
+        duration = max(1e-9, (self.finished or time.perf_counter()) - self.started)
+        completed = len(self.latencies)
+        result = {
+            'protocol': self.name,
+            'messages_sent': self.sent,
+            'messages_acknowledged': completed,
+            'errors': self.errors,
+            'error_rate': self.errors / self.sent if self.sent else 0.0,
+            'duration_s': duration,
+            'throughput_msg_s': completed / duration,
+            'throughput_mb_s': self.bytes_sent / duration / (1024 * 1024),
+            'ack_latency_ms': {
+                'p50': percentile(self.latencies, 50) * 1000,
+                'p90': percentile(self.latencies, 90) * 1000,
+                'p99': percentile(self.latencies, 99) * 1000,
+                'max': max(self.latencies) * 1000 if self.latencies else 0.0
+            }
+        }
+        if self.received_latencies:
+            result['received_ack_latency_ms'] = {
+                'p50': percentile(self.received_latencies, 50) * 1000,
+                'p90': percentile(self.received_latencies, 90) * 1000,
+                'p99': percentile(self.received_latencies, 99) * 1000
+            }
+        return result
+
+async def read_json_messages(reader, decoder, buffer):
+    """Read until at least one complete JSON object is available, return (messages, rest)"""
+    while True:
+        messages = []
+        text = buffer.lstrip()
+        while text:
+            try:
+                message, end = decoder.raw_decode(text)
+            except json.JSONDecodeError:
+                break
+            messages.append(message)
+            text = text[end:].lstrip()
+        if messages:
+            return messages, text
+
+        data = await reader.read(65536)
+        if not data:
+            raise ConnectionError("Server closed the connection")
+        buffer = text + data.decode('utf-8')
+
+async def socket_client_legacy(args, images, stats):
+    """Older phone behaviour: one connection and one round trip per scan"""
+    decoder = json.JSONDecoder()
+    for _ in range(args.messages):
+        payload = json.dumps(build_message(images)).encode('utf-8')
+        stats.sent += 1
+        stats.bytes_sent += len(payload)
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(args.host, args.socket_port)
+            writer.write(payload)
+            await writer.drain()
+            messages, _ = await asyncio.wait_for(read_json_messages(reader, decoder, ""), args.timeout)
+            writer.close()
+            if messages[0].get('status') == 'success':
+                stats.latencies.append(time.perf_counter() - start)
+            else:
+                stats.errors += 1
+        except Exception:
+            stats.errors += 1
+
+async def socket_client_session(args, images, stats, client_index):
+    """Persistent session with pipelined scans and two-stage acks"""
+    decoder = json.JSONDecoder()
+    try:
+        reader, writer = await asyncio.open_connection(args.host, args.socket_port)
+    except Exception:
+        stats.sent += args.messages
+        stats.errors += args.messages
+        return
+
+    pending = {}  # messageId -> send time
+    window = asyncio.Semaphore(args.pipeline)
+    done = asyncio.Event()
+    remaining = [args.messages]
+
+    async def receive_acks():
+        buffer = ""
+        try:
+            while remaining[0] > 0:
+                messages, buffer = await asyncio.wait_for(read_json_messages(reader, decoder, buffer), args.timeout)
+                for message in messages:
+                    sent_at = pending.get(message.get('messageId'))
+                    if sent_at is None:
+                        continue
+                    if message.get('stage') == 'received':
+                        stats.received_latencies.append(time.perf_counter() - sent_at)
+                        continue
+                    del pending[message['messageId']]
+                    remaining[0] -= 1
+                    window.release()
+                    if message.get('status') == 'success':
+                        stats.latencies.append(time.perf_counter() - sent_at)
+                    else:
+                        stats.errors += 1
+        except Exception:
+            stats.errors += remaining[0]
+            remaining[0] = 0
+            for _ in range(args.pipeline):
+                window.release()
+        finally:
+            done.set()
+
+    receiver = asyncio.ensure_future(receive_acks())
+    for i in range(args.messages):
+        await window.acquire()
+        if done.is_set():
+            break
+        message_id = f"{client_index}-{i}"
+        payload = json.dumps(build_message(images, message_id)).encode('utf-8') + b"\n"
+        stats.sent += 1
+        stats.bytes_sent += len(payload)
+        pending[message_id] = time.perf_counter()
+        writer.write(payload)
+        await writer.drain()
+
+    await done.wait()
+    receiver.cancel()
+    writer.close()
+
+async def http_client(args, images, stats):
+    """Keep-alive HTTP client posting to /api/cccd"""
+    try:
+        reader, writer = await asyncio.open_connection(args.host, args.http_port)
+    except Exception:
+        stats.sent += args.messages
+        stats.errors += args.messages
+        return
+
+    for _ in range(args.messages):
+        body = json.dumps(build_message(images)).encode('utf-8')
+        request = (
+            f"POST /api/cccd HTTP/1.1\r\n"
+            f"Host: {args.host}:{args.http_port}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        ).encode('latin-1') + body
+        stats.sent += 1
+        stats.bytes_sent += len(body)
+        start = time.perf_counter()
+        try:
+            writer.write(request)
+            await writer.drain()
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), args.timeout)
+            status = int(head.split(b" ", 2)[1])
+            length = 0
+            for line in head.decode('latin-1').split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+            await reader.readexactly(length)
+            if status == 200:
+                stats.latencies.append(time.perf_counter() - start)
+            else:
+                stats.errors += 1
+        except Exception:
+            stats.errors += 1
+            writer.close()
+            try:
+                reader, writer = await asyncio.open_connection(args.host, args.http_port)
+            except Exception:
+                return
+    writer.close()
+
+async def sample_rss(pid, samples, stop):
+    while not stop.is_set():
+        rss = read_rss_bytes(pid)
+        if rss is not None:
+            samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_protocol(name, args, images):
+    stats = Stats(name)
+    stats.started = time.perf_counter()
+    if name == 'socket':
+        if args.pipeline > 0:
+            clients = [socket_client_session(args, images, stats, i) for i in range(args.clients)]
+        else:
+            clients = [socket_client_legacy(args, images, stats) for _ in range(args.clients)]
+    else:
+        clients = [http_client(args, images, stats) for _ in range(args.clients)]
+    await asyncio.gather(*clients)
+    stats.finished = time.perf_counter()
+    return stats.report()
+
+async def main_async(args):
+    synthetic_sizes = [parse_size(size) for size in args.synthetic_sizes.split(',')]
+    images = load_images(None if args.synthetic else args.images_dir, synthetic_sizes)
+    protocols = ['socket', 'http'] if args.protocol == 'both' else [args.protocol]
+
+    rss_samples = []
+    stop = asyncio.Event()
+    sampler = asyncio.ensure_future(sample_rss(args.server_pid, rss_samples, stop)) if args.server_pid else None
+
+    results = []
+    for protocol in protocols:
+        print(f"Running {protocol}: {args.clients} clients x {args.messages} messages...")
+        results.append(await run_protocol(protocol, args, images))
+
+    stop.set()
+    if sampler:
+        await sampler
+
+    report = {
+        'config': {
+            'host': args.host,
+            'clients': args.clients,
+            'messages_per_client': args.messages,
+            'pipeline': args.pipeline,
+            'payload_sizes': sorted({len(image) for image in images})
+        },
+        'results': results
+    }
+    if rss_samples:
+        report['server_rss_mb'] = {
+            'start': rss_samples[0] / (1024 * 1024),
+            'peak': max(rss_samples) / (1024 * 1024),
+            'end': rss_samples[-1] / (1024 * 1024)
+        }
+    return report
+
+def print_report(report):
+    for result in report['results']:
+        latency = result['ack_latency_ms']
+        print(f"\n=== {result['protocol'].upper()} ===")
+        print(f"  Messages: {result['messages_acknowledged']}/{result['messages_sent']} acknowledged, "
+              f"{result['errors']} errors ({result['error_rate']:.1%})")
+        print(f"  Throughput: {result['throughput_msg_s']:.1f} msg/s, {result['throughput_mb_s']:.2f} MB/s")
+        print(f"  Ack latency (ms): p50={latency['p50']:.1f} p90={latency['p90']:.1f} "
+              f"p99={latency['p99']:.1f} max={latency['max']:.1f}")
+        if 'received_ack_latency_ms' in result:
+            received = result['received_ack_latency_ms']
+            print(f"  'received' ack latency (ms): p50={received['p50']:.1f} p90={received['p90']:.1f} "
+                  f"p99={received['p99']:.1f}")
+    if 'server_rss_mb' in report:
+        rss = report['server_rss_mb']
+        print(f"\nServer RSS (MB): start={rss['start']:.1f} peak={rss['peak']:.1f} end={rss['end']:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the CCCD ingest gateway")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--socket-port', type=int, default=9999)
+    parser.add_argument('--http-port', type=int, default=5000)
+    parser.add_argument('--protocol', choices=['socket', 'http', 'both'], default='both')
+    parser.add_argument('--clients', type=int, default=10, help="Number of concurrent simulated phones")
+    parser.add_argument('--messages', type=int, default=20, help="Scans sent by each phone")
+    parser.add_argument('--pipeline', type=int, default=4,
+                        help="Socket scans in flight per session (0 = reconnect per scan, older app behaviour)")
+    parser.add_argument('--images-dir', default=DEFAULT_IMAGES_DIR, help="Replay recorded CCCD images from this directory")
+    parser.add_argument('--synthetic', action='store_true', help="Use random payloads instead of recorded images")
+    parser.add_argument('--synthetic-sizes', default='50k,200k,800k', help="Comma separated synthetic payload sizes")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds to wait for an ack")
+    parser.add_argument('--server-pid', type=int, help="PID of the server process, to report its memory usage")
+    parser.add_argument('--json-out', help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json_out}")
+
+    failed = any(result['errors'] for result in report['results'])
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
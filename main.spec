@@ -23,7 +23,14 @@ a = Analysis(
         'cv2',
         'numpy',
         'PIL',
-        'flask',
+        # CCCD image normalization (JPEG/PNG plugins are loaded by name at runtime)
+        'PIL.Image',
+        'PIL.ImageOps',
+        'PIL.JpegImagePlugin',
+        'PIL.PngImagePlugin',
+        # CCCD gateway event loop, local stores
+        'asyncio',
+        'sqlite3',
         'requests',
         'PyQt5.QtCore',
         'PyQt5.QtGui',
@@ -0,0 +1,638 @@
+"""
+Local stand-in for the attendance backend.
+Serves generated users, exams and attendance records with the same endpoints
+and JSON formats as the real API, so the desktop app can be run and measured
+without the remote server:
+
+    python mock_backend.py --port 8090 --attendances 10000
+    ATTENDANCE_API_BASE_URL=http://127.0.0.1:8090/api python main.py
+
+The attendance list supports paging and filtering (examId, fromDate, toDate,
+citizenCardVerified, faceVerified, size, page/cursor) in the format chosen
+with --page-style, or ignores them like an older server (--page-style list).
+Requests without size/page/cursor get the whole list, as the app's unpaged
+calls (get_all_attendance) expect.
+With updatedSince it returns only the records changed since then, the IDs
+deleted since then ("deleted") and the time of the query ("serverTime").
+
+Users (/users, /user/register) and exams (/exam) can be created, updated and
+deleted. Attendance records can also be submitted in batches
+(POST /exam-attendances/batch, up to BATCH_LIMIT per request); --no-batch
+answers it with 404 like a server without that endpoint. --latency/--jitter delay every request and --error-rate answers a
+share of the non-auth requests with --error-status, to measure how the client
+copes with a slow or flaky server (see benchmark_controllers.py).
+"""
+
+import argparse
+import base64
+import datetime
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+PAGE_STYLES = ('cursor', 'spring', 'list')
+BATCH_LIMIT = 500  # Số bản ghi tối đa mỗi request batch
+
+def utc_now():
+    """Timestamp format of updatedAt/serverTime (sorts as text)"""
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+def make_token(user_id, ttl):
+    """Unsigned JWT-shaped token with an "exp" claim (ApiService reads it locally)"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+    claims = {'sub': user_id, 'exp': int(time.time() + ttl), 'jti': uuid.uuid4().hex}
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.mock"
+
+class MockData:
+    """Generated data set shared by the request handlers"""
+
+    def __init__(self, attendances=1000, exams=20, users=None, seed=42):
+        rng = random.Random(seed)
+        users = users or max(10, attendances // 2)
+        start = datetime.datetime(2025, 1, 6, 7, 30)
+
+        self.lock = threading.Lock()
+        self.version = 0  # Tăng mỗi lần ghi, dùng làm ETag
+        self.idempotency_keys = {}
+        self.deletions = []  # (deleted at, record ID, exam ID)
+
+        self.users = [
+            {
+                'userId': f"U{i:06d}",
+                'name': f"Thí sinh {i}",
+                'email': f"candidate{i}@example.com",
+                'birth': f"{2000 + i % 6}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                'citizenId': f"{i:012d}",
+                'role': 'CANDIDATE'
+            }
+            for i in range(users)
+        ]
+        self.admin = {'userId': 'ADMIN', 'name': 'Admin', 'email': 'admin@example.com', 'role': 'ADMIN'}
+        self.users.append(self.admin)
+        self.next_user = users
+
+        self.exams = [
+            {
+                'examId': f"E{i:04d}",
+                'name': f"Kỳ thi {i}",
+                'subject': rng.choice(['Toán', 'Vật lý', 'Hóa học', 'Tiếng Anh', 'Tin học']),
+                'semester': f"2024-{1 + i % 2}",
+                'date': (start + datetime.timedelta(days=i)).date().isoformat(),
+                'room': {'name': str(100 + i), 'building': rng.choice(['D3', 'D5', 'D9', 'TC'])},
+                'schedule': {'name': f"Kíp {1 + i % 4}"}
+            }
+            for i in range(exams)
+        ]
+        self.next_exam = exams
+
+        self.attendances = []
+        created = utc_now()
+        for i in range(attendances):
+            exam = self.exams[i % len(self.exams)]
+            user = self.users[rng.randrange(users)]
+            self.attendances.append(self._attendance_json(
+                f"A{i:07d}", user, exam,
+                (start + datetime.timedelta(days=i % len(self.exams), minutes=rng.randrange(90))).isoformat(),
+                rng.random() < 0.9, rng.random() < 0.8, created
+            ))
+
+    @staticmethod
+    def _attendance_json(attendance_id, user, exam, attendance_time, cccd_verified, face_verified, updated_at):
+        return {
+            'id': attendance_id,
+            'candidate': {'userId': user['userId'], 'name': user['name'], 'citizenId': user.get('citizenId')},
+            'exam': {'examId': exam['examId'], 'name': exam['name'], 'subject': exam['subject']},
+            'attendanceTime': attendance_time,
+            'citizenCardVerified': cccd_verified,
+            'faceVerified': face_verified,
+            'updatedAt': updated_at
+        }
+
+    def etag(self):
+        return f'"v{self.version}"'
+
+    def query_attendances(self, query):
+        """Attendance records matching the list filters"""
+        exam_id = query.get('examId')
+        date_from = query.get('fromDate')
+        date_to = query.get('toDate')
+        updated_since = query.get('updatedSince')
+        flags = {
+            name: query[name] == 'true'
+            for name in ('citizenCardVerified', 'faceVerified') if name in query
+        }
+
+        result = []
+        for attendance in self.attendances:
+            day = attendance['attendanceTime'][:10]
+            if exam_id and attendance['exam']['examId'] != exam_id:
+                continue
+            if date_from and day < date_from:
+                continue
+            if date_to and day > date_to:
+                continue
+            if updated_since and attendance['updatedAt'] < updated_since:
+                continue
+            if any(attendance[name] != value for name, value in flags.items()):
+                continue
+            result.append(attendance)
+        return result
+
+    def deleted_since(self, since, exam_id=None):
+        return [record_id for deleted_at, record_id, record_exam_id in self.deletions
+                if deleted_at >= since and (not exam_id or record_exam_id == exam_id)]
+
+    def find_user(self, user_id):
+        return next((u for u in self.users if u['userId'] == user_id), None)
+
+    def find_exam(self, exam_id):
+        return next((e for e in self.exams if e['examId'] == exam_id), None)
+
+    @staticmethod
+    def _apply_user_fields(user, payload):
+        for name in ('name', 'email', 'birth', 'citizenId', 'role'):
+            if name in payload:
+                user[name] = payload[name]
+
+    @staticmethod
+    def _apply_exam_fields(exam, payload):
+        for name in ('name', 'subject', 'semester', 'date'):
+            if name in payload:
+                exam[name] = payload[name]
+        if 'roomId' in payload:
+            exam['room'] = {'roomId': payload['roomId'], 'name': str(payload['roomId'])}
+        if 'scheduleId' in payload:
+            exam['schedule'] = {'scheduleId': payload['scheduleId'], 'name': f"Kíp {payload['scheduleId']}"}
+
+    def add_user(self, payload):
+        """Create a user (the password is accepted but not stored), returns (status, record)"""
+        with self.lock:
+            if not payload.get('email') or not payload.get('name'):
+                return 400, {'message': 'Name and email are required'}
+            if any(u['email'] == payload['email'] for u in self.users):
+                return 409, {'message': 'Email already registered'}
+            user = {'userId': f"U{self.next_user:06d}", 'role': 'CANDIDATE'}
+            self._apply_user_fields(user, payload)
+            self.next_user += 1
+            self.users.insert(-1, user)  # Admin luôn ở cuối danh sách
+            self.version += 1
+            return 201, user
+
+    def update_user(self, user_id, payload):
+        with self.lock:
+            user = self.find_user(user_id)
+            if user is None:
+                return 404, {'message': 'User not found'}
+            self._apply_user_fields(user, payload)
+            self.version += 1
+            return 200, user
+
+    def delete_user(self, user_id):
+        with self.lock:
+            user = self.find_user(user_id)
+            if user is None or user is self.admin:
+                return 404
+            self.users.remove(user)
+            self.version += 1
+            return 204
+
+    def add_exam(self, payload):
+        with self.lock:
+            if not payload.get('name'):
+                return 400, {'message': 'Name is required'}
+            exam = {'examId': f"E{self.next_exam:04d}"}
+            self._apply_exam_fields(exam, payload)
+            self.next_exam += 1
+            self.exams.append(exam)
+            self.version += 1
+            return 201, exam
+
+    def update_exam(self, exam_id, payload):
+        with self.lock:
+            exam = self.find_exam(exam_id)
+            if exam is None:
+                return 404, {'message': 'Exam not found'}
+            self._apply_exam_fields(exam, payload)
+            self.version += 1
+            return 200, exam
+
+    def delete_exam(self, exam_id):
+        with self.lock:
+            exam = self.find_exam(exam_id)
+            if exam is None:
+                return 404
+            self.exams.remove(exam)
+            self.version += 1
+            return 204
+
+    def find_attendance(self, record_id):
+        return next((a for a in self.attendances if a['id'] == record_id), None)
+
+    def update_attendance(self, record_id, payload):
+        """Change the verification flags of a record, returns (status, record)"""
+        with self.lock:
+            record = self.find_attendance(record_id)
+            if record is None:
+                return 404, {'message': 'Attendance not found'}
+            for name in ('citizenCardVerified', 'faceVerified', 'attendanceTime'):
+                if name in payload:
+                    record[name] = payload[name]
+            record['updatedAt'] = utc_now()
+            self.version += 1
+            return 200, record
+
+    def delete_attendance(self, record_id):
+        with self.lock:
+            record = self.find_attendance(record_id)
+            if record is None:
+                return 404
+            self.attendances.remove(record)
+            self.deletions.append((utc_now(), record_id, record['exam']['examId']))
+            self.version += 1
+            return 204
+
+    def add_attendance(self, payload, idempotency_key=None):
+        """Store a submitted attendance, returns (status, record)"""
+        with self.lock:
+            if idempotency_key and idempotency_key in self.idempotency_keys:
+                return 409, self.idempotency_keys[idempotency_key]
+
+            user_id = payload.get('userId')
+            exam_id = payload.get('examId')
+            user = self.find_user(user_id)
+            exam = self.find_exam(exam_id)
+            if user is None or exam is None:
+                return 400, {'message': 'Unknown user or exam'}
+
+            record = self._attendance_json(
+                f"A{len(self.attendances):07d}", user, exam,
+                payload.get('attendanceTime') or datetime.datetime.now().isoformat(),
+                bool(payload.get('citizenCardVerified')), bool(payload.get('faceVerified')), utc_now()
+            )
+            self.attendances.append(record)
+            self.version += 1
+            if idempotency_key:
+                self.idempotency_keys[idempotency_key] = record
+            return 201, record
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockAttendanceBackend/1.0'
+    # Header và body được ghi riêng: tắt Nagle để không bị trễ ~40ms (delayed ACK) mỗi response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---- helpers ----
+
+    def _send_json(self, status, payload, etag=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_status(self, status, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+
+    def _send_list(self, items, etag):
+        """Send a cacheable list, answering 304 when the client already has it"""
+        if self.headers.get('If-None-Match') == etag:
+            self._send_status(304, etag)
+        else:
+            self._send_json(200, items, etag)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+
+    def _token_valid(self):
+        """Check the bearer token's "exp" claim (tokens are not signed)"""
+        auth = self.headers.get('Authorization', '')
+        if not auth.startswith('Bearer '):
+            return False
+        try:
+            payload = auth[7:].split('.')[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        except (IndexError, ValueError):
+            return False
+        return claims.get('exp', 0) >= time.time()
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        path = parts.path
+        prefix = self.server.api_prefix
+        if not path.startswith(prefix):
+            return None, {}
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        return path[len(prefix):].rstrip('/') or '/', query
+
+    def _inject_faults(self):
+        """Injected latency and errors; True if an error response was sent instead"""
+        server = self.server
+        delay = server.latency + (server.rng.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        with server.stats_lock:
+            server.stats['requests'] += 1
+
+        # Không lỗi ở /auth để vẫn đăng nhập được
+        if not server.error_rate or self.path.startswith(server.api_prefix + '/auth'):
+            return False
+        if server.rng.random() >= server.error_rate:
+            return False
+        with server.stats_lock:
+            server.stats['injected_errors'] += 1
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)  # Đọc hết body để giữ được kết nối keep-alive
+        self._send_json(server.error_status, {'message': 'Injected error'})
+        return True
+
+    # ---- HTTP methods ----
+
+    def do_GET(self):
+        if self._inject_faults():
+            return
+        path, query = self._route()
+        data = self.server.data
+
+        if path is None:
+            return self._send_json(404, {'message': 'Not found'})
+        if path == '/auth/validate-token':
+            return self._send_json(200, {'valid': self._token_valid()})
+        if not self._token_valid():
+            return self._send_json(401, {'message': 'Invalid or expired token'})
+
+        etag = data.etag()
+        if path == '/user/profile':
+            return self._send_json(200, data.admin)
+        if path == '/user/all':
+            return self._send_list(data.users, etag)
+        if path.startswith('/users/'):
+            user = data.find_user(path[len('/users/'):])
+            return self._send_json(200, user) if user else self._send_json(404, {'message': 'User not found'})
+        if path in ('/exam', '/exam/my-exams'):
+            return self._send_list(data.exams, etag)
+        if path.startswith('/exam/'):
+            exam = data.find_exam(path[len('/exam/'):])
+            return self._send_json(200, exam) if exam else self._send_json(404, {'message': 'Exam not found'})
+        if path == '/exam-attendances':
+            return self._send_attendance_list(query, etag)
+        if path.startswith('/exam-attendances/exam/'):
+            exam_id = path[len('/exam-attendances/exam/'):]
+            return self._send_list(data.query_attendances({'examId': exam_id}), etag)
+        if path.startswith('/exam-attendances/'):
+            record = data.find_attendance(path[len('/exam-attendances/'):])
+            return self._send_json(200, record) if record else self._send_json(404, {'message': 'Attendance not found'})
+        if path.startswith('/attendance/candidate/'):
+            user_id = path[len('/attendance/candidate/'):]
+            return self._send_list([a for a in data.attendances if a['candidate']['userId'] == user_id], etag)
+        self._send_json(404, {'message': 'Not found'})
+
+    def _send_attendance_list(self, query, etag):
+        data = self.server.data
+        style = self.server.page_style
+        if style == 'list' or not any(name in query for name in ('size', 'page', 'cursor')):
+            # Máy chủ cũ (bỏ qua tham số lọc và phân trang) hoặc client không yêu cầu phân trang
+            return self._send_list(data.attendances, etag)
+
+        server_time = utc_now()
+        matches = data.query_attendances(query)
+        size = max(1, min(int(query.get('size', 50)), 1000))
+        etag = f'"v{data.version}-{hashlib.md5(self.path.encode()).hexdigest()[:12]}"'
+
+        if style == 'spring':
+            number = int(query.get('page', 0))
+            content = matches[number * size:(number + 1) * size]
+            page = {
+                'content': content,
+                'number': number,
+                'size': size,
+                'totalElements': len(matches),
+                'totalPages': -(-len(matches) // size),
+                'last': (number + 1) * size >= len(matches)
+            }
+        else:
+            offset = int(query.get('cursor') or 0)
+            items = matches[offset:offset + size]
+            page = {
+                'items': items,
+                'nextCursor': str(offset + size) if offset + size < len(matches) else None,
+                'total': len(matches)
+            }
+
+        page['serverTime'] = server_time
+        if query.get('updatedSince'):
+            page['deleted'] = data.deleted_since(query['updatedSince'], query.get('examId'))
+
+        if self.headers.get('If-None-Match') == etag:
+            return self._send_status(304, etag)
+        self._send_json(200, page, etag)
+
+    def _record_target(self, path):
+        """(MockData update method, delete method, record ID) of a record URL, or None"""
+        data = self.server.data
+        for prefix, update, delete in (
+            ('/exam-attendances/', data.update_attendance, data.delete_attendance),
+            ('/users/', data.update_user, data.delete_user),
+            ('/exam/', data.update_exam, data.delete_exam)
+        ):
+            if path.startswith(prefix) and len(path) > len(prefix):
+                return update, delete, path[len(prefix):]
+        return None
+
+    def do_PUT(self):
+        if self._inject_faults():
+            return
+        path, _ = self._route()
+        payload = self._read_json()
+        target = self._record_target(path) if path is not None else None
+        if target is None:
+            return self._send_json(404, {'message': 'Not found'})
+        if payload is None:
+            return self._send_json(400, {'message': 'Invalid JSON'})
+        if not self._token_valid():
+            return self._send_json(401, {'message': 'Invalid or expired token'})
+        update, _, record_id = target
+        status, record = update(record_id, payload)
+        self._send_json(status, record)
+
+    def do_DELETE(self):
+        if self._inject_faults():
+            return
+        path, _ = self._route()
+        target = self._record_target(path) if path is not None else None
+        if target is None:
+            return self._send_json(404, {'message': 'Not found'})
+        if not self._token_valid():
+            return self._send_json(401, {'message': 'Invalid or expired token'})
+        _, delete, record_id = target
+        self._send_status(delete(record_id))
+
+    def do_POST(self):
+        if self._inject_faults():
+            return
+        path, _ = self._route()
+        data = self.server.data
+        payload = self._read_json()
+        if path is None:
+            return self._send_json(404, {'message': 'Not found'})
+        if payload is None:
+            return self._send_json(400, {'message': 'Invalid JSON'})
+
+        if path == '/auth/login':
+            token = make_token(data.admin['userId'], self.server.token_ttl)
+            return self._send_json(200, {'authentication': dict(data.admin, token=token)})
+        if path == '/auth/refresh-token':
+            if not self._token_valid():
+                return self._send_json(401, {'message': 'Invalid or expired token'})
+            return self._send_json(200, {'accessToken': make_token('ADMIN', self.server.token_ttl)})
+        if path in ('/auth/signout', '/auth/logout'):
+            return self._send_json(200, {'message': 'Signed out'})
+        if path == '/user/register':
+            status, user = data.add_user(payload)
+            return self._send_json(status, user)
+        if not self._token_valid():
+            return self._send_json(401, {'message': 'Invalid or expired token'})
+
+        if path == '/exam-attendances':
+            status, record = data.add_attendance(payload, self.headers.get('Idempotency-Key'))
+            return self._send_json(status, record)
+        if path == '/exam-attendances/batch' and self.server.batch:
+            return self._add_attendance_batch(payload)
+        if path == '/users':
+            status, user = data.add_user(payload)
+            return self._send_json(status, user)
+        if path == '/exam':
+            status, exam = data.add_exam(payload)
+            return self._send_json(status, exam)
+        self._send_json(404, {'message': 'Not found'})
+
+    def _add_attendance_batch(self, payload):
+        if not isinstance(payload, list):
+            return self._send_json(400, {'message': 'Expected a list of attendance records'})
+        if len(payload) > BATCH_LIMIT:
+            return self._send_json(413, {'message': f'At most {BATCH_LIMIT} records per batch'})
+        results = []
+        for item in payload:
+            if not isinstance(item, dict):
+                results.append({'idempotencyKey': None, 'status': 400, 'record': {'message': 'Invalid record'}})
+                continue
+            key = item.get('idempotencyKey')
+            status, record = self.server.data.add_attendance(item, key)
+            results.append({'idempotencyKey': key, 'status': status, 'record': record})
+        self._send_json(207, {'results': results})
+
+class MockBackend:
+    """
+    Mock API server running in a background thread
+
+    Usage:
+        backend = MockBackend(attendances=10000).start()
+        Config.set_api_base_url(backend.base_url)
+        ...
+        backend.stop()
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, attendances=1000, exams=20, users=None,
+                 page_style='cursor', latency=0.0, token_ttl=3600, verbose=False,
+                 jitter=0.0, error_rate=0.0, error_status=503, seed=42, batch=True):
+        if page_style not in PAGE_STYLES:
+            raise ValueError(f"page_style must be one of {PAGE_STYLES}")
+        self.data = MockData(attendances, exams, users, seed)
+        self.server = ThreadingHTTPServer((host, port), MockRequestHandler)
+        self.server.daemon_threads = True
+        self.server.data = self.data
+        self.server.api_prefix = '/api'
+        self.server.page_style = page_style
+        self.server.latency = latency
+        self.server.token_ttl = token_ttl
+        self.server.verbose = verbose
+        self.server.jitter = jitter  # Giây ngẫu nhiên (0..jitter) cộng thêm vào latency
+        self.server.error_rate = error_rate  # Tỉ lệ request (trừ /auth) bị trả lỗi error_status
+        self.server.error_status = error_status
+        self.server.rng = random.Random(seed)
+        self.server.batch = batch  # False: không có endpoint /exam-attendances/batch
+        self.server.stats = {'requests': 0, 'injected_errors': 0}
+        self.server.stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_stats(self):
+        """Requests served and errors injected so far"""
+        with self.server.stats_lock:
+            return dict(self.server.stats)
+
+    def reset_stats(self):
+        with self.server.stats_lock:
+            self.server.stats = dict.fromkeys(self.server.stats, 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the attendance backend API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--attendances', type=int, default=1000, help="Number of generated attendance records")
+    parser.add_argument('--exams', type=int, default=20)
+    parser.add_argument('--users', type=int, default=None, help="Default: half the number of attendance records")
+    parser.add_argument('--page-style', choices=PAGE_STYLES, default='cursor',
+                        help="Format of the attendance list: cursor pages, Spring pages or a plain unpaged list")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many random seconds added on top of --latency")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Share of requests (except /auth) answered with --error-status, e.g. 0.05")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the generated data and injected errors")
+    parser.add_argument('--no-batch', action='store_true',
+                        help="Answer POST /exam-attendances/batch with 404, like a server without it")
+    parser.add_argument('--token-ttl', type=int, default=3600, help="Lifetime of issued tokens in seconds")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    backend = MockBackend(args.host, args.port, args.attendances, args.exams, args.users,
+                          args.page_style, args.latency, args.token_ttl, args.verbose,
+                          args.jitter, args.error_rate, args.error_status, args.seed, not args.no_batch)
+    print(f"Mock backend with {len(backend.data.attendances)} attendance records on {backend.base_url}")
+    print(f"Run the app against it with ATTENDANCE_API_BASE_URL={backend.base_url}")
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping mock backend...")
+    finally:
+        backend.server.server_close()
+
+if __name__ == '__main__':
+    main()
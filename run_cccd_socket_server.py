@@ -1,9 +1,10 @@
 """
 Run the CCCD Socket Server to receive data from mobile devices.
+The socket protocol is served by the CCCD ingest gateway, together with the HTTP API.
 """
 import sys
-import time
-from app.controllers.cccd_socket_server import CCCDSocketServer
+from app.controllers.cccd_gateway import CCCDGateway
+from app.controllers.cccd_pipeline import CCCDIngestPipeline
 
 def data_received_callback(citizen_id, image_path, data):
     """Callback function for when CCCD data is received"""
@@ -14,21 +15,10 @@ def data_received_callback(citizen_id, image_path, data):
 
 if __name__ == "__main__":
     print("Starting CCCD Socket Server...")
-    server = CCCDSocketServer.get_instance()
     
     # Register callback
-    server.register_data_callback(data_received_callback)
+    CCCDIngestPipeline.get_instance().register_data_callback(data_received_callback)
     
-    if server.start():
-        try:
-            # Keep the script running
-            print("Server is running. Press Ctrl+C to stop.")
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("Stopping server...")
-            server.stop()
-            print("Server stopped.")
-    else:
+    if not CCCDGateway.get_instance().serve_forever():
         print("Failed to start server.")
         sys.exit(1)
\ No newline at end of file
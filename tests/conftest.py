@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Các module của ứng dụng được import theo đường dẫn từ thư mục gốc (app.*, config.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeClock:
+    """time.monotonic stand-in moved forward by the test (clock.now += seconds)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    return clock
+
+@pytest.fixture
+def backend(request, tmp_path, monkeypatch):
+    """
+    Mock backend (mock_backend.py) the controllers talk to, logged in as admin
+
+    Options of MockBackend can be passed with indirect parametrization:
+        @pytest.mark.parametrize('backend', [{'page_style': 'spring'}], indirect=True)
+    Every test gets fresh ApiService/AttendanceSync/DataRepository singletons and
+    an outbox without background flusher (call flush() to deliver).
+    """
+    from mock_backend import MockBackend
+    from app.controllers.auth_controller import AuthController
+    from app.utils.api_service import ApiService
+    from app.utils.attendance_outbox import AttendanceOutbox
+    from app.utils.attendance_sync import AttendanceSync
+    from app.utils.data_repository import DataRepository
+    from config.config import Config
+
+    monkeypatch.setattr(Config, 'API_SNAPSHOT_DIR', str(tmp_path / "snapshots"))
+    for cls in (ApiService, AttendanceSync, DataRepository):
+        monkeypatch.setattr(cls, '_instance', None)
+    outbox = AttendanceOutbox(db_path=str(tmp_path / "outbox.db"), start_flusher=False)
+    monkeypatch.setattr(AttendanceOutbox, '_instance', outbox)
+
+    options = dict(attendances=200, exams=5)
+    options.update(getattr(request, 'param', {}))
+    backend = MockBackend(**options).start()
+    base_url = Config.API_BASE_URL
+    Config.set_api_base_url(backend.base_url)
+    try:
+        assert AuthController().login('admin@example.com', 'admin')
+        backend.reset_stats()
+        yield backend
+    finally:
+        Config.set_api_base_url(base_url)
+        api = ApiService.get_instance()
+        api._cancel_refresh()
+        api.session.close()
+        outbox.close()
+        backend.stop()
@@ -0,0 +1,114 @@
+import types
+
+import pytest
+import requests
+
+from app.utils import attendance_batch
+from app.utils.attendance_batch import (AttendanceBatchSender, delivery_state,
+                                        PENDING, DELIVERED, FAILED)
+from config.config import Config
+
+URL = "http://backend/api/exam-attendances"
+
+@pytest.mark.parametrize("status, state", [
+    (200, DELIVERED), (201, DELIVERED), (409, DELIVERED),
+    (400, FAILED), (404, FAILED), (422, FAILED),
+    (401, PENDING), (408, PENDING), (429, PENDING),
+    (500, PENDING), (503, PENDING), (None, PENDING),
+])
+def test_delivery_state(status, state):
+    assert delivery_state(status) == state
+
+def items(count):
+    return [(f"k{n}", {'userId': f'U{n}', 'examId': 'E1'}) for n in range(count)]
+
+def test_results_are_matched_by_idempotency_key():
+    result = {'results': [
+        {'idempotencyKey': 'k1', 'status': 409, 'record': {'id': 'A1'}},
+        {'idempotencyKey': 'k0', 'status': 201, 'record': {'id': 'A0'}},
+    ]}
+    outcomes = AttendanceBatchSender._match_results(items(3), result)
+    assert [(o.key, o.status) for o in outcomes] == [('k0', 201), ('k1', 409), ('k2', None)]
+    assert outcomes[0].body == {'id': 'A0'}
+    assert outcomes[2].state == PENDING
+
+def test_results_without_keys_are_matched_by_position():
+    # Danh sách bản ghi đã tạo, theo thứ tự gửi
+    outcomes = AttendanceBatchSender._match_results(items(2), [{'id': 'A0'}, {'id': 'A1'}])
+    assert [(o.status, o.body['id']) for o in outcomes] == [(201, 'A0'), (201, 'A1')]
+
+def test_unexpected_response_leaves_records_unsent():
+    outcomes = AttendanceBatchSender._match_results(items(2), "OK")
+    assert [o.state for o in outcomes] == [PENDING, PENDING]
+    assert not any(o.status or o.error for o in outcomes)
+
+class FakeApi:
+    """ApiService.send stand-in answering from `respond(url, body)`"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    def send(self, method, url, body, headers=None):
+        self.calls.append((url, body))
+        return self.respond(url, body)
+
+@pytest.fixture
+def api(monkeypatch):
+    def install(respond):
+        fake = FakeApi(respond)
+        monkeypatch.setattr(attendance_batch, 'ApiService', types.SimpleNamespace(get_instance=lambda: fake))
+        return fake
+    return install
+
+def test_records_are_sent_in_chunks(api, monkeypatch):
+    monkeypatch.setattr(Config, 'ATTENDANCE_BATCH_SIZE', 2)
+    fake = api(lambda url, body: (207, {'results': [
+        {'idempotencyKey': record['idempotencyKey'], 'status': 201} for record in body]}))
+    sender = AttendanceBatchSender()
+
+    outcomes = sender.send(URL, items(5))
+    assert [len(body) for _, body in fake.calls] == [2, 2, 1]
+    assert all(url == f"{URL}/batch" for url, _ in fake.calls)
+    assert [o.state for o in outcomes] == [DELIVERED] * 5
+    assert sender.batch_supported is True
+
+def test_missing_batch_endpoint_falls_back_to_single_posts(api):
+    fake = api(lambda url, body: (404, None) if url.endswith('/batch') else (201, {'id': body['userId']}))
+    sender = AttendanceBatchSender()
+
+    outcomes = sender.send(URL, items(3))
+    assert [o.body['id'] for o in outcomes] == ['U0', 'U1', 'U2']
+    assert sender.batch_supported is False
+
+    # Lần sau gửi thẳng từng bản ghi
+    fake.calls.clear()
+    sender.send(URL, items(2))
+    assert [url for url, _ in fake.calls] == [URL, URL]
+
+def test_rejected_batch_is_resent_record_by_record(api):
+    def respond(url, body):
+        if url.endswith('/batch'):
+            return 400, {'message': 'invalid record'}
+        return (422, {'message': 'unknown user'}) if body['userId'] == 'U1' else (201, {})
+    api(respond)
+
+    outcomes = AttendanceBatchSender().send(URL, items(3))
+    assert [o.state for o in outcomes] == [DELIVERED, FAILED, DELIVERED]
+
+def test_server_error_keeps_the_whole_batch_pending(api):
+    api(lambda url, body: (503, None))
+    outcomes = AttendanceBatchSender().send(URL, items(3))
+    assert [(o.status, o.state) for o in outcomes] == [(503, PENDING)] * 3
+
+def test_network_error_stops_sending(api, monkeypatch):
+    monkeypatch.setattr(Config, 'ATTENDANCE_BATCH_SIZE', 2)
+
+    def respond(url, body):
+        raise requests.ConnectionError("refused")
+    fake = api(respond)
+
+    outcomes = AttendanceBatchSender().send(URL, items(5))
+    assert len(fake.calls) == 1
+    assert [bool(o.error) for o in outcomes] == [True, True, False, False, False]
+    assert all(o.status is None and o.state == PENDING for o in outcomes)
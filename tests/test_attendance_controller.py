@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+# Các controller import CCCDIngestPipeline, cần face_recognition
+pytest.importorskip("face_recognition")
+
+from app.controllers.attendance_controller import AttendanceController
+from app.models.exam_attendance import ExamAttendance
+from app.utils.attendance_batch import PENDING, DELIVERED, FAILED
+from app.utils.data_repository import DataRepository
+
+def wait_until(condition, timeout=5):
+    # Sự kiện ATTENDANCE_DELIVERY được gửi trên luồng của event bus
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "delivery event was not handled"
+        time.sleep(0.01)
+
+def mark(controller, backend, user_index=0, exam_index=0):
+    user_id = backend.data.users[user_index]['userId']
+    exam_id = backend.data.exams[exam_index]['examId']
+    return controller.mark_attendance(ExamAttendance(user_id=user_id, exam_id=exam_id, citizen_card_verified=True))
+
+def test_queued_record_is_replaced_by_the_delivered_one(backend):
+    controller = AttendanceController()
+    repository = DataRepository.get_instance()
+    attendance = mark(controller, backend)
+
+    assert attendance.delivery_state == PENDING
+    assert repository.get_pending_attendance(attendance.exam_id) == [attendance]
+
+    assert controller.outbox.flush() == 1
+    wait_until(lambda: repository.find_pending_attendance(attendance.delivery_key) is None)
+
+    delivered = [a for a in repository.get_attendance_by_exam(attendance.exam_id) if a.delivery_key == attendance.delivery_key]
+    assert len(delivered) == 1
+    assert delivered[0].attendance_id == backend.data.attendances[-1]['id']
+    assert delivered[0].delivery_state == DELIVERED
+
+def test_rejected_record_stays_pending_as_failed(backend):
+    controller = AttendanceController()
+    repository = DataRepository.get_instance()
+    attendance = controller.mark_attendance(ExamAttendance(user_id='unknown', exam_id=backend.data.exams[0]['examId']))
+
+    assert controller.outbox.flush() == 0
+    wait_until(lambda: attendance.delivery_state == FAILED)
+    assert repository.find_pending_attendance(attendance.delivery_key) is attendance
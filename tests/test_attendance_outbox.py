@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.utils.attendance_batch import SubmitOutcome, PENDING, DELIVERED, FAILED
+from app.utils.attendance_outbox import AttendanceOutbox
+from config.config import Config
+
+URL = "http://backend/api/exam-attendances"
+
+class FakeSender:
+    """Answers every sent record with the outcome chosen by `respond(key, payload)`"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.sent = []
+
+    def send(self, url, items):
+        self.sent.append((url, items))
+        return [self.respond(key, payload) for key, payload in items]
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = AttendanceOutbox(db_path=str(tmp_path / "outbox.db"), start_flusher=False)
+    yield outbox
+    outbox.close()
+
+def row(outbox, key):
+    return outbox._conn.execute("SELECT * FROM attendance_outbox WHERE idempotency_key = ?", (key,)).fetchone()
+
+def test_same_payload_is_queued_once(outbox):
+    first = outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1'}, 'U1', 'E1')
+    second = outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1'}, 'U1', 'E1')
+    assert first == second
+    assert outbox.get_stats() == {PENDING: 1}
+
+def test_new_payload_replaces_unsent_submission(outbox):
+    key = outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1', 'faceVerified': False}, 'U1', 'E1')
+    again = outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1', 'faceVerified': True}, 'U1', 'E1')
+    assert again == key
+    assert outbox.get_entries()[0]['payload']['faceVerified'] is True
+
+def test_new_payload_after_an_attempt_is_queued_separately(outbox):
+    key = outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1', 'faceVerified': False}, 'U1', 'E1')
+    outbox.sender = FakeSender(lambda key, payload: SubmitOutcome(key, 503))
+    outbox.flush()
+
+    other = outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1', 'faceVerified': True}, 'U1', 'E1')
+    assert other != key
+    assert row(outbox, key)['payload'] != row(outbox, other)['payload']
+
+def test_payload_is_not_changed_while_being_sent(outbox):
+    key = outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1', 'faceVerified': False}, 'U1', 'E1')
+    queued = []
+
+    def respond(sent_key, payload):
+        # Bản ghi mới được tạo trong lúc bản cũ đang gửi
+        queued.append(outbox.enqueue(URL, {'userId': 'U1', 'examId': 'E1', 'faceVerified': True}, 'U1', 'E1'))
+        return SubmitOutcome(sent_key, 201, {'id': 'A1'})
+
+    outbox.sender = FakeSender(respond)
+    assert outbox.flush() == 1
+    assert outbox.get_state(key) == DELIVERED
+    assert queued[0] != key
+    assert outbox.get_state(queued[0]) == PENDING
+
+def test_outcomes_update_delivery_state(outbox):
+    delivered = outbox.enqueue(URL, {'n': 1}, 'U1', 'E1')
+    rejected = outbox.enqueue(URL, {'n': 2}, 'U2', 'E1')
+    conflict = outbox.enqueue(URL, {'n': 3}, 'U3', 'E1')
+    busy = outbox.enqueue(URL, {'n': 4}, 'U4', 'E1')
+    statuses = {delivered: 201, rejected: 400, conflict: 409, busy: 503}
+    outbox.sender = FakeSender(lambda key, payload: SubmitOutcome(key, statuses[key], {}))
+
+    assert outbox.flush() == 2
+    assert outbox.get_state(delivered) == DELIVERED
+    assert outbox.get_state(conflict) == DELIVERED
+    assert outbox.get_state(rejected) == FAILED
+    assert outbox.get_state(busy) == PENDING
+    assert row(outbox, busy)['next_attempt_at'] > time.time()
+
+def test_unattempted_submissions_back_off_with_the_failed_one(outbox):
+    keys = [outbox.enqueue(URL, {'n': n}, f'U{n}', 'E1') for n in range(3)]
+
+    def respond(key, payload):
+        if key == keys[0]:
+            return SubmitOutcome(key, error="Network error: refused")
+        return SubmitOutcome(key)  # Không được gửi
+
+    outbox.sender = FakeSender(respond)
+    outbox.flush()
+    now = time.time()
+    for key in keys:
+        assert outbox.get_state(key) == PENDING
+        assert row(outbox, key)['next_attempt_at'] > now
+        assert row(outbox, key)['attempts'] == 1
+
+    # Không có bản ghi nào đến hạn: lần gửi tiếp theo không gửi lại ngay
+    outbox.flush()
+    assert len(outbox.sender.sent) == 1
+
+def test_retry_failed_requeues_rejected_submissions(outbox):
+    key = outbox.enqueue(URL, {'n': 1}, 'U1', 'E1')
+    outbox.sender = FakeSender(lambda key, payload: SubmitOutcome(key, 422, {}))
+    outbox.flush()
+    assert outbox.get_state(key) == FAILED
+
+    outbox.retry_failed()
+    assert outbox.get_state(key) == PENDING
+
+def test_error_during_flush_backs_off_the_entries(outbox):
+    keys = [outbox.enqueue(URL, {'n': n}, f'U{n}', 'E1') for n in range(2)]
+
+    def respond(key, payload):
+        raise RuntimeError("bug in outcome handling")
+
+    outbox.sender = FakeSender(respond)
+    with pytest.raises(RuntimeError):
+        outbox.flush()
+    for key in keys:
+        assert row(outbox, key)['next_attempt_at'] > time.time()
+        assert row(outbox, key)['attempts'] == 1
+    assert outbox._due_entries() == []
+
+def test_flusher_waits_after_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ATTENDANCE_OUTBOX_COALESCE_DELAY', 0)
+    monkeypatch.setattr(Config, 'ATTENDANCE_OUTBOX_BASE_BACKOFF', 0.2)
+    outbox = AttendanceOutbox(db_path=str(tmp_path / "outbox.db"), start_flusher=False)
+    outbox.enqueue(URL, {'n': 1}, 'U1', 'E1')
+    calls = []
+
+    def failing_flush():
+        calls.append(time.monotonic())
+        raise sqlite3.OperationalError("disk I/O error")
+
+    outbox.flush = failing_flush
+    outbox._flusher = threading.Thread(target=outbox._flush_loop, daemon=True)
+    outbox._flusher.start()
+    time.sleep(0.7)
+    outbox.close()
+    assert not outbox._flusher.is_alive()
+
+    # Không lặp liên tục: lượt đầu, rồi chờ 0.2s, 0.4s...
+    assert 2 <= len(calls) <= 5
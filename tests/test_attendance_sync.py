@@ -0,0 +1,103 @@
+from app.utils.attendance_sync import AttendanceSync, _Scope
+
+def record(record_id, updated_at='2026-01-01T00:00:00Z', face_verified=False):
+    return {
+        'id': record_id,
+        'candidate': {'userId': 'U1', 'name': 'A'},
+        'exam': {'examId': 'E1'},
+        'faceVerified': face_verified,
+        'updatedAt': updated_at
+    }
+
+def merge(scope, items, deleted=(), snapshot=False):
+    result = AttendanceSync._merge(scope, 'E1', items, deleted, snapshot)
+    scope.synced = True
+    return result
+
+def test_first_merge_returns_every_record():
+    scope = _Scope()
+    result = merge(scope, [record('A1'), record('A2')])
+    assert result.full
+    assert [a.attendance_id for a in result.changed] == ['A1', 'A2']
+    assert result.total == 2
+
+def test_merge_upserts_by_id():
+    scope = _Scope()
+    merge(scope, [record('A1'), record('A2')])
+
+    result = merge(scope, [record('A1'), record('A2', '2026-01-02T00:00:00Z', True), record('A3')])
+    assert not result.full
+    assert [a.attendance_id for a in result.changed] == ['A2', 'A3']
+    assert scope.records['A2'].face_verified is True
+    assert result.total == 3
+
+def test_unchanged_records_are_not_reported():
+    scope = _Scope()
+    merge(scope, [record('A1')])
+    result = merge(scope, [record('A1')])
+    assert not result.has_changes
+
+def test_tombstones_remove_known_records_only():
+    scope = _Scope()
+    merge(scope, [record('A1'), record('A2')])
+
+    result = merge(scope, [], deleted=['A1', 'A9'])
+    assert result.removed == ['A1']
+    assert set(scope.records) == {'A2'}
+
+def test_snapshot_removes_records_missing_from_it():
+    scope = _Scope()
+    merge(scope, [record('A1'), record('A2'), record('A3')])
+
+    result = merge(scope, [record('A1'), record('A3')], snapshot=True)
+    assert result.removed == ['A2']
+    assert result.changed == []
+    assert result.total == 2
+
+def test_delta_sync_fetches_changes_only(backend):
+    exam_id = backend.data.exams[0]['examId']
+    sync = AttendanceSync.get_instance()
+    first = sync.sync(exam_id)
+    assert first.full and first.total == 40
+
+    ids = [a.attendance_id for a in first.changed]
+    backend.data.update_attendance(ids[0], {'faceVerified': True})
+    backend.data.delete_attendance(ids[1])
+    result = sync.sync(exam_id)
+
+    assert not result.full
+    assert [a.attendance_id for a in result.changed] == [ids[0]]
+    assert result.removed == [ids[1]]
+    assert result.total == 39
+    assert sync.get_stats()['delta_syncs'] == 1
+
+def test_watermark_advances_with_the_server_time(backend):
+    exam_id = backend.data.exams[0]['examId']
+    sync = AttendanceSync.get_instance()
+    scope = sync._scope(exam_id)
+
+    sync.sync(exam_id)
+    first = scope.high_water_mark
+    assert first is not None
+    sync.sync(exam_id)
+    assert scope.high_water_mark > first
+
+def test_failed_fetch_keeps_the_watermark(backend):
+    exam_id = backend.data.exams[0]['examId']
+    sync = AttendanceSync.get_instance()
+    scope = sync._scope(exam_id)
+    sync.sync(exam_id)
+    watermark = scope.high_water_mark
+
+    record_id = next(iter(scope.records))
+    backend.data.update_attendance(record_id, {'faceVerified': True})
+    # 500 không được ApiService thử lại
+    backend.server.error_status = 500
+    backend.server.error_rate = 1.0
+    assert sync.sync(exam_id) is None
+    assert scope.high_water_mark == watermark
+
+    # Lần sau vẫn lấy được thay đổi đã bỏ lỡ
+    backend.server.error_rate = 0.0
+    result = sync.sync(exam_id)
+    assert [a.attendance_id for a in result.changed] == [record_id]
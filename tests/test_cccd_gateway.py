@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+
+# cccd_gateway import CCCDIngestPipeline, cần face_recognition
+pytest.importorskip("face_recognition")
+
+from app.controllers.cccd_gateway import _SocketSession
+
+class FakeGateway:
+    is_running = True
+
+    def __init__(self):
+        self.processed = []
+
+    async def _process(self, message, peer):
+        self.processed.append(message)
+        return {'status': 'success', 'message': 'CCCD data received'}
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b""
+
+    def get_extra_info(self, name):
+        return ('192.168.1.20', 50000)
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def replies(self):
+        return [json.loads(line) for line in self.data.decode('utf-8').splitlines()]
+
+def run_session(chunks):
+    """Feed the chunks as separate reads, return the gateway and the writer"""
+    gateway, writer = FakeGateway(), FakeWriter()
+
+    async def main():
+        reader = asyncio.StreamReader()
+        session = _SocketSession(gateway, reader, writer)
+
+        async def feed():
+            for chunk in chunks:
+                reader.feed_data(chunk)
+                await asyncio.sleep(0.002)  # Mỗi chunk là một lần read() riêng
+            reader.feed_eof()
+
+        await asyncio.gather(session.run(), feed())
+
+    asyncio.run(main())
+    return gateway, writer
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n"
+
+FIRST = {'messageId': 'm1', 'citizenId': '001', 'name': 'Nguyễn Văn Ánh'}
+SECOND = {'messageId': 'm2', 'citizenId': '002', 'name': 'Trần Thị Ðức'}
+
+def test_message_split_inside_a_character_is_not_lost():
+    data = encode(FIRST) + encode(SECOND)
+    split = len(encode(FIRST)) + encode(SECOND).index('Ð'.encode('utf-8')) + 1
+    gateway, writer = run_session([data[:split], data[split:]])
+
+    assert gateway.processed == [FIRST, SECOND]
+    acks = [(reply['messageId'], reply['stage']) for reply in writer.replies()]
+    assert sorted(acks) == [('m1', 'processed'), ('m1', 'received'), ('m2', 'processed'), ('m2', 'received')]
+
+def test_every_split_position_delivers_both_messages():
+    data = encode(FIRST) + encode(SECOND)
+    for split in range(1, len(data)):
+        gateway, _ = run_session([data[:split], data[split:]])
+        assert gateway.processed == [FIRST, SECOND], split
+
+def test_invalid_utf8_is_rejected_after_the_valid_messages():
+    gateway, writer = run_session([encode(FIRST) + b'{"messageId": "m2", "name": "\xff\xfe"}\n', encode(SECOND)])
+
+    assert gateway.processed == [FIRST]
+    replies = writer.replies()
+    assert {'status': 'error', 'message': 'Invalid UTF-8 data'} in replies
+    assert ('m1', 'processed') in [(reply.get('messageId'), reply.get('stage')) for reply in replies]
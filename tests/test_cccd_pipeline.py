@@ -0,0 +1,85 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+# cccd_pipeline import app.utils.face_recognition, cần face_recognition
+pytest.importorskip("face_recognition")
+
+from app.controllers.cccd_pipeline import CCCDIngestPipeline
+from app.utils.cccd_store import CCCDStore
+from config.config import Config
+
+def card_image(color):
+    output = io.BytesIO()
+    Image.new('RGB', (120, 80), color).save(output, format='PNG')
+    return base64.b64encode(output.getvalue()).decode('ascii')
+
+RED = card_image((200, 0, 0))
+BLUE = card_image((0, 0, 200))
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch, clock):
+    # Ảnh được ghi vào app/data/... theo thư mục hiện tại
+    monkeypatch.chdir(tmp_path)
+    store = CCCDStore(db_path=str(tmp_path / "cccd.db"))
+    monkeypatch.setattr(CCCDStore, '_instance', store)
+    pipeline = CCCDIngestPipeline()
+    # Không mã hóa khuôn mặt trong test
+    monkeypatch.setattr(pipeline, '_attach_encoding_future', lambda record: None)
+    yield pipeline
+    pipeline.encoding_executor.shutdown()
+    store.close()
+
+def scan(pipeline, image=RED, citizen_id='001', exam_id='E1'):
+    return pipeline.process_cccd_data({'citizenId': citizen_id, 'examId': exam_id, 'faceImage': image})
+
+def saved_images(pipeline):
+    return os.listdir(pipeline.data_dir)
+
+def test_same_card_within_the_window_is_a_duplicate(pipeline, clock):
+    first = scan(pipeline)
+    clock.now += Config.CCCD_DEDUP_WINDOW - 1
+    again = scan(pipeline)
+
+    assert first['status'] == again['status'] == 'success'
+    assert not first.get('duplicate') and again['duplicate']
+    assert len(saved_images(pipeline)) == 1
+    assert pipeline.get_stats() == {'received': 2, 'processed': 1, 'duplicates': 1, 'errors': 0}
+
+def test_same_card_after_the_window_is_processed_again(pipeline, clock, monkeypatch):
+    scan(pipeline)
+    clock.now += Config.CCCD_DEDUP_WINDOW + 1
+    # Tên file theo giây: tránh ghi đè ảnh trước
+    monkeypatch.setattr('app.controllers.cccd_pipeline.format_datetime_for_filename', lambda: "later")
+    again = scan(pipeline)
+
+    assert not again.get('duplicate')
+    assert len(saved_images(pipeline)) == 2
+    assert pipeline.get_stats()['processed'] == 2
+
+def test_rescans_extend_the_window(pipeline, clock):
+    scan(pipeline)
+    for _ in range(3):
+        clock.now += Config.CCCD_DEDUP_WINDOW - 10
+        assert scan(pipeline)['duplicate']
+
+@pytest.mark.parametrize('changes', [
+    {'image': BLUE},
+    {'exam_id': 'E2'},
+    {'citizen_id': '002'},
+], ids=['new-image', 'other-exam', 'other-citizen'])
+def test_different_scans_are_not_duplicates(pipeline, changes):
+    scan(pipeline)
+    assert not scan(pipeline, **changes).get('duplicate')
+    assert pipeline.get_stats()['processed'] == 2
+
+def test_failed_scan_can_be_retried(pipeline):
+    data_dir, pipeline.data_dir = pipeline.data_dir, os.path.join("missing", "dir")
+    assert scan(pipeline)['status'] == 'error'
+
+    pipeline.data_dir = data_dir
+    retry = scan(pipeline)
+    assert retry['status'] == 'success' and not retry.get('duplicate')
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from app.utils.cccd_store import CCCDStore
+
+def receipt(citizen_id, image_path, timestamp):
+    return {
+        'citizenId': citizen_id,
+        'examId': 'E1',
+        'image_path': image_path,
+        'timestamp': timestamp,
+        'raw_data': {'citizenId': citizen_id, 'faceImage': 'base64...'}
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    store = CCCDStore(db_path=str(tmp_path / "cccd.db"))
+    yield store
+    store.close()
+
+def test_encodings_round_trip(store):
+    store.save_receipt(receipt('001', '/data/cccd_001_1.jpg', '2026-01-01T08:00:00'))
+    encodings = [np.arange(128, dtype=np.float64)]
+    store.save_encodings('001', 'E1', '/data/cccd_001_1.jpg', encodings)
+
+    record = store.get_receipt('001', 'E1')
+    assert np.array_equal(record['face_encodings'][0], encodings[0])
+    assert 'faceImage' not in record['raw_data']
+
+def test_encodings_of_a_replaced_image_are_not_saved(store):
+    store.save_receipt(receipt('001', '/data/cccd_001_1.jpg', '2026-01-01T08:00:00'))
+    # Quét lại trong lúc ảnh cũ đang được mã hóa
+    store.save_receipt(receipt('001', '/data/cccd_001_2.jpg', '2026-01-01T08:00:05'))
+    store.save_encodings('001', 'E1', '/data/cccd_001_1.jpg', [np.zeros(128)])
+
+    record = store.get_receipt('001', 'E1')
+    assert record['image_path'] == '/data/cccd_001_2.jpg'
+    assert record['face_encodings'] is None
+
+def test_no_face_is_cached_as_empty_list(store):
+    store.save_receipt(receipt('001', '/data/cccd_001_1.jpg', '2026-01-01T08:00:00'))
+    store.save_encodings('001', 'E1', '/data/cccd_001_1.jpg', [])
+    assert store.get_receipt('001')['face_encodings'] == []
@@ -0,0 +1,92 @@
+from app.models.exam import Exam
+from app.models.exam_attendance import ExamAttendance
+from app.models.user import User
+from app.utils.data_repository import DataRepository
+
+def test_get_instance_is_shared():
+    assert DataRepository.get_instance() is DataRepository.get_instance()
+
+def test_users_are_indexed_by_citizen_id_and_email():
+    repository = DataRepository()
+    repository.set_users([
+        User(user_id=1, email='An@Example.com', citizen_id=' 001 '),
+        User(user_id=2, email='binh@example.com', citizen_id='002'),
+    ])
+    assert repository.get_user('1').email == 'An@Example.com'
+    assert repository.find_user_by_citizen_id('001').user_id == 1
+    assert repository.find_user_by_email('an@example.com ').user_id == 1
+    assert repository.find_user_by_citizen_id('003') is None
+
+def test_user_changed_in_place_is_reindexed():
+    repository = DataRepository()
+    user = User(user_id=1, email='a@example.com', citizen_id='001')
+    repository.put_user(user)
+
+    user.citizen_id = '009'
+    repository.put_user(user)
+    assert repository.find_user_by_citizen_id('001') is None
+    assert repository.find_user_by_citizen_id('009') is user
+
+    repository.remove_user(1)
+    assert repository.find_user_by_citizen_id('009') is None
+    assert repository.find_user_by_email('a@example.com') is None
+
+def test_attendance_is_indexed_by_exam():
+    repository = DataRepository()
+    repository.put_attendance([
+        ExamAttendance(attendance_id='A1', user_id=1, exam_id='E1'),
+        ExamAttendance(attendance_id='A2', user_id=2, exam_id='E1'),
+        ExamAttendance(attendance_id='A3', user_id=1, exam_id='E2'),
+        ExamAttendance(user_id=3, exam_id='E1'),  # Chưa gửi: chưa có ID
+    ])
+    assert {a.attendance_id for a in repository.get_attendance_by_exam('E1')} == {'A1', 'A2'}
+
+    # Bản ghi chuyển sang kỳ thi khác
+    repository.put_attendance([ExamAttendance(attendance_id='A2', user_id=2, exam_id='E2')])
+    assert {a.attendance_id for a in repository.get_attendance_by_exam('E1')} == {'A1'}
+
+    repository.set_exam_attendance('E2', [ExamAttendance(attendance_id='A4', user_id=4, exam_id='E2')])
+    assert [a.attendance_id for a in repository.get_attendance_by_exam('E2')] == ['A4']
+    assert repository.get_attendance('A3') is None
+
+    repository.remove_attendance(['A1'])
+    assert repository.get_attendance_by_exam('E1') == []
+
+def test_removing_an_exam_drops_its_attendance():
+    repository = DataRepository()
+    repository.set_exams([Exam(exam_id='E1'), Exam(exam_id='E2')])
+    repository.put_attendance([ExamAttendance(attendance_id='A1', user_id=1, exam_id='E1')])
+
+    repository.remove_exam('E1')
+    assert repository.get_exam('E1') is None
+    assert repository.get_attendance('A1') is None
+    assert repository.get_stats() == {'users': 0, 'exams': 1, 'attendance': 0, 'exams_with_attendance': 0}
+
+def queued(key, user_id, exam_id, attendance_id=None):
+    attendance = ExamAttendance(attendance_id=attendance_id, user_id=user_id, exam_id=exam_id)
+    attendance.delivery_key = key
+    return attendance
+
+def test_queued_attendance_is_kept_until_delivered():
+    repository = DataRepository()
+    repository.put_attendance([queued('K1', 1, 'E1'), queued('K2', 2, 'E2')])
+    assert repository.get_attendance_by_exam('E1') == []
+    assert [a.delivery_key for a in repository.get_pending_attendance('E1')] == ['K1']
+    assert len(repository.get_pending_attendance()) == 2
+
+    # Bản ghi của máy chủ (có ID, cùng delivery_key) thay bản đang chờ
+    repository.put_attendance([queued('K1', 1, 'E1', attendance_id='A1')])
+    assert repository.find_pending_attendance('K1') is None
+    assert [a.attendance_id for a in repository.get_attendance_by_exam('E1')] == ['A1']
+
+    assert repository.remove_pending_attendance('K2').user_id == 2
+    assert repository.get_pending_attendance() == []
+
+def test_queued_attendance_survives_reloading_the_exam():
+    repository = DataRepository()
+    repository.put_attendance([queued('K1', 1, 'E1')])
+    repository.set_exam_attendance('E1', [ExamAttendance(attendance_id='A2', user_id=2, exam_id='E1')])
+    assert repository.find_pending_attendance('K1') is not None
+
+    repository.remove_exam('E1')
+    assert repository.get_pending_attendance() == []
@@ -0,0 +1,64 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.utils.image_utils import canonicalize_image, guess_image_extension
+from config.config import Config
+
+def encode(image, format, **params):
+    output = io.BytesIO()
+    image.save(output, format=format, **params)
+    return output.getvalue()
+
+def canonical(image_bytes):
+    return canonicalize_image(image_bytes, Config.CCCD_IMAGE_MAX_DIMENSION, Config.CCCD_IMAGE_JPEG_QUALITY)
+
+def decode(image_bytes):
+    image = Image.open(io.BytesIO(image_bytes))
+    image.load()
+    return image
+
+def test_large_photo_is_downscaled_keeping_the_aspect_ratio():
+    photo = encode(Image.new('RGB', (4000, 3000), (200, 30, 30)), 'JPEG', quality=95)
+    image = decode(canonical(photo))
+    assert image.format == 'JPEG'
+    assert image.size == (800, 600)
+
+def test_small_image_is_not_enlarged():
+    image = decode(canonical(encode(Image.new('RGB', (320, 200)), 'PNG')))
+    assert image.size == (320, 200)
+
+@pytest.mark.parametrize('mode', ['RGBA', 'P', 'L'])
+def test_any_mode_becomes_rgb_jpeg(mode):
+    image = decode(canonical(encode(Image.new(mode, (100, 60)), 'PNG')))
+    assert (image.format, image.mode) == ('JPEG', 'RGB')
+
+def test_exif_orientation_is_applied_and_metadata_dropped():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Chụp xoay 90°: ảnh hiển thị đứng
+    exif[0x010F] = 'PhoneMaker'
+    photo = encode(Image.new('RGB', (1600, 1200)), 'JPEG', exif=exif)
+
+    image = decode(canonical(photo))
+    assert image.size == (600, 800)
+    assert not image.getexif()
+
+def test_canonical_image_is_stable():
+    # Ảnh đã chuẩn hóa được chuẩn hóa lại không đổi kích thước
+    once = canonical(encode(Image.new('RGB', (2000, 1000), (10, 120, 10)), 'PNG'))
+    assert decode(canonical(once)).size == decode(once).size == (800, 400)
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'not an image',
+    encode(Image.new('RGB', (400, 300)), 'JPEG')[:200],
+], ids=['empty', 'garbage', 'truncated'])
+def test_unreadable_bytes_raise_value_error(data):
+    with pytest.raises(ValueError):
+        canonical(data)
+
+def test_guess_image_extension():
+    assert guess_image_extension(encode(Image.new('RGB', (4, 4)), 'PNG')) == '.png'
+    assert guess_image_extension(encode(Image.new('RGB', (4, 4)), 'WEBP')) == '.webp'
+    assert guess_image_extension(encode(Image.new('RGB', (4, 4)), 'JPEG')) == '.jpg'
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from app.utils.json_stream import iter_json_array
+
+ITEMS = [
+    {'userId': 'U1', 'name': 'Nguyễn Văn An', 'score': 9.75},
+    12345,
+    "chuỗi có dấu, [ngoặc] và \"nháy\"",
+    [1, 2, {'nested': None}],
+    True,
+    -0.5e10,
+]
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_elements_split_at_any_chunk_boundary(size):
+    # Chunk 1 byte cắt ngang cả ký tự UTF-8 nhiều byte và các số
+    data = json.dumps(ITEMS, ensure_ascii=False, indent=1).encode('utf-8')
+    assert list(iter_json_array(chunked(data, size))) == ITEMS
+
+def test_number_at_the_end_of_a_chunk_is_not_cut():
+    assert list(iter_json_array([b'[12', b'34, 5', b'6]'])) == [1234, 56]
+
+def test_elements_are_yielded_before_the_body_ends():
+    def chunks():
+        yield b'[{"id": 1}, '
+        yield b'{"id": 2}'
+        raise AssertionError("read past the second element")
+
+    stream = iter_json_array(chunks())
+    assert next(stream) == {'id': 1}
+
+def test_empty_array():
+    assert list(iter_json_array([b' [ ', b' ] '])) == []
+
+def test_non_array_body():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'{"message": "Unauthorized"}']))
+
+@pytest.mark.parametrize("data", [b'[1, 2', b'[1 2]', b'[{"a": 1}'])
+def test_truncated_or_invalid_array(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(data, 2)))
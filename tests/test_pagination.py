@@ -0,0 +1,77 @@
+import pytest
+
+# Các controller import CCCDIngestPipeline, cần face_recognition
+pytest.importorskip("face_recognition")
+
+from app.controllers.attendance_controller import AttendanceController
+from app.utils.pagination import is_local_cursor
+
+PAGE_STYLES = [{'page_style': style} for style in ('cursor', 'spring', 'list')]
+
+def query_all(controller, page_size, **filters):
+    """Follow next_cursor from the first page to the last one"""
+    pages = [controller.query_attendance(page_size=page_size, **filters)]
+    while pages[-1].has_next:
+        pages.append(controller.query_attendance(page_size=page_size, cursor=pages[-1].next_cursor, **filters))
+    return pages
+
+def expected_ids(backend, **query):
+    return [a['id'] for a in backend.data.query_attendances(query)]
+
+@pytest.mark.parametrize('backend', PAGE_STYLES, indirect=True)
+def test_pages_cover_every_record_once(backend):
+    pages = query_all(AttendanceController(), 30)
+
+    assert [len(page.items) for page in pages] == [30] * 6 + [20]
+    assert all(page.total == 200 and page.page_count == 7 for page in pages)
+    assert [a.attendance_id for page in pages for a in page.items] == expected_ids(backend)
+
+@pytest.mark.parametrize('backend', PAGE_STYLES, indirect=True)
+def test_filters_apply_to_every_page(backend):
+    exam_id = backend.data.exams[1]['examId']
+    pages = query_all(AttendanceController(), 7, exam_id=exam_id, face_verified=True)
+
+    ids = [a.attendance_id for page in pages for a in page.items]
+    assert ids == expected_ids(backend, examId=exam_id, faceVerified='true')
+    assert all(page.total == len(ids) for page in pages)
+
+@pytest.mark.parametrize('backend, cursor_kind', [
+    ({'page_style': 'cursor'}, str),
+    ({'page_style': 'spring'}, 'page:'),
+    ({'page_style': 'list'}, 'offset:'),
+], indirect=['backend'])
+def test_cursor_format_follows_the_server(backend, cursor_kind):
+    controller = AttendanceController()
+    page = controller.query_attendance(page_size=50)
+
+    assert page.cursor is None and page.has_next
+    if cursor_kind is str:
+        assert not is_local_cursor(page.next_cursor) and not page.next_cursor.startswith('page:')
+    else:
+        assert page.next_cursor.startswith(cursor_kind)
+    assert controller.server_pagination is (cursor_kind != 'offset:')
+
+@pytest.mark.parametrize('backend', [{'page_style': 'list'}], indirect=True)
+def test_unpaged_server_is_paged_locally(backend):
+    controller = AttendanceController()
+    first = controller.query_attendance(page_size=50)
+    assert controller.server_pagination is False
+    assert backend.get_stats()['requests'] == 1
+
+    # Trang sau và truy vấn mới không gửi tham số phân trang nữa
+    backend.reset_stats()
+    second = controller.query_attendance(page_size=50, cursor=first.next_cursor)
+    exam_id = backend.data.exams[0]['examId']
+    by_exam = controller.query_attendance(page_size=50, exam_id=exam_id)
+    assert backend.get_stats()['requests'] == 2
+
+    assert [a.attendance_id for a in second.items] == expected_ids(backend)[50:100]
+    assert [a.attendance_id for a in by_exam.items] == expected_ids(backend, examId=exam_id)
+    assert by_exam.total == len(expected_ids(backend, examId=exam_id))
+    assert not by_exam.has_next
+
+@pytest.mark.parametrize('backend', PAGE_STYLES, indirect=True)
+def test_count_attendance_uses_the_page_total(backend):
+    exam_id = backend.data.exams[2]['examId']
+    controller = AttendanceController()
+    assert controller.count_attendance(exam_id=exam_id) == len(expected_ids(backend, examId=exam_id))
@@ -0,0 +1,46 @@
+import datetime
+
+import pytest
+
+# Các controller import CCCDIngestPipeline, cần face_recognition
+pytest.importorskip("face_recognition")
+
+from app.controllers.attendance_controller import AttendanceController
+from app.controllers.auth_controller import AuthController
+from app.controllers.exam_controller import ExamController
+from app.controllers.user_controller import UserController
+from app.utils.prefetch import Prefetcher
+
+def prefetch_as_admin(backend):
+    auth = AuthController()
+    auth.refresh_user_info()
+    auth.is_admin = lambda: True
+    attendance = AttendanceController()
+    prefetcher = Prefetcher(auth, UserController(), ExamController(), attendance)
+    prefetcher.start()
+    assert prefetcher.finished.wait(10)
+    return prefetcher, attendance
+
+def test_panel_sync_uses_the_prefetched_roster(backend):
+    exam_id = backend.data.exams[0]['examId']
+    backend.data.exams[0]['date'] = datetime.date.today().isoformat()
+
+    prefetcher, attendance = prefetch_as_admin(backend)
+    assert prefetcher.durations[f"roster {exam_id}"] is not None
+    roster = {a.attendance_id for a in attendance.get_synced_attendance(exam_id)}
+    assert roster
+
+    # Chọn kỳ thi ở bảng điểm danh (AttendancePanel.sync_exam)
+    backend.reset_stats()
+    result = attendance.sync_attendance(exam_id)
+    assert backend.get_stats()['requests'] == 0
+    assert result.total == len(roster)
+    assert {a.attendance_id for a in attendance.get_synced_attendance(exam_id)} == roster
+
+    # Làm mới sau đó: hỏi lại máy chủ các thay đổi
+    attendance.sync_attendance(exam_id)
+    assert backend.get_stats()['requests'] == 1
+
+def test_exams_not_taking_place_today_are_not_prefetched(backend):
+    prefetcher, attendance = prefetch_as_admin(backend)
+    assert not [name for name in prefetcher.durations if name.startswith('roster')]
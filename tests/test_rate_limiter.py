@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.rate_limiter import TokenBucket
+
+def test_bucket_allows_a_burst_then_the_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.try_consume() for _ in range(4)] == [True, True, True, False]
+    assert bucket.time_until_available() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_consume()
+    assert not bucket.try_consume()
+
+def test_bucket_does_not_refill_past_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=2)
+    clock.now += 60
+    assert [bucket.try_consume() for _ in range(3)] == [True, True, False]
+
+def test_failed_consume_takes_nothing(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+    assert not bucket.try_consume(4)
+    assert bucket.try_consume(3)
+
+def fair_scheduler(*args, **kwargs):
+    # cccd_gateway cần face_recognition (qua CCCDIngestPipeline)
+    pytest.importorskip("face_recognition")
+    from app.controllers.cccd_gateway import _FairScheduler
+    return _FairScheduler(*args, **kwargs)
+
+def test_scheduler_serves_clients_in_turn():
+    order = []
+    release = threading.Event()
+
+    def work(data):
+        release.wait(5)
+        order.append(data)
+        return data
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            scheduler = fair_scheduler(loop, executor, workers=1, func=work)
+            # Máy A gửi một loạt bản ghi tồn đọng trước khi máy B gửi
+            futures = [scheduler.submit('A', f"A{n}") for n in range(4)]
+            futures += [scheduler.submit('B', f"B{n}") for n in range(2)]
+            assert scheduler.queued('A') == 3
+            release.set()
+            return await asyncio.gather(*futures)
+
+    results = asyncio.run(run())
+    assert results == ['A0', 'A1', 'A2', 'A3', 'B0', 'B1']
+    assert order == ['A0', 'A1', 'B0', 'A2', 'B1', 'A3']
+
+def test_scheduler_passes_errors_to_the_caller():
+    def work(data):
+        raise ValueError(data)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            scheduler = fair_scheduler(loop, executor, workers=2, func=work)
+            with pytest.raises(ValueError, match="bad"):
+                await scheduler.submit('A', "bad")
+            assert scheduler.active == 0
+
+    asyncio.run(run())
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from app.utils.api_service import ApiService
+from app.utils.response_cache import CacheEntry, ResponseCache
+from config.config import Config
+
+def test_entry_is_fresh_for_its_ttl(clock):
+    entry = CacheEntry(b'[1]', etag='"v1"', ttl=30)
+    assert entry.is_fresh()
+    clock.now += 30
+    assert not entry.is_fresh()
+    entry.refresh(30)
+    assert entry.is_fresh()
+
+def test_conditional_headers():
+    entry = CacheEntry(b'[]', etag='"v1"', last_modified='Mon, 19 Oct 2026 08:00:00 GMT')
+    assert entry.conditional_headers() == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 19 Oct 2026 08:00:00 GMT'
+    }
+    assert CacheEntry(b'[]').conditional_headers() == {}
+
+def test_key_does_not_depend_on_parameter_order():
+    assert ResponseCache.make_key('/a', {'size': 20, 'examId': 'E1'}) == ResponseCache.make_key('/a', {'examId': 'E1', 'size': 20})
+    assert ResponseCache.make_key('/a') == '/a'
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put('/a', CacheEntry(b'1'))
+    cache.put('/b', CacheEntry(b'2'))
+    cache.get('/a')
+    cache.put('/c', CacheEntry(b'3'))
+    assert cache.get('/b') is None
+    assert cache.get('/a') is not None
+
+def test_invalidate_drops_the_url_and_its_children_only():
+    cache = ResponseCache()
+    for key in ('/exam', '/exam/E1', '/exam?size=20', '/exam-attendances', '/users'):
+        cache.put(key, CacheEntry(b'[]'))
+    assert cache.invalidate('/exam/') == 3
+    assert cache.get('/exam-attendances') is not None
+    assert cache.get('/users') is not None
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.text = self.content.decode('utf-8')
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'API_SNAPSHOT_DIR', str(tmp_path / "snapshots"))
+    monkeypatch.setattr(Config, 'API_CACHE_TTLS', {'/users': 60})
+    monkeypatch.setattr(Config, 'API_CACHE_DEFAULT_TTL', 0)
+    api = ApiService()
+    api.requests = []
+
+    def fetch(method, url, params=None, json_data=None, extra_headers=None, stream=False):
+        api.requests.append(extra_headers or {})
+        return api.responses.pop(0)
+
+    monkeypatch.setattr(api, '_fetch', fetch)
+    yield api
+    api.session.close()
+
+def test_get_revalidates_with_etag(api):
+    url = Config.API_BASE_URL + "/exam"
+    api.responses = [FakeResponse(200, [{'examId': 'E1'}], {'ETag': '"v1"'}), FakeResponse(304)]
+
+    assert api.get(url) == [{'examId': 'E1'}]
+    # TTL 0: hỏi lại máy chủ, 304 -> dùng bản đã cache
+    assert api.get(url) == [{'examId': 'E1'}]
+    assert api.requests == [{}, {'If-None-Match': '"v1"'}]
+    stats = api.response_cache.get_stats()
+    assert (stats['misses'], stats['revalidated']) == (1, 1)
+
+def test_get_serves_fresh_entries_without_a_request(api, clock):
+    url = Config.API_BASE_URL + "/users"
+    api.responses = [FakeResponse(200, [{'userId': 'U1'}]), FakeResponse(200, [{'userId': 'U2'}])]
+
+    assert api.get(url) == [{'userId': 'U1'}]
+    clock.now += 59
+    assert api.get(url) == [{'userId': 'U1'}]
+    assert len(api.requests) == 1
+
+    clock.now += 1
+    assert api.get(url) == [{'userId': 'U2'}]
+    assert len(api.requests) == 2
+
+def test_callers_get_their_own_copy(api):
+    url = Config.API_BASE_URL + "/users"
+    api.responses = [FakeResponse(200, [{'userId': 'U1'}])]
+    api.get(url)[0]['userId'] = 'changed'
+    assert api.get(url) == [{'userId': 'U1'}]
+
+def test_response_racing_a_write_is_not_cached(api):
+    url = Config.API_BASE_URL + "/users"
+    api.responses = [FakeResponse(200, [{'userId': 'U1', 'name': 'old'}], {'ETag': '"v1"'}),
+                     FakeResponse(200, [{'userId': 'U1', 'name': 'new'}], {'ETag': '"v2"'})]
+    fetch = api._fetch
+
+    def fetch_during_write(*args, **kwargs):
+        response = fetch(*args, **kwargs)
+        # PUT /users/U1 kết thúc (và xóa cache) trong lúc response cũ đang trên đường về
+        api.invalidate_cache(Config.API_BASE_URL + "/users/U1")
+        return response
+
+    api._fetch = fetch_during_write
+    assert api.get(url)[0]['name'] == 'old'
+    api._fetch = fetch
+
+    assert api.get(url)[0]['name'] == 'new'
+    assert api.requests == [{}, {}]
+
+def test_put_checks_the_generation():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.clear()
+    assert not cache.put('/a', CacheEntry(b'1'), generation)
+    assert cache.put('/a', CacheEntry(b'1'), cache.generation)
+    assert cache.put('/b', CacheEntry(b'2'))
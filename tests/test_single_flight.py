@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.api_service import ApiService
+from app.utils.single_flight import SingleFlight
+from config.config import Config
+
+def run_concurrently(count, target):
+    """Start `count` threads running target(); returns (threads, results list, errors list)"""
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+def wait_for_waiters(flight, count):
+    deadline = time.monotonic() + 5
+    while flight.get_stats()['coalesced'] < count:
+        assert time.monotonic() < deadline, "callers did not join the running call"
+        time.sleep(0.01)
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return 'data'
+
+    threads, results, errors = run_concurrently(8, lambda: flight.do('GET /exams', fetch))
+    wait_for_waiters(flight, 7)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert not errors
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: r[1]) == [('data', False)] + [('data', True)] * 7
+    assert flight.get_stats()['in_flight'] == 0
+
+def test_leader_error_reaches_every_waiter_and_releases_the_key():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ConnectionError("backend down")
+
+    threads, results, errors = run_concurrently(5, lambda: flight.do('key', failing))
+    wait_for_waiters(flight, 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert len(errors) == 5 and all(isinstance(e, ConnectionError) for e in errors)
+
+    # Lần gọi sau chạy lại, không nhận lỗi cũ
+    assert flight.get_stats()['in_flight'] == 0
+    assert flight.do('key', lambda: 'ok') == ('ok', False)
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread = threading.Thread(target=lambda: flight.do('slow', lambda: release.wait(5)))
+    thread.start()
+    try:
+        assert flight.do('fast', lambda: 1) == (1, False)
+    finally:
+        release.set()
+        thread.join(5)
+
+@pytest.mark.parametrize('backend', [{'latency': 0.2}], indirect=True)
+def test_identical_gets_make_one_request(backend):
+    api = ApiService.get_instance()
+    threads, results, errors = run_concurrently(6, lambda: api.get(Config.EXAMS_URL))
+    for thread in threads:
+        thread.join(10)
+
+    assert not errors
+    assert len(results) == 6 and all(result == results[0] for result in results)
+    assert backend.get_stats()['requests'] == 1
+    assert api.get_coalescing_stats()['coalesced'] > 0
@@ -0,0 +1,67 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+from app.utils.snapshot_store import SnapshotStore
+
+KEY = "GET http://backend/api/exam?page=0"
+BODY = json.dumps([{'examId': 'E1', 'name': 'Toán'}]).encode('utf-8')
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshots"), max_files=3)
+
+def age(store, user_key, key, seconds):
+    path = store._path(user_key, key)
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+def test_round_trip(store):
+    store.save('U1', KEY, BODY)
+    data, saved_at = store.load('U1', KEY)
+    assert data == json.loads(BODY)
+    assert saved_at == store.saved_at('U1', KEY)
+
+def test_snapshots_are_kept_per_user(store):
+    store.save('U1', KEY, BODY)
+    assert store.load('U2', KEY) == (None, None)
+    assert store.saved_at('U2', KEY) is None
+
+    store.save('U2', KEY, b'[]')
+    assert store.load('U1', KEY)[0] == json.loads(BODY)
+    assert store.load('U2', KEY)[0] == []
+
+def test_max_age(store):
+    store.save('U1', KEY, BODY)
+    age(store, 'U1', KEY, 600)
+    assert store.load('U1', KEY, max_age=300) == (None, None)
+    assert store.load('U1', KEY, max_age=900)[0] == json.loads(BODY)
+
+    # 304: dữ liệu được máy chủ xác nhận lại, dùng được tiếp
+    store.touch('U1', KEY)
+    assert store.load('U1', KEY, max_age=300)[0] == json.loads(BODY)
+
+@pytest.mark.parametrize('content', [
+    b'not gzip at all',
+    gzip.compress(BODY)[:-12],  # Bị cắt giữa chừng
+    gzip.compress(BODY)[:10] + b'\x00' * 20 + gzip.compress(BODY)[30:],
+    gzip.compress(b'{"items": ['),
+], ids=['not-gzip', 'truncated', 'corrupt', 'bad-json'])
+def test_unreadable_snapshot_is_ignored(store, content):
+    store.save('U1', KEY, BODY)
+    with open(store._path('U1', KEY), 'wb') as f:
+        f.write(content)
+    assert store.load('U1', KEY) == (None, None)
+
+def test_oldest_snapshots_are_pruned(store):
+    for n in range(4):
+        store.save('U1', f"{KEY}&n={n}", BODY)
+        age(store, 'U1', f"{KEY}&n={n}", 100 - n)
+    store.save('U1', KEY, BODY)
+
+    assert store.load('U1', f"{KEY}&n=0") == (None, None)
+    assert store.load('U1', f"{KEY}&n=1") == (None, None)
+    assert all(store.load('U1', key)[0] is not None for key in (f"{KEY}&n=2", f"{KEY}&n=3", KEY))
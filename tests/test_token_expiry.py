@@ -0,0 +1,49 @@
+import base64
+import json
+import time
+
+import pytest
+
+from app.utils.api_service import ApiService
+
+def make_token(claims):
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).rstrip(b'=').decode('ascii')
+    return f"{part({'alg': 'HS256', 'typ': 'JWT'})}.{part(claims)}.signature"
+
+@pytest.mark.parametrize("claims", [
+    {'sub': 'U1', 'exp': 1792422308},
+    {'sub': 'U12', 'exp': 1792422308},  # Độ dài khác: cần thêm padding khác
+    {'sub': 'Nguyễn', 'exp': 1792422308.5},
+])
+def test_expiry_is_read_from_the_payload(claims):
+    assert ApiService._decode_token_expiry(make_token(claims)) == claims['exp']
+
+@pytest.mark.parametrize("token", [
+    make_token({'sub': 'U1'}),  # Không có exp
+    "opaque-session-token",
+    "a.%%%.c",
+    None,
+])
+def test_unreadable_expiry_is_none(token):
+    assert ApiService._decode_token_expiry(token) is None
+
+@pytest.fixture
+def api():
+    api = ApiService()
+    yield api
+    api.session.close()
+
+def test_token_expiry_honours_the_margin(api):
+    api.token = "token"
+    api.token_expires_at = time.time() + 30
+    assert not api.is_token_expired(margin=10)
+    assert api.is_token_expired(margin=60)
+
+def test_token_without_expiry_is_trusted(api):
+    api.token = "opaque-session-token"
+    api.token_expires_at = None
+    assert not api.is_token_expired()
+
+    api.token = None
+    assert api.is_token_expired()